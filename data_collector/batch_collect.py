@@ -7,6 +7,9 @@ Usage:
     python batch_collect.py --task 民生类  # 采集指定任务
     python batch_collect.py --priority high  # 采集高优先级任务
     python batch_collect.py --dry-run    # 预览模式，不实际采集
+    python batch_collect.py --since 1d   # 只采集最近一天的微博
+    python batch_collect.py --budget 200 # 按关键词历史收益分配 200 页的总预算
+    python batch_collect.py --no-bandit  # 各任务使用固定页数
 """
 
 import sys
@@ -20,7 +23,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from core.config import Config
 from core.logger import get_logger, setup_logger
-from core.task_queue import TaskQueue
+from core.task_queue import create_task_queue
+from core.watermark import parse_since
+from core.keyword_bandit import KeywordBandit
 from collectors import AsyncWeiboCollector
 from storage import FileStorage
 
@@ -28,11 +33,37 @@ from storage import FileStorage
 logger = get_logger('BatchCollect')
 
 
+def plan_pages(tasks, bandit: KeywordBandit, bandit_config: dict, budget: int = None) -> dict:
+    """
+    计算每个关键词的翻页数
+    
+    未启用收益调度时沿用各任务的 max_pages；启用时把总预算（默认等于各任务
+    max_pages 之和，即预算不变只改分配）按关键词历史收益比例分给所有关键词，
+    没有历史的关键词以任务的 max_pages 作为先验。
+    """
+    static = {}
+    for task in tasks:
+        for keyword in task.get('keywords', []):
+            static.setdefault(keyword, task.get('max_pages', 10))
+    
+    if bandit is None:
+        return static
+    
+    budget = budget or bandit_config.get('budget') or sum(static.values())
+    return bandit.allocate(
+        list(static),
+        budget,
+        min_pages=bandit_config.get('min_pages', 2),
+        max_pages=bandit_config.get('max_pages', 50),
+        priors=static
+    )
+
+
 async def batch_collect(args):
     """批量采集数据"""
     config = Config()
     storage = FileStorage(config)
-    task_queue = TaskQueue()
+    task_queue = create_task_queue(config)
     
     # 获取批量任务配置
     batch_config = config.get('batch_collect', default={})
@@ -58,6 +89,11 @@ async def batch_collect(args):
             logger.error(f"未找到优先级为 {args.priority} 的任务")
             return
     
+    # 翻页预算
+    bandit_config = batch_config.get('bandit', {}) or {}
+    bandit = None if args.no_bandit else KeywordBandit.from_config(config)
+    page_plan = plan_pages(tasks, bandit, bandit_config, args.budget)
+    
     # 统计
     total_keywords = sum(len(t.get('keywords', [])) for t in tasks)
     print("\n" + "=" * 60)
@@ -66,54 +102,74 @@ async def batch_collect(args):
     print(f"  任务数: {len(tasks)}")
     print(f"  关键词总数: {total_keywords}")
     print(f"  采集源: weibo")
+    print(f"  翻页预算: {sum(page_plan.values())} 页/搜索类型 ({'按收益分配' if bandit else '固定'})")
     print("=" * 60)
     
     # 预览模式
     if args.dry_run:
+        yields = bandit.get_statistics(list(page_plan)) if bandit else {}
         print("\n[预览模式] 将要采集的关键词:")
         for task in tasks:
             print(f"\n  [{task['name']}] (优先级: {task.get('priority', 'medium')}, 页数: {task.get('max_pages', 10)})")
             for kw in task.get('keywords', []):
-                print(f"    - {kw}")
+                if yields.get(kw, {}).get('runs'):
+                    stats = yields[kw]
+                    print(f"    - {kw}: {page_plan[kw]} 页 (收益 {stats['yield']} 条/请求, 得分 {stats['score']})")
+                else:
+                    print(f"    - {kw}: {page_plan[kw]} 页")
         print("\n使用 --no-dry-run 开始实际采集")
         return
     
-    # 开始采集
-    all_data = []
+    # 开始采集：结果边采边写，分组落盘
+    writer = storage.open_stream(data_type='raw')
     start_time = datetime.now()
     
-    for task in tasks:
-        task_name = task['name']
-        keywords = task.get('keywords', [])
-        max_pages = task.get('max_pages', 10)
-        
-        logger.info(f"开始采集任务: {task_name} ({len(keywords)} 个关键词)")
-        
-        # 添加到任务队列
-        await task_queue.add_batch(keywords, 'weibo', max_pages)
-        
-        # 执行采集
-        async with AsyncWeiboCollector(config) as collector:
-            for keyword in keywords:
-                logger.info(f"采集关键词: {keyword}")
+    try:
+        for task in tasks:
+            task_name = task['name']
+            keywords = task.get('keywords', [])
+            max_pages = task.get('max_pages', 10)
+            
+            logger.info(f"开始采集任务: {task_name} ({len(keywords)} 个关键词)")
+            
+            # 添加到任务队列
+            await task_queue.add_batch(keywords, 'weibo', max_pages)
+            
+            # 执行采集：任务内所有关键词的分页请求并发重叠
+            collector = AsyncWeiboCollector(config)
+            collector.max_concurrent = args.concurrent
+            collector.attach_writer(writer)
+            
+            async with collector:
+                counts = {keyword: 0 for keyword in keywords}
+                requests = {keyword: 0 for keyword in keywords}
+                
+                async def count_page(keyword, search_type, page, finished=False):
+                    requests[keyword] = requests.get(keyword, 0) + 1
+                    # 每页数据先落盘，水位线只在数据落盘后推进
+                    writer.commit()
+                
                 try:
-                    data = []
-                    async for item in collector.collect([keyword], max_pages=max_pages):
-                        data.append(item)
-                    all_data.extend(data)
-                    logger.info(f"  获取 {len(data)} 条数据")
+                    async for item in collector.collect(keywords, max_pages=max_pages,
+                                                          page_budget=page_plan, on_page=count_page,
+                                                          since=args.since, incremental=not args.full):
+                        writer.write(item)
+                        if item.keywords:
+                            counts[item.keywords[0]] = counts.get(item.keywords[0], 0) + 1
                 except Exception as e:
-                    logger.error(f"采集失败 [{keyword}]: {e}")
+                    logger.error(f"采集失败 [{task_name}]: {e}")
                 
-                # 任务间延迟（增加到5秒避免触发反爬虫）
-                await asyncio.sleep(5)
-        
-        logger.info(f"任务 [{task_name}] 完成")
-    
-    # 保存数据
-    if all_data:
-        output_file = storage.save(all_data, data_type='raw')
-        logger.info(f"保存到: {output_file}")
+                for keyword, count in counts.items():
+                    logger.info(f"  {keyword}: 获取 {count} 条数据 ({requests.get(keyword, 0)} 次请求)")
+                    if bandit:
+                        bandit.record(keyword, requests.get(keyword, 0), count)
+                if bandit:
+                    bandit.save()
+            
+            logger.info(f"任务 [{task_name}] 完成")
+    finally:
+        writer.close()
+        task_queue.close()
     
     # 统计
     end_time = datetime.now()
@@ -122,9 +178,11 @@ async def batch_collect(args):
     print("\n" + "=" * 60)
     print("采集完成")
     print("=" * 60)
-    print(f"  总数据量: {len(all_data)} 条")
+    print(f"  总数据量: {writer.count} 条")
     print(f"  耗时: {duration:.1f} 秒")
-    print(f"  平均: {len(all_data) / max(duration, 1):.1f} 条/秒")
+    print(f"  平均: {writer.count / max(duration, 1):.1f} 条/秒")
+    if writer.count:
+        print(f"  输出文件: {writer.path}")
     print("=" * 60)
 
 
@@ -156,7 +214,11 @@ def main():
     parser.add_argument('--priority', '-p', choices=['high', 'medium', 'low'], help='按优先级筛选')
     parser.add_argument('--dry-run', '-d', action='store_true', help='预览模式，不实际采集')
     parser.add_argument('--list', '-l', action='store_true', help='列出所有任务')
-    parser.add_argument('--concurrent', '-c', type=int, default=3, help='并发数')
+    parser.add_argument('--concurrent', '-c', type=int, default=3, help='并发数（启用 concurrency.adaptive 时为初始值）')
+    parser.add_argument('--since', type=parse_since, help='只采集该时间之后的微博，如 "2025-12-15 08:00" 或 6h、2d')
+    parser.add_argument('--full', action='store_true', help='忽略增量水位线，完整翻页')
+    parser.add_argument('--budget', '-b', type=int, help='总翻页预算，覆盖 batch_collect.bandit.budget')
+    parser.add_argument('--no-bandit', action='store_true', help='不按收益分配，各任务使用固定页数')
     
     args = parser.parse_args()
     
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+端到端采集基准测试 - 本地模拟微博接口，驱动真实的 AsyncWeiboCollector → DataCleaner → 流式写入
+
+按 并发数 × 页间延迟 × 代理数 的组合逐一运行，输出 JSON：
+页/秒、条/秒、每条CPU耗时、请求延迟分位数、事件循环延迟、峰值内存、状态码分布。
+
+Usage:
+    python benchmarks/bench_collect.py
+    python benchmarks/bench_collect.py --concurrency 3,10,20 --page-delay 0,0.5 --proxies 0,4
+    python benchmarks/bench_collect.py --throttle-rate 0.02 --ratelimit-rate 0.02 --output bench.json
+    python main.py benchmark --concurrency 5,10
+"""
+
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import itertools
+from pathlib import Path
+from collections import Counter
+from datetime import datetime
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import Config
+from core.proxy_pool import ProxyPool
+from collectors import AsyncWeiboCollector
+from storage import FileStorage
+from benchmarks.weibo_stub import StubProcess, StubOptions, API_PATH
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class BenchWeiboCollector(AsyncWeiboCollector):
+    """记录每次请求的耗时与状态码"""
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+    
+    async def _fetch(self, url: str, *args, **kwargs):
+        result = await super()._fetch(url, *args, **kwargs)
+        self.latencies.append(result.elapsed)
+        self.statuses[str(result.status or 'error')] += 1
+        return result
+
+
+class LoopLagMonitor:
+    """事件循环延迟：定时睡眠的实际唤醒时间与预期之差"""
+    
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - started - self.interval))
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def percentiles(values: List[float], points=(50, 90, 95, 99)) -> Dict[str, float]:
+    """分位数（毫秒）"""
+    if not values:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        result[f"p{p}"] = round(ordered[index] * 1000, 2)
+    result['max'] = round(ordered[-1] * 1000, 2)
+    return result
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程峰值常驻内存(MB)，整个进程生命周期内单调不减"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def free_ports(count: int) -> List[int]:
+    """获取空闲端口"""
+    sockets = []
+    for _ in range(count):
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        sockets.append(s)
+    ports = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return ports
+
+
+def configure(config: Config, workdir: Path, args):
+    """基准测试的运行时配置：关闭缓存/去重/录制，状态文件写入临时目录"""
+    config.set('rate_limit', value={'rate': args.rate, 'burst': args.rate, 'max_rate': args.rate,
+                                    'min_rate': 0.1, 'increase_step': 0.05, 'decrease_factor': 0.5})
+    config.set('http_cache', 'enabled', value=False)
+    config.set('dedup', 'enabled', value=False)
+    config.set('request_coalescing', 'enabled', value=False)
+    config.set('concurrency', 'adaptive', value=args.adaptive)
+    config.set('concurrency', 'hosts', value={})
+    config.set('hedging', 'enabled', value=args.hedging)
+    config.set('circuit_breaker', 'enabled', value=args.breakers)
+    config.set('cassette', 'mode', value='off')
+    config.set('proxy', 'enabled', value=False)
+    config.set('weibo', 'search_types', value=['realtime'])
+    config.set('weibo', 'watermark_file', value=str(workdir / 'watermarks.json'))
+    config.set('storage', 'file', 'output_dir', value=str(workdir))
+
+
+async def run_once(config: Config, args, cleaner, concurrency: int, page_delay: float,
+                   proxies: List[str], base_url: str) -> Dict:
+    """运行一个组合"""
+    storage = FileStorage(config)
+    
+    keywords = [f"基准{i}" for i in range(args.keywords)]
+    collector = BenchWeiboCollector(config)
+    collector.max_concurrent = concurrency
+    # 经代理访问时使用虚拟主机名，请求由各代理端口（模拟服务）直接应答
+    collector.SEARCH_URL = f"http://weibo.bench{API_PATH}" if proxies else f"{base_url}{API_PATH}"
+    if proxies:
+        pool = ProxyPool()
+        for proxy_url in proxies:
+            pool.add(proxy_url)
+        collector.proxy_pool = pool
+    
+    writer = storage.open_stream(filename=f"bench_{concurrency}_{page_delay}_{len(proxies)}")
+    monitor = LoopLagMonitor()
+    records = 0
+    cleaned = 0
+    
+    async with collector:
+        monitor.start()
+        cpu_start = time.process_time()
+        started = time.perf_counter()
+        
+        async for data in collector.collect(keywords, max_pages=args.pages, page_delay=page_delay,
+                                            incremental=False):
+            records += 1
+            item = cleaner.clean(data) if cleaner else data
+            if item is not None:
+                cleaned += 1
+                writer.write(item)
+        writer.commit()
+        
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_start
+        await monitor.stop()
+    writer.close()
+    
+    pages = len(collector.latencies)
+    return {
+        'concurrency': concurrency,
+        'page_delay': page_delay,
+        'proxies': len(proxies),
+        'elapsed_s': round(elapsed, 3),
+        'requests': pages,
+        'records': records,
+        'written': cleaned,
+        'pages_per_s': round(pages / elapsed, 2) if elapsed else None,
+        'posts_per_s': round(records / elapsed, 2) if elapsed else None,
+        'cpu_s': round(cpu, 3),
+        'cpu_ms_per_post': round(cpu * 1000 / records, 3) if records else None,
+        'latency_ms': percentiles(collector.latencies),
+        'loop_lag_ms': percentiles(monitor.lags),
+        'statuses': dict(collector.statuses),
+        'concurrency_limits': collector.concurrency.get_statistics(),
+        'hedging': collector.hedging.get_statistics() if collector.hedging else None,
+        'circuit_breakers': collector.breakers.get_statistics() if collector.breakers else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def parse_list(value: str, cast=float) -> List:
+    return [cast(v) for v in str(value).split(',') if v.strip()]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """基准测试参数（main.py benchmark 共用）"""
+    parser.add_argument('--concurrency', default='3,10,20', help='并发数列表(逗号分隔)')
+    parser.add_argument('--page-delay', default='0', help='同一分页流的页间延迟列表(秒)')
+    parser.add_argument('--proxies', default='0', help='代理数列表，0 表示直连')
+    parser.add_argument('--keywords', type=int, default=10, help='关键词数')
+    parser.add_argument('--pages', type=int, default=10, help='每个关键词的页数')
+    parser.add_argument('--page-size', type=int, default=10, help='每页微博数')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟接口平均延迟(秒)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='模拟接口返回418的比例')
+    parser.add_argument('--ratelimit-rate', type=float, default=0.0, help='模拟接口返回429的比例')
+    parser.add_argument('--capacity', type=int, default=0, help='模拟接口同时处理的请求数上限（超出排队），0 表示不限')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='模拟接口请求卡住的比例（模拟失效的免费代理）')
+    parser.add_argument('--stall', type=float, default=5.0, help='卡住的请求的延迟(秒)')
+    parser.add_argument('--adaptive', action='store_true', help='启用自适应并发（--concurrency 为初始值）')
+    parser.add_argument('--hedging', action='store_true', help='启用对冲请求（需要至少2个代理）')
+    parser.add_argument('--breakers', action='store_true', help='启用按主机/代理的熔断器')
+    parser.add_argument('--rate', type=float, default=1000.0, help='限速器速率(请求/秒)，默认不限速')
+    parser.add_argument('--no-clean', action='store_true', help='不经过 DataCleaner，直接写入原始数据')
+    parser.add_argument('--no-warmup', action='store_true', help='不做预热（首轮包含分词词典、UA等一次性加载开销）')
+    parser.add_argument('--output', '-o', help='结果写入JSON文件（默认只打印）')
+
+
+def run(args) -> Dict:
+    """运行全部组合并输出JSON结果"""
+    concurrencies = parse_list(args.concurrency, int)
+    delays = parse_list(args.page_delay, float)
+    proxy_counts = parse_list(args.proxies, int)
+    
+    options = StubOptions(page_size=args.page_size, max_pages=args.pages, latency=args.latency,
+                          throttle_rate=args.throttle_rate, ratelimit_rate=args.ratelimit_rate,
+                          capacity=args.capacity, stall_rate=args.stall_rate, stall=args.stall)
+    ports = free_ports(max(1, max(proxy_counts)))
+    base_url = f"http://127.0.0.1:{ports[0]}"
+    
+    cleaner = None
+    if not args.no_clean:
+        from processors import DataCleaner
+        cleaner = DataCleaner()
+    
+    config = Config()
+    runs = []
+    with tempfile.TemporaryDirectory(prefix='aicity_bench_') as tmp, StubProcess(ports, options):
+        configure(config, Path(tmp), args)
+        if not args.no_warmup:
+            asyncio.run(run_once(config, args, cleaner, concurrencies[0], 0, [], base_url))
+        
+        for concurrency, delay, proxy_count in itertools.product(concurrencies, delays, proxy_counts):
+            proxies = [f"http://127.0.0.1:{port}" for port in ports[:proxy_count]]
+            result = asyncio.run(run_once(config, args, cleaner, concurrency, delay, proxies, base_url))
+            runs.append(result)
+            print(f"并发 {concurrency:>3} | 延迟 {delay:<4} | 代理 {proxy_count:>2} | "
+                  f"{result['pages_per_s']:>8} 页/秒 | {result['posts_per_s']:>9} 条/秒 | "
+                  f"p95 {result['latency_ms']['p95']} ms", file=sys.stderr)
+    
+    report = {
+        'benchmark': 'weibo_collect',
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'stub': asdict(options),
+        'workload': {'keywords': args.keywords, 'pages': args.pages, 'clean': not args.no_clean,
+                     'rate_limit': args.rate, 'adaptive': args.adaptive, 'hedging': args.hedging,
+                     'breakers': args.breakers, 'warmup': not args.no_warmup},
+        'runs': runs,
+    }
+    
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+        print(f"结果已写入: {args.output}", file=sys.stderr)
+    print(text)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端采集基准测试')
+    add_arguments(parser)
+    args = parser.parse_args()
+    
+    from core.logger import setup_logger
+    setup_logger()
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+微博解析基准测试 - 对比逐条 BeautifulSoup 解析与整页快速解析的吞吐
+
+Usage:
+    python benchmarks/bench_parse.py
+    python benchmarks/bench_parse.py --pages 200 --page-size 20
+"""
+
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+
+from core.models import RawData, SourceType, Author, Engagement
+from collectors import weibo_parser
+
+
+# 接近真实微博正文的标记：话题链接、@用户、表情图片、换行、实体、全文链接
+SNIPPETS = [
+    '<a  href="https://m.weibo.cn/search?containerid=231522type%3D1%26t%3D10%26q%3D%23{kw}%23&isnewpage=1" data-hide=""><span class="surl-text">#{kw}#</span></a>',
+    '<a href=\'/n/用户{n}\'>@用户{n}</a>',
+    '<span class="url-icon"><img alt=[doge] src="https://h5.sinaimg.cn/m/emoticon/icon/others/d_doge-be7f768d78.png" style="width:1em; height:1em;" /></span>',
+    '<br />',
+    '今天{kw}附近交通拥堵，已经排队半小时了&quot;希望尽快处理&quot;',
+    '供暖温度不达标，室内只有16℃ &amp; 物业一直不回复',
+    '<a href="/status/{n}">...全文</a>',
+    '路口积水严重，出行请注意安全！',
+]
+
+
+def make_page(page_size: int, keyword: str = '信阳') -> list:
+    """生成一页模拟的 cards 数组"""
+    cards = []
+    for _ in range(page_size):
+        n = random.randint(10 ** 15, 10 ** 16 - 1)
+        text = ''.join(random.choice(SNIPPETS) for _ in range(random.randint(4, 10)))
+        mblog = {
+            'id': str(n),
+            'mid': str(n),
+            'text': text.format(kw=keyword, n=n),
+            'created_at': 'Mon Dec 15 10:30:00 +0800 2025',
+            'user': {'id': n % 10 ** 9, 'screen_name': f'用户{n % 1000}',
+                     'followers_count': random.choice([12, '1.5万', '27.4万', 3000])},
+            'attitudes_count': random.randint(0, 500),
+            'comments_count': random.randint(0, 100),
+            'reposts_count': random.randint(0, 50),
+            'pics': [],
+        }
+        cards.append({'card_type': 9, 'mblog': mblog})
+    return cards
+
+
+def legacy_strip(text: str) -> str:
+    """原实现：为每条微博构建 BeautifulSoup 树提取文本"""
+    text = BeautifulSoup(text, 'lxml').get_text()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def legacy_parse(items: list, keyword: str) -> list:
+    """原实现的逐条解析（BeautifulSoup 剥离 + 构建模型）"""
+    results = []
+    for item in items:
+        weibo_id = item['id']
+        user = item.get('user', {})
+        results.append(RawData(
+            id=weibo_parser.record_id(weibo_id),
+            source=SourceType.WEIBO,
+            source_id=str(weibo_id),
+            url=f"https://m.weibo.cn/detail/{weibo_id}",
+            content=legacy_strip(item.get('text', '')),
+            publish_time=weibo_parser.parse_weibo_time(item.get('created_at', '')),
+            author=Author(id=str(user.get('id', '')), name=user.get('screen_name', ''),
+                          followers=weibo_parser.parse_count(user.get('followers_count', 0))),
+            engagement=Engagement(likes=item.get('attitudes_count', 0),
+                                  comments=item.get('comments_count', 0),
+                                  shares=item.get('reposts_count', 0)),
+            keywords=[keyword],
+            raw_json=item
+        ))
+    return results
+
+
+def bench(name: str, func, pages: list, page_size: int) -> float:
+    start = time.perf_counter()
+    func(pages)
+    elapsed = time.perf_counter() - start
+    rate = len(pages) * page_size / elapsed
+    print(f"{name:<28} {rate:>10,.0f} 条/秒  ({elapsed:.2f}s)")
+    return rate
+
+
+def run_in_pool(pool_cls, workers: int):
+    def run(pages: list):
+        async def go():
+            loop = asyncio.get_running_loop()
+            with pool_cls(max_workers=workers) as pool:
+                await asyncio.gather(*[
+                    loop.run_in_executor(pool, weibo_parser.parse_mblogs, items, '信阳')
+                    for items in pages
+                ])
+        asyncio.run(go())
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='微博解析基准测试')
+    parser.add_argument('--pages', type=int, default=100, help='页数')
+    parser.add_argument('--page-size', type=int, default=20, help='每页微博数')
+    parser.add_argument('--workers', type=int, default=2, help='线程/进程池大小')
+    args = parser.parse_args()
+    
+    random.seed(42)
+    pages = [weibo_parser.extract_mblogs(make_page(args.page_size)) for _ in range(args.pages)]
+    
+    # 一致性检查：快速剥离与 BeautifulSoup 结果相同
+    mismatches = sum(
+        weibo_parser.strip_html(item['text']) != legacy_strip(item['text'])
+        for items in pages
+        for item in items
+    )
+    print(f"文本一致性: {args.pages * args.page_size - mismatches}/{args.pages * args.page_size}")
+    
+    print('-- 文本剥离')
+    bench('BeautifulSoup', lambda ps: [[legacy_strip(i['text']) for i in items] for items in ps],
+          pages, args.page_size)
+    bench('strip_html', lambda ps: [[weibo_parser.strip_html(i['text']) for i in items] for items in ps],
+          pages, args.page_size)
+    
+    print('-- 完整解析（含模型构建）')
+    bench('逐条解析（原实现）', lambda ps: [legacy_parse(items, '信阳') for items in ps],
+          pages, args.page_size)
+    bench('整页解析 inline', lambda ps: [weibo_parser.parse_mblogs(items, '信阳') for items in ps],
+          pages, args.page_size)
+    bench(f'整页解析 thread x{args.workers}', run_in_pool(ThreadPoolExecutor, args.workers),
+          pages, args.page_size)
+    bench(f'整页解析 process x{args.workers}', run_in_pool(ProcessPoolExecutor, args.workers),
+          pages, args.page_size)
+
+
+if __name__ == '__main__':
+    main()
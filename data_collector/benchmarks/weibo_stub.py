@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+微博搜索接口模拟服务 - 模拟 m.weibo.cn/api/container/getIndex 的响应，用于采集吞吐基准测试
+
+在独立进程中运行，不占用被测进程的 CPU；可同时监听多个端口，
+基准测试以代理方式访问时每个端口相当于一个代理（收到绝对URL请求时直接应答）。
+
+Usage:
+    python benchmarks/weibo_stub.py --port 8900 --latency 0.05 --throttle-rate 0.01
+"""
+
+import sys
+import json
+import zlib
+import random
+import asyncio
+import argparse
+import multiprocessing
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import List
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiohttp import web
+
+from benchmarks.bench_parse import make_page
+
+
+API_PATH = '/api/container/getIndex'
+
+
+@dataclass
+class StubOptions:
+    """模拟服务参数"""
+    page_size: int = 10           # 每页微博数
+    max_pages: int = 50           # 每个搜索最多有内容的页数，之后返回 ok=0
+    latency: float = 0.05         # 平均响应延迟(秒)，按指数分布抖动
+    throttle_rate: float = 0.0    # 返回 418（反爬）的比例
+    ratelimit_rate: float = 0.0   # 返回 429（限流）的比例
+    capacity: int = 0             # 同时处理的请求数上限，超出时排队（模拟过载时延迟升高），0 表示不限
+    stall_rate: float = 0.0       # 请求卡住的比例（模拟失效的免费代理）
+    stall: float = 5.0            # 卡住的请求的延迟(秒)
+    templates: int = 64           # 预生成的页面模板数
+    seed: int = 42
+
+
+class WeiboStub:
+    """模拟接口：卡片内容来自预生成模板，微博ID按 (搜索, 页码) 确定，不同搜索不重复"""
+    
+    def __init__(self, options: StubOptions):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        random.seed(options.seed)
+        self.templates = [make_page(options.page_size) for _ in range(options.templates)]
+        self.stats = {'requests': 0, '418': 0, '429': 0, 'empty': 0}
+        self._capacity = asyncio.Semaphore(options.capacity) if options.capacity else None
+    
+    def _cards(self, containerid: str, page: int) -> List[dict]:
+        base = zlib.crc32(containerid.encode('utf-8')) % 10 ** 7
+        template = self.templates[(base + page) % len(self.templates)]
+        cards = []
+        for i, card in enumerate(template):
+            mid = str(10 ** 15 + base * 10 ** 6 + page * 100 + i)
+            mblog = dict(card['mblog'], id=mid, mid=mid)
+            cards.append({'card_type': 9, 'mblog': mblog})
+        # 真实接口的微博通常包在卡片组里
+        return [{'card_type': 11, 'card_group': cards}]
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        options = self.options
+        self.stats['requests'] += 1
+        
+        delay = self.rng.expovariate(1 / options.latency) if options.latency else 0.0
+        if options.stall_rate and self.rng.random() < options.stall_rate:
+            delay = options.stall
+        if delay:
+            if self._capacity is not None:
+                async with self._capacity:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(delay)
+        
+        roll = self.rng.random()
+        if roll < options.throttle_rate:
+            self.stats['418'] += 1
+            return web.Response(status=418, text='')
+        if roll < options.throttle_rate + options.ratelimit_rate:
+            self.stats['429'] += 1
+            return web.Response(status=429, text='', headers={'Retry-After': '1'})
+        
+        # containerid 自身包含未编码的 &q=，关键词落在 q 参数里
+        containerid = f"{request.query.get('containerid', '')}&q={request.query.get('q', '')}"
+        page = int(request.query.get('page', 1) or 1)
+        if page > options.max_pages:
+            self.stats['empty'] += 1
+            return web.json_response({'ok': 0, 'msg': '这里还没有内容', 'data': {'cards': []}})
+        
+        body = {
+            'ok': 1,
+            'data': {
+                'cardlistInfo': {'containerid': containerid, 'page': page + 1, 'total': options.max_pages},
+                'cards': self._cards(containerid, page)
+            }
+        }
+        return web.Response(
+            body=json.dumps(body, ensure_ascii=False).encode('utf-8'),
+            content_type='application/json', charset='utf-8'
+        )
+    
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+    
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(API_PATH, self.handle)
+        app.router.add_get('/stats', self.handle_stats)
+        return app
+
+
+async def _serve(ports: List[int], options: StubOptions, ready=None, stop=None):
+    stub = WeiboStub(options)
+    runner = web.AppRunner(stub.app(), access_log=None)
+    await runner.setup()
+    for port in ports:
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+    if ready is not None:
+        ready.set()
+    
+    try:
+        while stop is None or not stop.is_set():
+            await asyncio.sleep(0.2)
+    finally:
+        await runner.cleanup()
+
+
+def serve(ports: List[int], options: dict, ready=None, stop=None):
+    """进程入口"""
+    asyncio.run(_serve(ports, StubOptions(**options), ready, stop))
+
+
+class StubProcess:
+    """在子进程中运行模拟服务（with 语句中启动/停止）"""
+    
+    def __init__(self, ports: List[int], options: StubOptions):
+        self.ports = ports
+        self.options = options
+        self._ready = multiprocessing.Event()
+        self._stop = multiprocessing.Event()
+        self._process = multiprocessing.Process(
+            target=serve, args=(ports, asdict(options), self._ready, self._stop), daemon=True
+        )
+    
+    def __enter__(self) -> 'StubProcess':
+        self._process.start()
+        if not self._ready.wait(30):
+            self._process.terminate()
+            raise RuntimeError("模拟服务启动超时")
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='微博搜索接口模拟服务')
+    parser.add_argument('--port', type=int, default=8900, help='监听端口')
+    parser.add_argument('--page-size', type=int, default=10, help='每页微博数')
+    parser.add_argument('--max-pages', type=int, default=50, help='每个搜索有内容的页数')
+    parser.add_argument('--latency', type=float, default=0.05, help='平均响应延迟(秒)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='返回418的比例')
+    parser.add_argument('--ratelimit-rate', type=float, default=0.0, help='返回429的比例')
+    parser.add_argument('--capacity', type=int, default=0, help='同时处理的请求数上限，0 表示不限')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='请求卡住的比例')
+    parser.add_argument('--stall', type=float, default=5.0, help='卡住的请求的延迟(秒)')
+    args = parser.parse_args()
+    
+    options = StubOptions(page_size=args.page_size, max_pages=args.max_pages, latency=args.latency,
+                          throttle_rate=args.throttle_rate, ratelimit_rate=args.ratelimit_rate,
+                          capacity=args.capacity, stall_rate=args.stall_rate, stall=args.stall)
+    print(f"模拟服务: http://127.0.0.1:{args.port}{API_PATH}")
+    serve([args.port], asdict(options))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,10 +7,14 @@ from .weibo import WeiboCollector
 from .news import NewsCollector
 from .gov import GovCollector
 from .async_weibo import AsyncWeiboCollector
+from .async_news import AsyncNewsCollector
+from .async_gov import AsyncGovCollector
 
 __all__ = [
     'WeiboCollector',
     'NewsCollector', 
     'GovCollector',
-    'AsyncWeiboCollector'
+    'AsyncWeiboCollector',
+    'AsyncNewsCollector',
+    'AsyncGovCollector'
 ]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+新闻正文抽取 - 基于文本/标点密度的主内容识别（lxml）
+
+纯函数，不依赖采集器状态，可在线程池中调用。
+"""
+
+import re
+from typing import Dict, Optional
+
+from lxml import etree, html as lxml_html
+
+from core.logger import get_logger
+
+
+logger = get_logger('ArticleExtractor')
+
+# 与正文无关、直接删除的标签
+DROP_TAGS = (
+    'script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer',
+    'aside', 'form', 'button', 'select', 'textarea', 'svg'
+)
+
+# 段落级标签（div/li/td 等仅在没有块级子元素时视为段落）
+PARAGRAPH_TAGS = ('p', 'pre', 'blockquote', 'li', 'td', 'div')
+BLOCK_TAGS = frozenset(('p', 'div', 'article', 'section', 'main', 'table', 'ul', 'ol', 'pre', 'blockquote'))
+
+# 正文标点（中英文），标点越密集越像正文
+PUNCT_RE = re.compile(r'[。，！？；、：,.!?;:]')
+WHITESPACE_RE = re.compile(r'[ \t\r\f\v　\xa0]+')
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([a-zA-Z0-9_-]+)', re.IGNORECASE)
+
+# 少于该长度的段落不参与打分（导航、按钮、版权等短文本）
+MIN_PARAGRAPH_CHARS = 20
+
+
+def decode_html(body: bytes, encoding: str = None) -> str:
+    """解码网页：响应声明的编码 > meta charset > UTF-8 > GB18030"""
+    if not encoding:
+        match = META_CHARSET_RE.search(body[:4096])
+        if match:
+            encoding = match.group(1).decode('ascii').lower()
+            if encoding in ('gb2312', 'gbk'):
+                encoding = 'gb18030'
+    if encoding:
+        try:
+            return body.decode(encoding, errors='replace')
+        except LookupError:
+            pass
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError:
+        return body.decode('gb18030', errors='replace')
+
+
+def _clean_text(text: str) -> str:
+    """合并空白"""
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _link_density(element) -> float:
+    """链接文本占比"""
+    text_len = len(element.text_content()) or 1
+    link_len = sum(len(a.text_content()) for a in element.iter('a'))
+    return min(1.0, link_len / text_len)
+
+
+def _is_paragraph(element) -> bool:
+    """p/pre 总是段落，其余标签只有在不含块级子元素时才视为段落"""
+    if element.tag in ('p', 'pre'):
+        return True
+    return not any(child.tag in BLOCK_TAGS for child in element)
+
+
+def extract_main_text(html: str, min_chars: int = 100, max_chars: int = 20000) -> Optional[str]:
+    """
+    抽取网页正文
+    
+    每个段落按长度和标点数打分，分数累加到父节点（祖父节点减半），
+    再按链接密度折减，得分最高的节点即正文容器，输出其中各段落文本。
+    
+    Returns:
+        正文文本（段落以换行分隔），不足 min_chars 时返回None
+    """
+    if not html:
+        return None
+    
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError) as e:
+        logger.debug(f"网页解析失败: {e}")
+        return None
+    
+    etree.strip_elements(root, *DROP_TAGS, with_tail=False)
+    
+    scores: Dict = {}
+    for para in root.iter(*PARAGRAPH_TAGS):
+        if not _is_paragraph(para):
+            continue
+        text = para.text_content()
+        length = len(text.strip())
+        if length < MIN_PARAGRAPH_CHARS:
+            continue
+        
+        score = 1 + len(PUNCT_RE.findall(text)) + min(length // 100, 3)
+        parent = para.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    
+    if scores:
+        best = max(scores, key=lambda el: scores[el] * (1 - _link_density(el)))
+    else:
+        best = root.find('body')
+        if best is None:
+            best = root
+    
+    lines = []
+    for para in best.iter(*PARAGRAPH_TAGS):
+        if not _is_paragraph(para):
+            continue
+        line = _clean_text(para.text_content())
+        if line and _link_density(para) < 0.5:
+            lines.append(line)
+    text = '\n'.join(lines)
+    
+    if len(text) < min_chars:
+        # 正文直接写在容器里（无段落标签）
+        text = '\n'.join(
+            line for line in (_clean_text(t) for t in best.itertext()) if line
+        )
+    
+    if len(text) < min_chars:
+        return None
+    return text[:max_chars]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+异步政务数据采集器 - 多政务门户并发采集
+"""
+
+from typing import List, AsyncGenerator
+from urllib.parse import urljoin
+
+from core.async_base import AsyncBaseCollector
+from core.scheduler import PageScheduler, PageStream, PageResult
+from core.models import RawData, SourceType
+from collectors.gov import GovParserMixin
+
+
+class AsyncGovCollector(GovParserMixin, AsyncBaseCollector):
+    """异步政务数据采集器"""
+    
+    source_type = SourceType.GOV
+    
+    # 列表页类型 -> (数据源中的URL字段, 解析方法名)
+    LIST_PAGES = {
+        'gov_news': ('news_url', '_parse_gov_news'),
+        'complaint': ('complaint_url', '_parse_complaints'),
+    }
+    
+    async def collect(self, keywords: List[str], **kwargs) -> AsyncGenerator[RawData, None]:
+        """异步采集政务数据
+        
+        每个政务门户的各类列表页（政务公开、投诉建议）并发抓取，
+        关键词用于过滤列表标题。
+        """
+        sources = kwargs.get('sources', ['xinyang'])
+        max_items = kwargs.get('max_items', 100)
+        
+        streams = []
+        for source_name in sources:
+            source = self.GOV_SOURCES.get(source_name)
+            if not source:
+                continue
+            for page_type, (url_field, _) in self.LIST_PAGES.items():
+                if url_field in source:
+                    streams.append(PageStream(
+                        keyword=source_name, search_type=page_type, max_pages=1, context=source
+                    ))
+        
+        self.logger.info(f"采集政务数据: {sources} ({len(streams)} 个列表页)")
+        
+        scheduler = PageScheduler(
+            lambda stream, page: self._fetch_list_page(stream, page, keywords),
+            max_workers=self.max_workers,
+            stop_event=kwargs.get('stop_event')
+        )
+        
+        seen_ids = set()
+        count = 0
+        
+        async for result in scheduler.run(streams):
+            page_ids = []
+            for data in result.items:
+                if data.id in seen_ids or self._is_seen(data.id):
+                    continue
+                seen_ids.add(data.id)
+                self._mark_seen(data.id)
+                page_ids.append(data.id)
+                count += 1
+                yield data
+                
+                if count >= max_items:
+                    # 被截断的列表页不写入缓存，下次仍完整解析
+                    return
+            
+            self._store_after_commit(result.store, page_ids)
+    
+    async def _fetch_list_page(self, stream: PageStream, page: int, keywords: List[str]) -> PageResult:
+        """抓取并解析一个政务列表页"""
+        source = stream.context
+        url_field, parser_name = self.LIST_PAGES[stream.search_type]
+        url = urljoin(source['base_url'], source[url_field])
+        
+        # 列表页未变化（或请求失败）时跳过解析
+        html, store = await self._request_text_if_modified(url, variant=','.join(sorted(keywords)))
+        if not html:
+            self.logger.debug(f"{source['name']} 列表页无新内容: {url}")
+            return PageResult(stream=stream, page=page, has_more=False)
+        
+        items = getattr(self, parser_name)(html, source, keywords)
+        return PageResult(stream=stream, page=page, items=items, has_more=False, store=store)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+异步新闻采集器 - 多关键词、多新闻源并发搜索
+"""
+
+import asyncio
+from typing import List, Dict, Optional, AsyncGenerator, AsyncIterator, Callable, Tuple
+from urllib.parse import urlsplit
+
+from core.async_base import AsyncBaseCollector
+from core.http_cache import ResponseCache
+from core.scheduler import PageScheduler, PageStream, PageResult
+from core.models import RawData, SourceType
+from collectors.news import NewsParserMixin
+from collectors import article_extractor
+
+
+class AsyncNewsCollector(NewsParserMixin, AsyncBaseCollector):
+    """异步新闻采集器"""
+    
+    source_type = SourceType.NEWS
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.sources = self.config.news.get('sources', [])
+        
+        # 正文抓取：每个站点的并发上限
+        self.content_per_domain = self.config.news.get('content_per_domain', 2)
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # 正文缓存与列表页缓存分开，正文不会挤掉列表页的 ETag 条目
+        self.article_cache = ResponseCache.from_config(self.config, namespace='article') \
+            if self.http_cache else None
+    
+    async def collect(self, keywords: List[str], **kwargs) -> AsyncGenerator[RawData, None]:
+        """异步采集新闻数据
+        
+        每个 (关键词, 新闻源) 是一次搜索，由 PageScheduler 并发执行，
+        共享会话、并发信号量、限速器与代理轮换。
+        full_content=True 时为每条新闻并发抓取正文（见 enrich）。
+        """
+        records = self._search(keywords, **kwargs)
+        if kwargs.get('full_content', self.config.news.get('full_content', False)):
+            records = self.enrich(records)
+        
+        async for data in records:
+            yield data
+    
+    async def _search(self, keywords: List[str], **kwargs) -> AsyncGenerator[RawData, None]:
+        """搜索各新闻源，产出去重后的新闻（内容为标题+摘要）"""
+        max_articles = kwargs.get('max_articles', self.config.news.get('max_articles', 100))
+        sources = kwargs.get('sources', ['baidu'])
+        
+        streams = [
+            PageStream(keyword=keyword, search_type=source_name, max_pages=1,
+                       context=self.NEWS_SOURCES[source_name])
+            for keyword in keywords
+            for source_name in sources
+            if source_name in self.NEWS_SOURCES
+        ]
+        self.logger.info(f"搜索新闻关键词: {len(keywords)} 个, 新闻源: {sources}")
+        
+        scheduler = PageScheduler(self._search_stream, max_workers=self.max_workers,
+                                  stop_event=kwargs.get('stop_event'))
+        
+        seen_urls = set()
+        count = 0
+        
+        async for result in scheduler.run(streams):
+            page_ids = []
+            for item in result.items:
+                if item.get('url') in seen_urls:
+                    continue
+                if self._is_seen(self._generate_id('news', item.get('url', ''))):
+                    continue
+                
+                data = self.parse_item(item, result.stream.keyword)
+                if data:
+                    seen_urls.add(item.get('url'))
+                    self._mark_seen(data.id)
+                    page_ids.append(data.id)
+                    count += 1
+                    yield data
+                
+                if count >= max_articles:
+                    # 被截断的结果页不写入缓存，下次仍完整解析
+                    return
+            
+            self._store_after_commit(result.store, page_ids)
+    
+    async def _search_stream(self, stream: PageStream, page: int) -> PageResult:
+        """执行一次新闻搜索"""
+        source = stream.context
+        items, store = await self._search_news(source, stream.keyword)
+        return PageResult(stream=stream, page=page, items=items, has_more=False, store=store)
+    
+    async def _search_news(self, source: Dict, keyword: str) -> Tuple[List[Dict], Optional[Callable]]:
+        """搜索新闻，返回 (结果, 结果页缓存条目的写入函数)"""
+        url = source['search_url']
+        params = source['params'](keyword)
+        
+        # 结果页未变化（或请求失败）时跳过解析
+        html, store = await self._request_text_if_modified(url, params=params)
+        if not html:
+            self.logger.debug(f"搜索 {source['name']} 无新内容: {keyword}")
+            return [], None
+        
+        return self._parse_search_results(url, html), store
+    
+    async def enrich(self, records: AsyncIterator[RawData],
+                     workers: int = None) -> AsyncGenerator[RawData, None]:
+        """
+        正文补全：边搜索边抓取正文，按完成顺序产出
+        
+        最多 workers 篇正文同时在途（另受全局信号量、按主机限速和
+        content_per_domain 约束），抓取失败的新闻保留原有标题+摘要。
+        """
+        workers = workers or self.config.news.get('content_workers', 20)
+        pending = set()
+        
+        try:
+            async for data in records:
+                if len(pending) >= workers:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.create_task(self._attach_full_content(data)))
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _attach_full_content(self, data: RawData) -> RawData:
+        """抓取正文并替换记录内容"""
+        try:
+            text = await self.fetch_full_content(data.url)
+        except Exception as e:
+            self.logger.warning(f"获取新闻全文出错 {data.url}: {e}")
+            return data
+        
+        if text:
+            data.content = f"{data.title}\n{text}"
+        return data
+    
+    def _domain_semaphore(self, url: str) -> asyncio.Semaphore:
+        """按站点的并发信号量"""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._domain_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._domain_semaphores[host] = asyncio.Semaphore(self.content_per_domain)
+        return semaphore
+    
+    async def fetch_full_content(self, url: str) -> Optional[str]:
+        """获取新闻全文：已缓存正文的网页不再请求，缓存读写与正文抽取在线程中执行"""
+        key = self.article_cache.make_key(url) if self.article_cache else None
+        body = await asyncio.to_thread(self.article_cache.get_body, key) if key else None
+        encoding = None
+        
+        if body is None:
+            async with self._domain_semaphore(url):
+                result = await self._fetch(url, retry_count=1, cache_result=False)
+            if not result.ok:
+                return None
+            body, encoding = result.body, result.encoding
+            if key:
+                await asyncio.to_thread(self.article_cache.store, key, result.url, body, result.headers)
+        else:
+            self.logger.debug(f"正文已缓存: {url}")
+        
+        html = article_extractor.decode_html(body, encoding)
+        return await asyncio.to_thread(
+            article_extractor.extract_main_text, html,
+            max_chars=self.config.news.get('content_max_chars', 20000)
+        )
+    
+    async def close(self):
+        """关闭会话与正文缓存"""
+        await super().close()
+        if self.article_cache:
+            self.article_cache.close()
+    
+    def get_stats(self) -> Dict:
+        """采集统计（含正文缓存）"""
+        stats = super().get_stats()
+        stats['article_cache'] = self.article_cache.get_statistics() if self.article_cache else None
+        return stats
@@ -3,16 +3,16 @@
 异步微博采集器 - 高性能并发版本
 """
 
-import re
 import asyncio
-from datetime import datetime
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
 from urllib.parse import quote
 
-from bs4 import BeautifulSoup
-
 from core.async_base import AsyncBaseCollector
-from core.models import RawData, SourceType, Author, Engagement, Location
+from core.scheduler import PageScheduler, PageStream, PageResult
+from core.watermark import WatermarkStore
+from core.models import RawData, SourceType
+from collectors import weibo_parser
 
 
 class AsyncWeiboCollector(AsyncBaseCollector):
@@ -22,10 +22,24 @@ class AsyncWeiboCollector(AsyncBaseCollector):
     
     SEARCH_URL = "https://m.weibo.cn/api/container/getIndex"
     
+    # 按时间倒序返回的搜索类型，可用水位线提前停止翻页
+    CHRONOLOGICAL_TYPES = ('realtime',)
+    
     def __init__(self, config=None):
         super().__init__(config)
         self.cookie = self.config.weibo.get('cookie', '')
         self.max_concurrent = 3  # 微博限制并发数，降低以避免被封
+        self.watermarks = WatermarkStore(
+            self.config.weibo.get('watermark_file', './output/.weibo_watermarks.json')
+        )
+        
+        # 页面解析执行方式：inline（事件循环内）/ thread / process
+        self.parse_executor = self.config.weibo.get('parse_executor', 'inline')
+        self.parse_workers = self.config.weibo.get('parse_workers', 2)
+        self._parse_pool: Optional[Executor] = None
+        
+        # 最近一次 collect 中因请求失败而停止的分页流: (关键词, 搜索类型, 页码)
+        self.failed_streams: List[Tuple[str, str, int]] = []
         
         # 微博专用请求头
         self.weibo_headers = {
@@ -46,36 +60,143 @@ class AsyncWeiboCollector(AsyncBaseCollector):
             self.logger.info(f"已设置Cookie到请求头 (长度: {len(self.cookie)})")
     
     async def collect(self, keywords: List[str], **kwargs) -> AsyncGenerator[RawData, None]:
-        """异步采集微博数据"""
+        """异步采集微博数据
+
+        所有 (关键词, 搜索类型) 分页流交给 PageScheduler 并发调度，
+        同一分页流内按页顺序抓取，结果按完成顺序流式产出。
+        
+        增量模式下，实时搜索在整页都不新于上次水位线（或早于 since）时停止翻页；
+        分页流无请求失败地结束且结果已产出后才推进水位线；某页请求失败时该流停止，
+        PageResult.error 记录失败原因，水位线与分页游标都不越过失败的页。
+        
+        断点续传：cursors 为 {关键词: {搜索类型: 最后完成的页}}，从下一页继续；finished 为
+        {关键词: [已翻完的搜索类型]}，这些分页流不再请求；
+        每页成功抓取且数据全部产出后 await on_page(关键词, 搜索类型, 页码, 是否已翻完)，
+        调用方可在此落盘并记录游标；请求失败的页不回调，游标不越过它；
+        stop_event 置位后不再发起新页面请求，在途页面完成后正常结束。
+        
+        page_budget 为 {关键词: 页数}，按关键词覆盖 max_pages（见 KeywordBandit）。
+        """
         max_pages = kwargs.get('max_pages', self.config.weibo.get('max_pages', 10))
         search_types = kwargs.get('search_types', self.config.weibo.get('search_types', ['realtime']))
+        page_delay = kwargs.get('page_delay', self.config.weibo.get('page_delay', 0.5))
+        incremental = kwargs.get('incremental', self.config.weibo.get('incremental', True))
+        since = kwargs.get('since')
+        start_page = kwargs.get('start_page', 1)
+        cursors = kwargs.get('cursors') or {}
+        finished_types = kwargs.get('finished') or {}
+        on_page = kwargs.get('on_page')
+        page_budget = kwargs.get('page_budget') or {}
+        
+        streams = [
+            PageStream(keyword=keyword, search_type=search_type,
+                       max_pages=page_budget.get(keyword, max_pages),
+                       start_page=cursors.get(keyword, {}).get(search_type, start_page - 1) + 1,
+                       context={
+                           'containerid': self._get_containerid(keyword, search_type),
+                           'watermark': self.watermarks.get(keyword, search_type) if incremental else None,
+                           'since': since,
+                           'newest': None,
+                       })
+            for keyword in keywords
+            for search_type in search_types
+            if search_type not in finished_types.get(keyword, ())
+        ]
+        self.logger.info(f"搜索关键词: {keywords} ({len(streams)} 个分页流, 并发 {self.concurrency.describe()})")
+        
+        scheduler = PageScheduler(
+            self._fetch_stream_page,
+            max_workers=self.max_workers,
+            page_delay=page_delay,
+            stop_event=kwargs.get('stop_event')
+        )
         
         seen_ids = set()
+        self.failed_streams = []
+        
+        async for result in scheduler.run(streams):
+            # 先按ID去重（本次 + 往次运行），命中则跳过解析和模型构建
+            fresh = []
+            for item in result.items:
+                record_id = weibo_parser.record_id(item.get('id') or item.get('mid'))
+                if record_id not in seen_ids and not self._is_seen(record_id):
+                    seen_ids.add(record_id)
+                    fresh.append(item)
+            
+            for data in await self._parse_page(fresh, result.stream.keyword):
+                self._mark_seen(data.id)
+                yield data
+            
+            # 分页流无错误地翻到水位线/末页/max_pages 才算翻完（请求失败的页之后的微博未采集）
+            stream = result.stream
+            finished = result.error is None and (not result.has_more or result.page >= stream.max_pages)
+            if result.error is not None:
+                self.failed_streams.append((stream.keyword, stream.search_type, result.page))
+            elif on_page is not None:
+                await on_page(stream.keyword, stream.search_type, result.page, finished)
+            
+            # 从中间页恢复的流看不到前面更新的微博，不推进水位线
+            if incremental and stream.start_page == 1 and finished:
+                self._commit_watermark(stream)
+    
+    async def _fetch_stream_page(self, stream: PageStream, page: int) -> PageResult:
+        """抓取分页流的一页，过滤已采集/过旧的微博，并判断是否继续翻页"""
+        context = stream.context
+        items = await self._fetch_page(context['containerid'], page)
+        
+        # 请求失败（限流、非200、非JSON、网络异常）：停止该流，不当作已到末尾
+        if items is None:
+            return PageResult(stream=stream, page=page, items=[], has_more=False,
+                              error=f"第{page}页请求失败")
+        
+        # 空页面：第一页可能是偶发失败，继续尝试下一页；之后的空页视为已到末尾或被限制
+        if not items:
+            return PageResult(stream=stream, page=page, items=[], has_more=page == stream.start_page)
+        
+        chronological = stream.search_type in self.CHRONOLOGICAL_TYPES
+        watermark = context['watermark'] if chronological else None
+        since = context['since']
         
-        for keyword in keywords:
-            self.logger.info(f"搜索关键词: {keyword}")
+        fresh = []
+        for item in items:
+            mid = self._item_mid(item)
+            if watermark and mid and mid <= watermark.mid:
+                continue
             
-            for search_type in search_types:
-                containerid = self._get_containerid(keyword, search_type)
-                
-                # 串行获取，避免触发反爬虫
-                for page in range(1, max_pages + 1):
-                    page_items = await self._fetch_page(containerid, page)
-                    
-                    if not page_items:
-                        # 空页面，可能已到末尾或被限制
-                        if page > 1:
-                            break
-                        continue
-                    
-                    for item in page_items:
-                        data = await self.parse_item(item, keyword)
-                        if data and data.id not in seen_ids:
-                            seen_ids.add(data.id)
-                            yield data
-                    
-                    # 页间延迟，避免请求过快
-                    await asyncio.sleep(0.5)
+            publish_time = weibo_parser.parse_weibo_time(item.get('created_at', ''))
+            if since and publish_time < since:
+                continue
+            
+            fresh.append(item)
+            newest = context['newest']
+            if mid and (newest is None or mid > newest[0]):
+                context['newest'] = (mid, publish_time)
+        
+        # 时间倒序的流：整页都不新于水位线或早于截止时间，后续页只会更旧
+        has_more = bool(fresh) or not chronological or not (watermark or since)
+        if not has_more:
+            self.logger.info(f"[{stream.keyword}/{stream.search_type}] 第{page}页已无新内容，停止翻页")
+        return PageResult(stream=stream, page=page, items=fresh, has_more=has_more)
+    
+    def _commit_watermark(self, stream: PageStream):
+        """分页流结束后推进水位线"""
+        newest = stream.context['newest']
+        if stream.search_type in self.CHRONOLOGICAL_TYPES and newest:
+            self.watermarks.update(stream.keyword, stream.search_type, newest[0], newest[1])
+    
+    @staticmethod
+    def _item_mid(item: Dict[str, Any]) -> int:
+        """微博数字ID，无法解析时返回0"""
+        mid = str(item.get('mid') or item.get('id') or '')
+        return int(mid) if mid.isdigit() else 0
+    
+    def _identity(self, proxy: Optional[str] = None) -> Optional[str]:
+        """请求身份：代理优先，否则按Cookie区分账号"""
+        if proxy:
+            return proxy
+        if self.cookie:
+            return f"cookie:{self._generate_id('cookie', self.cookie)}"
+        return None
     
     def _get_containerid(self, keyword: str, search_type: str = 'realtime') -> str:
         """获取搜索容器ID"""
@@ -84,170 +205,81 @@ class AsyncWeiboCollector(AsyncBaseCollector):
         type_code = type_map.get(search_type, '61')
         return f"100103type={type_code}&q={encoded_keyword}"
     
-    async def _fetch_page(self, containerid: str, page: int) -> List[Dict]:
-        """异步获取一页数据"""
+    async def _fetch_page(self, containerid: str, page: int) -> Optional[List[Dict]]:
+        """异步获取一页数据，请求失败返回None，没有内容返回空列表"""
         url = f"{self.SEARCH_URL}?containerid={containerid}&page_type=searchall&page={page}"
         
-        # 使用微博专用请求头
-        headers = self.weibo_headers.copy()
-        headers['User-Agent'] = self.ua.random
+        # 使用微博专用请求头（UA 由 _fetch 按代理/Cookie身份绑定）
+        result = await self._fetch(url, headers=self.weibo_headers, retry_count=1)
+        if result.status == 418:
+            # 反爬虫限制，退避由限速器的乘性减速和冷却完成
+            self.logger.warning(f"HTTP 418 反爬虫限制，降低请求速率")
+            return None
+        if not result.ok:
+            return None
+        
+        if 'json' not in result.content_type:
+            text = result.text()
+            if 'passport' in text or 'login' in text.lower():
+                self.logger.warning(f"需要更新Cookie，当前Cookie已失效")
+            else:
+                self.logger.debug(f"非JSON响应: {text[:200]}")
+            self.error_count += 1
+            return None
         
-        data = None
         try:
-            async with self.semaphore:
-                async with self.session.get(url, headers=headers) as response:
-                    self.request_count += 1
-                    if response.status == 200:
-                        content_type = response.headers.get('Content-Type', '')
-                        if 'json' in content_type:
-                            data = await response.json(content_type=None)
-                        else:
-                            text = await response.text()
-                            if 'passport' in text or 'login' in text.lower():
-                                self.logger.warning(f"需要更新Cookie，当前Cookie已失效")
-                            else:
-                                self.logger.debug(f"非JSON响应: {text[:200]}")
-                            self.error_count += 1
-                            return []
-                    elif response.status == 418:
-                        # 反爬虫限制，需要退避
-                        self.logger.warning(f"HTTP 418 反爬虫限制，等待退避...")
-                        self.error_count += 1
-                        await asyncio.sleep(3)  # 退避3秒
-                        return []
-                    else:
-                        self.logger.warning(f"HTTP {response.status}")
-                        self.error_count += 1
-                        return []
-        except Exception as e:
+            data = result.json()
+        except ValueError as e:
             self.error_count += 1
-            self.logger.error(f"请求失败: {e}")
-            return []
+            self.logger.error(f"JSON解析失败: {e}")
+            return None
         
         if not data:
+            self._mark_empty_page(url, headers=self.weibo_headers)
             return []
         
         if data.get('ok') != 1:
             msg = data.get('msg', '')
             self.logger.warning(f"API返回: ok={data.get('ok')}, msg={msg}")
+            self._mark_empty_page(url, headers=self.weibo_headers)
             return []
         
         cards = data.get('data', {}).get('cards', [])
         if page == 1:
             self.logger.info(f"API返回: ok=1, cards={len(cards)}, keys={list(data.get('data', {}).keys())}")
-        items = []
-        
-        for card in cards:
-            if card.get('card_type') == 9:
-                mblog = card.get('mblog')
-                if mblog:
-                    items.append(mblog)
-            elif card.get('card_type') == 11:
-                for sub_card in card.get('card_group', []):
-                    if sub_card.get('card_type') == 9:
-                        mblog = sub_card.get('mblog')
-                        if mblog:
-                            items.append(mblog)
-        
-        return items
+        
+        mblogs = weibo_parser.extract_mblogs(cards)
+        if not mblogs:
+            self._mark_empty_page(url, headers=self.weibo_headers)
+        return mblogs
     
-    async def parse_item(self, item: Dict[str, Any], keyword: str = None) -> Optional[RawData]:
-        """解析微博数据"""
-        try:
-            weibo_id = item.get('id') or item.get('mid')
-            if not weibo_id:
-                return None
-            
-            # 内容
-            text = item.get('text', '')
-            text_clean = BeautifulSoup(text, 'lxml').get_text()
-            text_clean = re.sub(r'\s+', ' ', text_clean).strip()
-            
-            if not text_clean:
-                return None
-            
-            # 时间
-            created_at = item.get('created_at', '')
-            publish_time = self._parse_weibo_time(created_at)
-            
-            # 作者
-            user = item.get('user', {})
-            followers_raw = user.get('followers_count', 0)
-            followers = self._parse_count(followers_raw)
-            
-            author = Author(
-                id=str(user.get('id', '')),
-                name=user.get('screen_name', ''),
-                avatar=user.get('profile_image_url', ''),
-                followers=followers,
-                verified=user.get('verified', False)
-            )
-            
-            # 互动
-            engagement = Engagement(
-                likes=item.get('attitudes_count', 0),
-                comments=item.get('comments_count', 0),
-                shares=item.get('reposts_count', 0)
-            )
-            
-            # 图片
-            pics = item.get('pics', [])
-            images = [pic.get('large', {}).get('url', pic.get('url', '')) for pic in pics]
-            
-            return RawData(
-                id=self._generate_id('weibo', weibo_id),
-                source=SourceType.WEIBO,
-                source_id=str(weibo_id),
-                url=f"https://m.weibo.cn/detail/{weibo_id}",
-                content=text_clean,
-                images=images,
-                publish_time=publish_time,
-                author=author,
-                engagement=engagement,
-                keywords=[keyword] if keyword else [],
-                raw_json=item
-            )
-            
-        except Exception as e:
-            self.logger.error(f"解析微博数据出错: {e}")
-            return None
+    def _get_parse_pool(self) -> Optional[Executor]:
+        """按配置懒加载解析线程池/进程池"""
+        if self._parse_pool is None and self.parse_executor in ('thread', 'process'):
+            pool_cls = ProcessPoolExecutor if self.parse_executor == 'process' else ThreadPoolExecutor
+            self._parse_pool = pool_cls(max_workers=self.parse_workers)
+            self.logger.info(f"微博解析使用{self.parse_executor}池 ({self.parse_workers} 个工作者)")
+        return self._parse_pool
     
-    def _parse_count(self, value) -> int:
-        """解析数量（处理 '1.5万'、'27.4万' 等格式）"""
-        if isinstance(value, int):
-            return value
-        if not value:
-            return 0
-        
-        value_str = str(value).strip()
-        
-        try:
-            # 尝试直接转换
-            return int(value_str)
-        except ValueError:
-            pass
-        
-        # 处理中文数字单位
-        multipliers = {'万': 10000, '亿': 100000000}
+    async def _parse_page(self, items: List[Dict[str, Any]], keyword: str = None) -> List[RawData]:
+        """整页解析，按配置在事件循环外执行"""
+        if not items:
+            return []
         
-        for unit, mult in multipliers.items():
-            if unit in value_str:
-                num_str = value_str.replace(unit, '').strip()
-                try:
-                    return int(float(num_str) * mult)
-                except ValueError:
-                    pass
+        pool = self._get_parse_pool()
+        if pool is None:
+            return weibo_parser.parse_mblogs(items, keyword)
         
-        return 0
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, weibo_parser.parse_mblogs, items, keyword)
     
-    def _parse_weibo_time(self, time_str: str) -> datetime:
-        """解析微博时间"""
-        if not time_str:
-            return datetime.now()
-        
-        try:
-            return datetime.strptime(time_str, '%a %b %d %H:%M:%S %z %Y').replace(tzinfo=None)
-        except ValueError:
-            pass
-        
-        return self._parse_time(time_str)
+    async def parse_item(self, item: Dict[str, Any], keyword: str = None) -> Optional[RawData]:
+        """解析微博数据"""
+        return weibo_parser.parse_mblog(item, keyword)
+    
+    async def close(self):
+        """关闭会话和解析池"""
+        await super().close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
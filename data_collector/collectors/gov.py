@@ -14,10 +14,8 @@ from core.base import BaseCollector
 from core.models import RawData, SourceType, Location
 
 
-class GovCollector(BaseCollector):
-    """政务数据采集器"""
-    
-    source_type = SourceType.GOV
+class GovParserMixin:
+    """政务列表页解析（同步/异步采集器共用）"""
     
     # 政务数据源
     GOV_SOURCES = {
@@ -34,161 +32,115 @@ class GovCollector(BaseCollector):
         }
     }
     
-    def __init__(self, config=None):
-        super().__init__(config)
-    
-    def collect(self, keywords: List[str], **kwargs) -> Generator[RawData, None, None]:
-        """采集政务数据"""
-        sources = kwargs.get('sources', ['xinyang'])
-        max_items = kwargs.get('max_items', 100)
-        delay_range = kwargs.get('delay_range', [1, 3])
+    def _parse_gov_news(self, html: str, source: Dict, keywords: List[str]) -> List[RawData]:
+        """解析政务公开列表页"""
+        base_url = source['base_url']
+        soup = BeautifulSoup(html, 'lxml')
+        results = []
         
-        count = 0
+        # 查找新闻列表
+        items = soup.select('.news-list li, .list-item, .zwgk-list li, ul.list li')
         
-        for source_name in sources:
-            if count >= max_items:
-                break
-                
-            source = self.GOV_SOURCES.get(source_name)
-            if not source:
-                continue
-            
-            self.logger.info(f"采集政务数据: {source['name']}")
-            
+        for item in items:
             try:
-                # 采集政务公开
-                if 'news_url' in source:
-                    for item in self._collect_gov_news(source, keywords):
-                        if count >= max_items:
-                            break
-                        count += 1
-                        yield item
-                        self._delay(delay_range)
+                link = item.select_one('a')
+                if not link:
+                    continue
                 
-                # 采集投诉建议
-                if 'complaint_url' in source:
-                    for item in self._collect_complaints(source, keywords):
-                        if count >= max_items:
-                            break
-                        count += 1
-                        yield item
-                        self._delay(delay_range)
-                        
+                title = link.get_text(strip=True)
+                url = urljoin(base_url, link.get('href', ''))
+                
+                # 检查关键词匹配
+                keyword = self._matched_keyword(title, keywords)
+                if keyword is None:
+                    continue
+                
+                # 日期
+                date_elem = item.select_one('.date, .time, span')
+                date_str = date_elem.get_text(strip=True) if date_elem else ''
+                
+                data = self.parse_item({
+                    'title': title,
+                    'url': url,
+                    'date': date_str,
+                    'source_name': source['name'],
+                    'type': 'gov_news'
+                }, keyword or None)
+                
+                if data:
+                    results.append(data)
+                    
             except Exception as e:
-                self.logger.error(f"采集 {source['name']} 出错: {e}")
+                self.logger.debug(f"解析政务新闻项出错: {e}")
                 continue
-    
-    def _collect_gov_news(self, source: Dict, keywords: List[str]) -> Generator[RawData, None, None]:
-        """采集政务公开信息"""
-        base_url = source['base_url']
-        news_url = urljoin(base_url, source['news_url'])
         
-        try:
-            response = self._request(news_url)
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # 查找新闻列表
-            items = soup.select('.news-list li, .list-item, .zwgk-list li, ul.list li')
-            
-            for item in items:
-                try:
-                    link = item.select_one('a')
-                    if not link:
-                        continue
-                    
-                    title = link.get_text(strip=True)
-                    url = urljoin(base_url, link.get('href', ''))
-                    
-                    # 检查关键词匹配
-                    if not self._match_keywords(title, keywords):
-                        continue
-                    
-                    # 日期
-                    date_elem = item.select_one('.date, .time, span')
-                    date_str = date_elem.get_text(strip=True) if date_elem else ''
-                    
-                    data = self.parse_item({
-                        'title': title,
-                        'url': url,
-                        'date': date_str,
-                        'source_name': source['name'],
-                        'type': 'gov_news'
-                    })
-                    
-                    if data:
-                        yield data
-                        
-                except Exception as e:
-                    self.logger.debug(f"解析政务新闻项出错: {e}")
-                    continue
-                    
-        except Exception as e:
-            self.logger.error(f"采集政务新闻出错: {e}")
+        return results
     
-    def _collect_complaints(self, source: Dict, keywords: List[str]) -> Generator[RawData, None, None]:
-        """采集投诉建议数据"""
+    def _parse_complaints(self, html: str, source: Dict, keywords: List[str]) -> List[RawData]:
+        """解析投诉建议列表页"""
         base_url = source['base_url']
-        complaint_url = urljoin(base_url, source.get('complaint_url', ''))
+        soup = BeautifulSoup(html, 'lxml')
+        results = []
         
-        if not complaint_url:
-            return
+        # 查找投诉列表
+        items = soup.select('.complaint-list li, .ywzs-list li, table tr')
         
-        try:
-            response = self._request(complaint_url)
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # 查找投诉列表
-            items = soup.select('.complaint-list li, .ywzs-list li, table tr')
-            
-            for item in items:
-                try:
-                    # 标题/内容
-                    title_elem = item.select_one('a, .title, td:first-child')
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    url = ''
-                    if title_elem.name == 'a':
-                        url = urljoin(base_url, title_elem.get('href', ''))
-                    
-                    # 检查关键词
-                    if not self._match_keywords(title, keywords):
-                        continue
-                    
-                    # 状态
-                    status_elem = item.select_one('.status, .state, td:last-child')
-                    status = status_elem.get_text(strip=True) if status_elem else ''
-                    
-                    # 日期
-                    date_elem = item.select_one('.date, .time')
-                    date_str = date_elem.get_text(strip=True) if date_elem else ''
-                    
-                    data = self.parse_item({
-                        'title': title,
-                        'url': url,
-                        'date': date_str,
-                        'status': status,
-                        'source_name': source['name'],
-                        'type': 'complaint'
-                    })
-                    
-                    if data:
-                        yield data
-                        
-                except Exception as e:
-                    self.logger.debug(f"解析投诉项出错: {e}")
+        for item in items:
+            try:
+                # 标题/内容
+                title_elem = item.select_one('a, .title, td:first-child')
+                if not title_elem:
                     continue
+                
+                title = title_elem.get_text(strip=True)
+                url = ''
+                if title_elem.name == 'a':
+                    url = urljoin(base_url, title_elem.get('href', ''))
+                
+                # 检查关键词
+                keyword = self._matched_keyword(title, keywords)
+                if keyword is None:
+                    continue
+                
+                # 状态
+                status_elem = item.select_one('.status, .state, td:last-child')
+                status = status_elem.get_text(strip=True) if status_elem else ''
+                
+                # 日期
+                date_elem = item.select_one('.date, .time')
+                date_str = date_elem.get_text(strip=True) if date_elem else ''
+                
+                data = self.parse_item({
+                    'title': title,
+                    'url': url,
+                    'date': date_str,
+                    'status': status,
+                    'source_name': source['name'],
+                    'type': 'complaint'
+                }, keyword or None)
+                
+                if data:
+                    results.append(data)
                     
-        except Exception as e:
-            self.logger.error(f"采集投诉数据出错: {e}")
+            except Exception as e:
+                self.logger.debug(f"解析投诉项出错: {e}")
+                continue
+        
+        return results
     
     def _match_keywords(self, text: str, keywords: List[str]) -> bool:
         """检查文本是否匹配关键词"""
+        return self._matched_keyword(text, keywords) is not None
+    
+    def _matched_keyword(self, text: str, keywords: List[str]) -> Optional[str]:
+        """返回文本命中的第一个关键词，未配置关键词时返回空串，未命中返回None"""
         if not keywords:
-            return True
+            return ''
         text_lower = text.lower()
-        return any(kw.lower() in text_lower for kw in keywords)
+        for kw in keywords:
+            if kw.lower() in text_lower:
+                return kw
+        return None
     
     def parse_item(self, item: Dict[str, Any], keyword: str = None) -> Optional[RawData]:
         """解析政务数据"""
@@ -232,3 +184,90 @@ class GovCollector(BaseCollector):
         except Exception as e:
             self.logger.error(f"解析政务数据出错: {e}")
             return None
+
+
+class GovCollector(GovParserMixin, BaseCollector):
+    """政务数据采集器"""
+    
+    source_type = SourceType.GOV
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+    
+    def collect(self, keywords: List[str], **kwargs) -> Generator[RawData, None, None]:
+        """采集政务数据"""
+        sources = kwargs.get('sources', ['xinyang'])
+        max_items = kwargs.get('max_items', 100)
+        delay_range = kwargs.get('delay_range', [1, 3])
+        
+        count = 0
+        
+        for source_name in sources:
+            if count >= max_items:
+                break
+                
+            source = self.GOV_SOURCES.get(source_name)
+            if not source:
+                continue
+            
+            self.logger.info(f"采集政务数据: {source['name']}")
+            
+            try:
+                # 采集政务公开
+                if 'news_url' in source:
+                    for item in self._collect_gov_news(source, keywords):
+                        if count >= max_items:
+                            break
+                        if self._is_seen(item.id):
+                            continue
+                        self._mark_seen(item.id)
+                        count += 1
+                        yield item
+                        self._delay(delay_range)
+                
+                # 采集投诉建议
+                if 'complaint_url' in source:
+                    for item in self._collect_complaints(source, keywords):
+                        if count >= max_items:
+                            break
+                        if self._is_seen(item.id):
+                            continue
+                        self._mark_seen(item.id)
+                        count += 1
+                        yield item
+                        self._delay(delay_range)
+                        
+            except Exception as e:
+                self.logger.error(f"采集 {source['name']} 出错: {e}")
+                continue
+    
+    def _collect_gov_news(self, source: Dict, keywords: List[str]) -> Generator[RawData, None, None]:
+        """采集政务公开信息"""
+        news_url = urljoin(source['base_url'], source['news_url'])
+        
+        try:
+            # 列表页未变化时跳过解析
+            html, store = self._request_if_modified(news_url, variant=','.join(sorted(keywords)))
+            if html is not None:
+                yield from self._parse_gov_news(html, source, keywords)
+                # 列表页全部产出后才写入缓存（调用方达到条数上限提前停止时不会执行到这里）
+                if store:
+                    store()
+        except Exception as e:
+            self.logger.error(f"采集政务新闻出错: {e}")
+    
+    def _collect_complaints(self, source: Dict, keywords: List[str]) -> Generator[RawData, None, None]:
+        """采集投诉建议数据"""
+        complaint_url = urljoin(source['base_url'], source.get('complaint_url', ''))
+        
+        if not complaint_url:
+            return
+        
+        try:
+            html, store = self._request_if_modified(complaint_url, variant=','.join(sorted(keywords)))
+            if html is not None:
+                yield from self._parse_complaints(html, source, keywords)
+                if store:
+                    store()
+        except Exception as e:
+            self.logger.error(f"采集投诉数据出错: {e}")
@@ -5,19 +5,18 @@
 
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Generator
+from typing import List, Dict, Any, Optional, Generator, Callable, Tuple
 from urllib.parse import quote, urljoin
 
 from bs4 import BeautifulSoup
 
 from core.base import BaseCollector
 from core.models import RawData, SourceType, Engagement
+from collectors import article_extractor
 
 
-class NewsCollector(BaseCollector):
-    """新闻数据采集器"""
-    
-    source_type = SourceType.NEWS
+class NewsParserMixin:
+    """新闻搜索结果解析（同步/异步采集器共用）"""
     
     # 新闻源配置
     NEWS_SOURCES = {
@@ -38,64 +37,8 @@ class NewsCollector(BaseCollector):
         }
     }
     
-    def __init__(self, config=None):
-        super().__init__(config)
-        self.sources = self.config.news.get('sources', [])
-    
-    def collect(self, keywords: List[str], **kwargs) -> Generator[RawData, None, None]:
-        """采集新闻数据"""
-        max_articles = kwargs.get('max_articles', self.config.news.get('max_articles', 100))
-        delay_range = self.config.news.get('delay_range', [1, 3])
-        sources = kwargs.get('sources', ['baidu'])
-        
-        seen_urls = set()
-        count = 0
-        
-        for keyword in keywords:
-            if count >= max_articles:
-                break
-                
-            self.logger.info(f"搜索新闻关键词: {keyword}")
-            
-            for source_name in sources:
-                if count >= max_articles:
-                    break
-                    
-                source = self.NEWS_SOURCES.get(source_name)
-                if not source:
-                    continue
-                
-                try:
-                    items = self._search_news(source, keyword)
-                    
-                    for item in items:
-                        if count >= max_articles:
-                            break
-                            
-                        if item.get('url') in seen_urls:
-                            continue
-                        
-                        data = self.parse_item(item, keyword)
-                        if data:
-                            seen_urls.add(item.get('url'))
-                            count += 1
-                            yield data
-                    
-                    self._delay(delay_range)
-                    
-                except Exception as e:
-                    self.logger.error(f"采集 {source['name']} 出错: {e}")
-                    continue
-    
-    def _search_news(self, source: Dict, keyword: str) -> List[Dict]:
-        """搜索新闻"""
-        url = source['search_url']
-        params = source['params'](keyword)
-        
-        response = self._request(url, params=params)
-        html = response.text
-        
-        # 根据来源解析
+    def _parse_search_results(self, url: str, html: str) -> List[Dict]:
+        """根据来源解析搜索结果"""
         if 'baidu' in url:
             return self._parse_baidu_results(html)
         elif 'sogou' in url:
@@ -255,41 +198,89 @@ class NewsCollector(BaseCollector):
         except Exception as e:
             self.logger.error(f"解析新闻数据出错: {e}")
             return None
+
+
+class NewsCollector(NewsParserMixin, BaseCollector):
+    """新闻数据采集器"""
+    
+    source_type = SourceType.NEWS
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.sources = self.config.news.get('sources', [])
+    
+    def collect(self, keywords: List[str], **kwargs) -> Generator[RawData, None, None]:
+        """采集新闻数据"""
+        max_articles = kwargs.get('max_articles', self.config.news.get('max_articles', 100))
+        delay_range = self.config.news.get('delay_range', [1, 3])
+        sources = kwargs.get('sources', ['baidu'])
+        
+        seen_urls = set()
+        count = 0
+        
+        for keyword in keywords:
+            if count >= max_articles:
+                break
+                
+            self.logger.info(f"搜索新闻关键词: {keyword}")
+            
+            for source_name in sources:
+                if count >= max_articles:
+                    break
+                    
+                source = self.NEWS_SOURCES.get(source_name)
+                if not source:
+                    continue
+                
+                try:
+                    items, store = self._search_news(source, keyword)
+                    
+                    for item in items:
+                        if count >= max_articles:
+                            break
+                            
+                        if item.get('url') in seen_urls:
+                            continue
+                        if self._is_seen(self._generate_id('news', item.get('url', ''))):
+                            continue
+                        
+                        data = self.parse_item(item, keyword)
+                        if data:
+                            seen_urls.add(item.get('url'))
+                            self._mark_seen(data.id)
+                            count += 1
+                            yield data
+                    else:
+                        # 结果页全部产出后才写入缓存，被条数上限截断时不写
+                        if store:
+                            store()
+                    
+                    self._delay(delay_range)
+                    
+                except Exception as e:
+                    self.logger.error(f"采集 {source['name']} 出错: {e}")
+                    continue
+    
+    def _search_news(self, source: Dict, keyword: str) -> Tuple[List[Dict], Optional[Callable]]:
+        """搜索新闻，返回 (结果, 结果页缓存条目的写入函数)"""
+        url = source['search_url']
+        params = source['params'](keyword)
+        
+        # 结果页未变化时跳过解析
+        html, store = self._request_if_modified(url, params=params)
+        if html is None:
+            return [], None
+        
+        return self._parse_search_results(url, html), store
     
     def fetch_full_content(self, url: str) -> Optional[str]:
         """获取新闻全文（需要时调用）"""
         try:
             response = self._request(url)
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # 移除脚本和样式
-            for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                tag.decompose()
-            
-            # 尝试找到正文
-            content_selectors = [
-                'article',
-                '.article-content',
-                '.news-content',
-                '.content',
-                '#content',
-                '.post-content',
-                'main'
-            ]
-            
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    text = content_elem.get_text(separator='\n', strip=True)
-                    if len(text) > 100:
-                        return text
-            
-            # 回退：获取body文本
-            body = soup.find('body')
-            if body:
-                return body.get_text(separator='\n', strip=True)[:5000]
-            
-            return None
+            html = article_extractor.decode_html(response.content, response.charset_encoding)
+            return article_extractor.extract_main_text(
+                html, max_chars=self.config.news.get('content_max_chars', 20000)
+            )
             
         except Exception as e:
             self.logger.error(f"获取新闻全文出错: {e}")
@@ -3,16 +3,14 @@
 微博数据采集器
 """
 
-import re
 import json
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Generator
 from urllib.parse import quote
 
-from bs4 import BeautifulSoup
-
 from core.base import BaseCollector
 from core.models import RawData, SourceType, Author, Engagement, Location
+from collectors.weibo_parser import strip_html
 
 
 class WeiboCollector(BaseCollector):
@@ -27,8 +25,8 @@ class WeiboCollector(BaseCollector):
     def __init__(self, config=None):
         super().__init__(config)
         self.cookie = self.config.weibo.get('cookie', '')
-        if self.cookie:
-            self.session.headers['Cookie'] = self.cookie
+        # 连接池可能与其他采集器共享，Cookie 按请求携带
+        self.request_headers = {'Cookie': self.cookie} if self.cookie else {}
     
     def collect(self, keywords: List[str], **kwargs) -> Generator[RawData, None, None]:
         """
@@ -62,9 +60,15 @@ class WeiboCollector(BaseCollector):
                             break
                         
                         for item in items:
+                            # 先按ID去重（本次 + 往次运行），命中则跳过解析
+                            record_id = self._generate_id('weibo', item.get('id') or item.get('mid'))
+                            if record_id in seen_ids or self._is_seen(record_id):
+                                continue
+                            
                             data = self.parse_item(item, keyword)
-                            if data and data.id not in seen_ids:
+                            if data:
                                 seen_ids.add(data.id)
+                                self._mark_seen(data.id)
                                 yield data
                         
                         self._delay(delay_range)
@@ -94,7 +98,7 @@ class WeiboCollector(BaseCollector):
             'page': page
         }
         
-        response = self._request(self.SEARCH_URL, params=params)
+        response = self._request(self.SEARCH_URL, params=params, headers=self.request_headers)
         data = response.json()
         
         if data.get('ok') != 1:
@@ -130,8 +134,7 @@ class WeiboCollector(BaseCollector):
             # 内容处理
             text = item.get('text', '')
             # 清理HTML标签
-            text_clean = BeautifulSoup(text, 'lxml').get_text()
-            text_clean = re.sub(r'\s+', ' ', text_clean).strip()
+            text_clean = strip_html(text)
             
             if not text_clean:
                 return None
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+微博解析函数 - 按页批量解析，可在线程/进程池中执行
+
+均为无状态的纯函数，不依赖采集器实例，便于交给 executor。
+"""
+
+import re
+import html
+import hashlib
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import lxml.html
+
+from core.logger import get_logger
+from core.models import RawData, SourceType, Author, Engagement
+from core.time_parser import parse_time
+
+
+logger = get_logger('WeiboParser')
+
+TAG_RE = re.compile(r'<[^<>]*>')
+WHITESPACE_RE = re.compile(r'\s+')
+# 快速剥离无法正确处理的标记（注释、CDATA、脚本/样式），交给 lxml
+COMPLEX_MARKUP_RE = re.compile(r'<!--|<!\[CDATA\[|<script|<style', re.IGNORECASE)
+
+WEIBO_TIME_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+COUNT_UNITS = {'万': 10000, '亿': 100000000}
+
+
+def strip_html(text: str) -> str:
+    """
+    提取微博正文纯文本
+    
+    微博正文只含 a/span/img/br 等简单标签，用正则剥离标签再反转义实体；
+    遇到注释、脚本或尖括号不成对等情况时回退到 lxml 完整解析。
+    """
+    if not text:
+        return ''
+    
+    if '<' not in text and '&' not in text:
+        return WHITESPACE_RE.sub(' ', text).strip()
+    
+    if COMPLEX_MARKUP_RE.search(text) or text.count('<') != text.count('>'):
+        return _strip_with_lxml(text)
+    
+    return WHITESPACE_RE.sub(' ', html.unescape(TAG_RE.sub('', text))).strip()
+
+
+def _strip_with_lxml(text: str) -> str:
+    """lxml 完整解析（慢路径）"""
+    try:
+        root = lxml.html.fragment_fromstring(text, create_parent='div')
+        for node in root.xpath('.//script|.//style'):
+            node.drop_tree()
+        content = root.text_content()
+    except Exception:
+        content = html.unescape(TAG_RE.sub('', text))
+    return WHITESPACE_RE.sub(' ', content).strip()
+
+
+def extract_mblogs(cards: List[Dict]) -> List[Dict]:
+    """从搜索接口的 cards 数组中提取微博（含卡片组内的微博）"""
+    items = []
+    for card in cards:
+        card_type = card.get('card_type')
+        if card_type == 9:
+            mblog = card.get('mblog')
+            if mblog:
+                items.append(mblog)
+        elif card_type == 11:
+            for sub_card in card.get('card_group') or []:
+                if sub_card.get('card_type') == 9:
+                    mblog = sub_card.get('mblog')
+                    if mblog:
+                        items.append(mblog)
+    return items
+
+
+def record_id(weibo_id: Any) -> str:
+    """数据ID，与采集器 _generate_id('weibo', weibo_id) 一致"""
+    return hashlib.md5(f"weibo_{weibo_id}".encode()).hexdigest()[:16]
+
+
+def parse_count(value) -> int:
+    """解析数量（处理 '1.5万'、'27.4万' 等格式）"""
+    if isinstance(value, int):
+        return value
+    if not value:
+        return 0
+    
+    value_str = str(value).strip()
+    
+    try:
+        return int(value_str)
+    except ValueError:
+        pass
+    
+    for unit, mult in COUNT_UNITS.items():
+        if unit in value_str:
+            try:
+                return int(float(value_str.replace(unit, '').strip()) * mult)
+            except ValueError:
+                pass
+    
+    return 0
+
+
+def parse_weibo_time(time_str: str) -> datetime:
+    """解析微博时间（接口标准格式，其余格式见 core.time_parser）"""
+    if not time_str:
+        return datetime.now()
+    
+    try:
+        return datetime.strptime(time_str, WEIBO_TIME_FORMAT).replace(tzinfo=None)
+    except ValueError:
+        pass
+    
+    parsed = parse_time(time_str)
+    if parsed is None:
+        logger.warning(f"无法解析时间: {time_str}")
+        return datetime.now()
+    return parsed
+
+
+def parse_mblog(item: Dict[str, Any], keyword: str = None) -> Optional[RawData]:
+    """解析单条微博"""
+    try:
+        weibo_id = item.get('id') or item.get('mid')
+        if not weibo_id:
+            return None
+        
+        content = strip_html(item.get('text', ''))
+        if not content:
+            return None
+        
+        user = item.get('user') or {}
+        author = Author(
+            id=str(user.get('id', '')),
+            name=user.get('screen_name', ''),
+            avatar=user.get('profile_image_url', ''),
+            followers=parse_count(user.get('followers_count', 0)),
+            verified=user.get('verified', False)
+        )
+        
+        engagement = Engagement(
+            likes=parse_count(item.get('attitudes_count', 0)),
+            comments=parse_count(item.get('comments_count', 0)),
+            shares=parse_count(item.get('reposts_count', 0))
+        )
+        
+        pics = item.get('pics') or []
+        images = [pic.get('large', {}).get('url', pic.get('url', '')) for pic in pics]
+        
+        return RawData(
+            id=record_id(weibo_id),
+            source=SourceType.WEIBO,
+            source_id=str(weibo_id),
+            url=f"https://m.weibo.cn/detail/{weibo_id}",
+            content=content,
+            images=images,
+            publish_time=parse_weibo_time(item.get('created_at', '')),
+            author=author,
+            engagement=engagement,
+            keywords=[keyword] if keyword else [],
+            raw_json=item
+        )
+    
+    except Exception as e:
+        logger.error(f"解析微博数据出错: {e}")
+        return None
+
+
+def parse_mblogs(items: List[Dict[str, Any]], keyword: str = None) -> List[RawData]:
+    """批量解析一页微博（executor 的任务单元）"""
+    results = []
+    for item in items:
+        data = parse_mblog(item, keyword)
+        if data:
+            results.append(data)
+    return results
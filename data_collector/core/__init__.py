@@ -4,16 +4,22 @@ AICity 数据采集工具核心模块
 """
 
 from .base import BaseCollector
-from .async_base import AsyncBaseCollector
+from .async_base import AsyncBaseCollector, FetchResult
 from .config import Config
 from .logger import get_logger
 from .models import RawData, CleanedData
 from .task_queue import TaskQueue, Task, TaskStatus
 from .proxy_pool import ProxyPool
+from .rate_limiter import RateLimiter, TokenBucket
+from .http_cache import ResponseCache
+from .request_coalescer import RequestCoalescer
+from .scheduler import PageScheduler, PageStream, PageResult
+from .seen_index import SeenIndex, BloomFilter
 
 __all__ = [
     'BaseCollector',
     'AsyncBaseCollector',
+    'FetchResult',
     'Config', 
     'get_logger',
     'RawData',
@@ -21,5 +27,14 @@ __all__ = [
     'TaskQueue',
     'Task',
     'TaskStatus',
-    'ProxyPool'
+    'ProxyPool',
+    'RateLimiter',
+    'TokenBucket',
+    'ResponseCache',
+    'RequestCoalescer',
+    'PageScheduler',
+    'PageStream',
+    'PageResult',
+    'SeenIndex',
+    'BloomFilter'
 ]
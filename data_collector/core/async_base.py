@@ -3,20 +3,79 @@
 异步采集器基类 - 高性能并发采集
 """
 
+import json
+import time
 import asyncio
-import random
 import hashlib
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import partial
 from datetime import datetime
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from typing import List, Dict, Any, Optional, AsyncGenerator, Callable, Iterable, Mapping, Set, Tuple
+from urllib.parse import urlsplit
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 import aiohttp
-from fake_useragent import UserAgent
+from multidict import CIMultiDict
 
 from .config import Config
 from .logger import get_logger
 from .models import RawData, SourceType
+from .rate_limiter import RateLimiter, THROTTLE_STATUSES
+from .http_cache import ResponseCache
+from .seen_index import SeenIndex
+from .time_parser import parse_time
+from .proxy_pool import ProxyPool
+from .user_agent import get_user_agents
+from .cassette import Cassette
+from .request_coalescer import RequestCoalescer
+from .concurrency_limiter import ConcurrencyLimiter
+from .circuit_breaker import CircuitBreakers
+from .hedging import HedgePolicy
+
+
+# 判定代理被目标站点封禁/限流的状态码（计为代理失败）
+PROXY_BLOCK_STATUSES = (403,) + THROTTLE_STATUSES
+
+# 读取响应体的块大小
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class FetchResult:
+    """一次请求的结果，响应体已在连接释放前读取"""
+    url: str
+    status: Optional[int] = None
+    headers: Mapping[str, str] = None
+    body: bytes = b''
+    encoding: Optional[str] = None
+    size: int = 0
+    elapsed: float = 0.0
+    attempts: int = 1
+    truncated: bool = False
+    error: Optional[str] = None
+    proxy: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and not self.truncated and self.error is None
+    
+    @property
+    def content_type(self) -> str:
+        return (self.headers or {}).get('Content-Type', '')
+    
+    def text(self) -> str:
+        """按响应声明的编码解码，未声明时依次尝试 UTF-8 / GB18030"""
+        if self.encoding:
+            return self.body.decode(self.encoding, errors='replace')
+        try:
+            return self.body.decode('utf-8')
+        except UnicodeDecodeError:
+            return self.body.decode('gb18030', errors='replace')
+    
+    def json(self) -> Any:
+        """解析JSON（忽略 Content-Type）"""
+        return json.loads(self.body)
 
 
 class AsyncBaseCollector(ABC):
@@ -27,22 +86,52 @@ class AsyncBaseCollector(ABC):
     def __init__(self, config: Config = None):
         self.config = config or Config()
         self.logger = get_logger(self.__class__.__name__)
-        self.ua = UserAgent()
+        self.ua = get_user_agents(self.config)
         self.session: Optional[aiohttp.ClientSession] = None
         
-        # 并发控制
-        self.semaphore: Optional[asyncio.Semaphore] = None
+        # 并发控制（自适应时为各主机的初始并发上限）
+        self.concurrency: Optional[ConcurrencyLimiter] = None
         self.max_concurrent = 10  # 最大并发数
         
-        # 智能限速
+        # 重试次数与响应体大小上限
+        self.max_retries = self.config.request_config.get('max_retries', 3)
+        self.max_body_bytes = self.config.request_config.get('max_body_bytes', 8 * 1024 * 1024)
+        
+        # 请求统计
         self.request_count = 0
         self.error_count = 0
-        self.last_request_time = 0
-        self.adaptive_delay = 1.0  # 自适应延迟(秒)
         
-        # 代理池
-        self.proxy_pool: List[str] = []
-        self.proxy_index = 0
+        # 智能限速（按主机/身份的令牌桶 + AIMD），未启用时为None
+        self.rate_limiter = RateLimiter.from_config(self.config)
+        
+        # 请求录制/回放（离线调试解析与下游流程）
+        self.cassette = Cassette.from_config(
+            self.config, self.source_type.value if self.source_type else 'default'
+        )
+        
+        # 响应缓存（条件请求）；录制/回放时不使用，保证录到完整响应、回放结果可复现
+        self.http_cache = None if self.cassette else ResponseCache.from_config(self.config)
+        # 页面数据全部产出后、等待落盘的缓存条目：[(尚未落盘的记录ID, 写入缓存条目的函数)]
+        self._pending_stores: List[Tuple[Set[str], Callable[[], Any]]] = []
+        self._cache_writes: Set[asyncio.Future] = set()
+        
+        # 跨运行去重索引（回放时不使用，同一录制可反复回放）
+        replaying = self.cassette is not None and self.cassette.replaying
+        self.seen_index = None if replaying else SeenIndex.from_config(self.config)
+        # 绑定写入器后，已产出但尚未落盘的ID（落盘后才记入索引）
+        self._unconfirmed: Optional[Set[str]] = None
+        self._writers = []
+        
+        # 请求合并与短期结果缓存（相同请求只发一次，空页/418 等短期内不重复请求）
+        self.coalescer = RequestCoalescer.from_config(self.config)
+        
+        # 代理池（按目标主机选择，请求结果实时回报）；required 时无可用代理不直连
+        self.proxy_pool: Optional[ProxyPool] = None
+        self.require_proxy = self.config.get('proxy', 'required', default=False)
+        
+        # 按主机/代理的熔断器，与经另一代理补发慢请求的对冲策略
+        self.breakers = CircuitBreakers.from_config(self.config)
+        self.hedging = HedgePolicy.from_config(self.config)
     
     async def __aenter__(self):
         await self._init_session()
@@ -55,9 +144,13 @@ class AsyncBaseCollector(ABC):
         """初始化异步会话"""
         timeout = aiohttp.ClientTimeout(total=self.config.request_config.get('timeout', 30))
         
+        # 并发上限在会话创建时确定（max_concurrent 可在创建采集器后修改）
+        self.concurrency = ConcurrencyLimiter.from_config(self.config, self.max_concurrent)
+        
+        # 自适应时每主机的并发由限制器控制，连接池只设总上限
         connector = aiohttp.TCPConnector(
-            limit=self.max_concurrent,
-            limit_per_host=5,
+            limit=self.concurrency.max_workers,
+            limit_per_host=0 if self.concurrency.adaptive else 5,
             enable_cleanup_closed=True
         )
         
@@ -67,38 +160,77 @@ class AsyncBaseCollector(ABC):
             headers=self._get_headers()
         )
         
-        self.semaphore = asyncio.Semaphore(self.max_concurrent)
-        
         # 加载代理池
         await self._load_proxy_pool()
     
     async def _load_proxy_pool(self):
-        """加载代理池"""
+        """加载代理池（已注入代理池时追加到其中）"""
         if self.config.get('proxy', 'enabled'):
+            pool = self.proxy_pool or ProxyPool()
+            
             pool_api = self.config.get('proxy', 'pool_api')
             if pool_api:
                 try:
                     async with self.session.get(pool_api) as resp:
                         data = await resp.json()
-                        self.proxy_pool = data.get('proxies', [])
-                        self.logger.info(f"加载 {len(self.proxy_pool)} 个代理")
+                        proxies = data.get('proxies', [])
+                        for proxy_url in proxies:
+                            pool.add(proxy_url)
+                        self.logger.info(f"加载 {len(proxies)} 个代理")
                 except Exception as e:
                     self.logger.warning(f"加载代理池失败: {e}")
             
             # 单个代理
             single_proxy = self.config.get('proxy', 'url')
-            if single_proxy and single_proxy not in self.proxy_pool:
-                self.proxy_pool.append(single_proxy)
+            if single_proxy:
+                pool.add(single_proxy)
+            
+            if pool.proxies:
+                self.proxy_pool = pool
     
-    def _get_proxy(self) -> Optional[str]:
-        """获取代理（轮换）"""
-        if not self.proxy_pool:
+    def _get_proxy(self, url: str, exclude: Set[str] = None) -> Optional[str]:
+        """按目标主机从代理池选择代理（跳过熔断中的代理），需配对调用 _report_proxy 或 _release_proxy"""
+        if self.proxy_pool is None:
             return None
-        
-        proxy = self.proxy_pool[self.proxy_index % len(self.proxy_pool)]
-        self.proxy_index += 1
+        if self.breakers is not None:
+            blocked = self.breakers.blocked('proxy')
+            exclude = blocked | exclude if exclude else blocked
+        proxy = self.proxy_pool.select(urlsplit(url).netloc, exclude)
+        if proxy is not None and self.breakers is not None:
+            # 半开状态的代理占用试探名额
+            self.breakers.allow('proxy', proxy)
         return proxy
     
+    def _report_proxy(self, proxy: Optional[str], url: str, status: Optional[int], started: float):
+        """回报代理请求结果（status 为 None 表示网络异常）"""
+        if proxy is None or self.proxy_pool is None:
+            return
+        ok = status is not None and status < 500 and status not in PROXY_BLOCK_STATUSES
+        self.proxy_pool.report(proxy, urlsplit(url).netloc, ok, time.monotonic() - started,
+                               throttled=status in THROTTLE_STATUSES)
+        if self.breakers is not None:
+            self.breakers.record('proxy', proxy, ok)
+    
+    def _release_proxy(self, proxy: Optional[str], url: str):
+        """请求被取消：归还代理在途数与熔断试探名额，不记录结果"""
+        if proxy is None:
+            return
+        if self.proxy_pool is not None:
+            self.proxy_pool.release(proxy, urlsplit(url).netloc)
+        if self.breakers is not None:
+            self.breakers.release('proxy', proxy)
+    
+    def _report_host(self, url: str, proxy: Optional[str], status: Optional[int]):
+        """回报目标主机熔断器，每次逻辑尝试（含对冲的两路请求）只回报一次；经代理的网络异常归咎于代理，不计入主机"""
+        if self.breakers is None:
+            return
+        host = urlsplit(url).netloc
+        if status is None and proxy is not None:
+            self.breakers.release('host', host)
+            return
+        ok = status is not None and status < 500 and status not in THROTTLE_STATUSES
+        self.breakers.record('host', host, ok)
+    
     def _get_headers(self) -> Dict[str, str]:
         """获取请求头"""
         headers = self.config.request_config.get('headers', {}).copy()
@@ -110,146 +242,415 @@ class AsyncBaseCollector(ABC):
         content = '_'.join(str(a) for a in args)
         return hashlib.md5(content.encode()).hexdigest()[:16]
     
-    async def _adaptive_delay(self):
-        """自适应延迟 - 根据错误率动态调整"""
-        # 计算错误率
-        if self.request_count > 10:
-            error_rate = self.error_count / self.request_count
+    def _is_seen(self, record_id: str) -> bool:
+        """是否已采集过（往次运行，或本次已产出等待落盘）"""
+        if self.seen_index is None:
+            return False
+        if self._unconfirmed is not None and record_id in self._unconfirmed:
+            return True
+        return record_id in self.seen_index
+    
+    def _mark_seen(self, record_id: str):
+        """记录已产出的数据ID（绑定写入器时等落盘后再记入索引）"""
+        if self.seen_index is None:
+            return
+        if self._unconfirmed is not None:
+            self._unconfirmed.add(record_id)
+        else:
+            self.seen_index.add(record_id)
+    
+    def attach_writer(self, writer):
+        """
+        绑定流式写入器：产出的记录在写入器提交落盘后才记入去重索引、写入页面缓存条目
+        
+        未绑定时产出即记入，进程在落盘前中断会导致这些记录下次被当作已采集跳过。
+        """
+        if self.seen_index is None and self.http_cache is None:
+            return
+        if self.seen_index is not None:
+            if self._unconfirmed is None:
+                self._unconfirmed = set()
+            writer.add_commit_hook(self._confirm_seen)
+        if self.http_cache is not None:
+            writer.add_commit_hook(self._confirm_cached)
+        self._writers.append(writer)
+    
+    def _confirm_seen(self, record_ids: List[str]):
+        """写入器提交回调：本采集器产出的记录已落盘，记入去重索引"""
+        for record_id in record_ids:
+            if record_id in self._unconfirmed:
+                self._unconfirmed.discard(record_id)
+                self.seen_index.add(record_id)
+    
+    @property
+    def max_workers(self) -> int:
+        """分页调度器的工作协程数（自适应时取并发上限的上界，由限制器实际控制并发）"""
+        return self.concurrency.max_workers if self.concurrency else self.max_concurrent
+    
+    def _identity(self, proxy: Optional[str] = None) -> Optional[str]:
+        """请求身份标识（用于按代理/账号独立限速）"""
+        return proxy
+    
+    async def _fetch(self, url: str, method: str = 'GET', params: Dict = None,
+                     headers: Dict = None, retry_count: int = None, max_bytes: int = None,
+                     sink: Callable[[bytes], Any] = None, cache_result: bool = True,
+                     **kwargs) -> FetchResult:
+        """
+        统一请求入口：限速、并发限制、代理选择/回报与重试只在这里处理
+        
+        响应体在连接释放前按块读取完毕，超过 max_bytes 时中止并标记 truncated；
+        传入 sink 时每个数据块交给 sink 处理而不缓存在内存中（用于大文件）。
+        网络异常与 5xx 按指数退避重试，退避期间不占用并发名额。
+        启用请求合并时，相同的 GET 请求共享进行中或近期的结果（调用方不应修改返回的结果）；
+        cache_result=False 时只共享进行中的请求（如只请求一次的新闻正文）。
+        """
+        if self.coalescer is None or sink is not None or method.upper() != 'GET':
+            return await self._fetch_network(url, method, params, headers, retry_count,
+                                             max_bytes, sink, **kwargs)
+        
+        key = self.coalescer.make_key(method, url, params, headers)
+        return await self.coalescer.run(key, lambda: self._fetch_network(
+            url, method, params, headers, retry_count, max_bytes, sink, **kwargs
+        ), cache=cache_result)
+    
+    def _mark_empty_page(self, url: str, params: Dict = None, headers: Dict = None):
+        """解析后才能判断的空页/无效页，按 negative_ttl 缓存，短期内不再请求"""
+        if self.coalescer is not None:
+            self.coalescer.mark_negative(self.coalescer.make_key('GET', url, params, headers))
+    
+    async def _fetch_network(self, url: str, method: str = 'GET', params: Dict = None,
+                             headers: Dict = None, retry_count: int = None, max_bytes: int = None,
+                             sink: Callable[[bytes], Any] = None, **kwargs) -> FetchResult:
+        """发送请求（含限速、并发限制、代理、熔断、对冲与重试），不经过请求合并"""
+        if retry_count is None:
+            retry_count = self.max_retries
+        if max_bytes is None:
+            max_bytes = self.max_body_bytes
+        headers = headers or {}
+        host = urlsplit(url).netloc
+        
+        for attempt in range(max(1, retry_count)):
+            # 熔断中的主机直接失败，不发请求
+            if self.breakers is not None and not self.breakers.allow('host', host):
+                result = FetchResult(url=url, attempts=attempt + 1, error=f"主机熔断中: {host}")
+                break
             
-            if error_rate > 0.3:
-                # 错误率高，增加延迟
-                self.adaptive_delay = min(self.adaptive_delay * 1.5, 10.0)
-                self.logger.warning(f"错误率高({error_rate:.1%})，延迟增加到 {self.adaptive_delay:.1f}s")
-            elif error_rate < 0.05 and self.adaptive_delay > 0.5:
-                # 错误率低，减少延迟
-                self.adaptive_delay = max(self.adaptive_delay * 0.8, 0.5)
-        
-        # 添加随机抖动
-        delay = self.adaptive_delay * (0.8 + random.random() * 0.4)
-        await asyncio.sleep(delay)
-    
-    async def _request(self, url: str, method: str = 'GET', 
-                       retry_count: int = 3, **kwargs) -> Optional[aiohttp.ClientResponse]:
-        """发送异步HTTP请求，带重试和限流"""
-        async with self.semaphore:
-            for attempt in range(retry_count):
+            proxy = self._get_proxy(url)
+            if proxy is None and self.require_proxy:
+                # 要求经代理请求时不直连，等待代理恢复（熔断到期、复检、导入）后重试
+                if self.breakers is not None:
+                    self.breakers.release('host', host)
+                result = FetchResult(url=url, attempts=attempt + 1, error="无可用代理")
+                self.logger.warning(f"无可用代理，等待后重试: {url}")
+            else:
                 try:
-                    # 更新请求头
-                    headers = kwargs.pop('headers', {})
-                    headers['User-Agent'] = self.ua.random
-                    
-                    # 获取代理
-                    proxy = self._get_proxy()
-                    
-                    self.logger.debug(f"请求: {method} {url} (尝试 {attempt + 1})")
-                    
-                    async with self.session.request(
-                        method, url, 
-                        headers=headers,
-                        proxy=proxy,
-                        **kwargs
-                    ) as response:
-                        self.request_count += 1
-                        
-                        if response.status == 200:
-                            return response
-                        elif response.status == 429:
-                            # 被限速，增加延迟
-                            self.error_count += 1
-                            self.adaptive_delay = min(self.adaptive_delay * 2, 30.0)
-                            self.logger.warning(f"被限速(429)，延迟增加到 {self.adaptive_delay:.1f}s")
-                            await asyncio.sleep(self.adaptive_delay)
-                        elif response.status >= 400:
-                            self.error_count += 1
-                            self.logger.warning(f"请求失败: {response.status}")
-                        
-                        response.raise_for_status()
-                        return response
-                        
-                except aiohttp.ClientError as e:
-                    self.error_count += 1
-                    self.logger.warning(f"请求异常 (尝试 {attempt + 1}): {e}")
-                    
-                    if attempt < retry_count - 1:
-                        await asyncio.sleep(2 ** attempt)  # 指数退避
-                    
+                    if self._can_hedge(sink):
+                        result = await self._hedged_attempt(url, method, params, headers, max_bytes,
+                                                            attempt, proxy, **kwargs)
+                    else:
+                        result = await self._attempt(url, method, params, headers, max_bytes, sink,
+                                                     attempt, proxy, **kwargs)
+                except asyncio.CancelledError:
+                    if self.breakers is not None:
+                        self.breakers.release('host', host)
+                    raise
                 except Exception as e:
-                    self.error_count += 1
-                    self.logger.error(f"未知错误: {e}")
+                    if self.breakers is not None:
+                        self.breakers.release('host', host)
+                    result = FetchResult(url=url, attempts=attempt + 1, error=str(e) or e.__class__.__name__)
+                    self.logger.error(f"未知错误: {result.error}")
                     break
+                self._report_host(url, result.proxy, result.status)
+                
+                if result.status is not None and result.status < 500:
+                    break
+            if attempt < retry_count - 1:
+                await asyncio.sleep(2 ** attempt)  # 指数退避
+        
+        if result.error or result.truncated or (result.status or 0) >= 400:
+            self.error_count += 1
+            if result.status and result.status >= 400:
+                self.logger.warning(f"请求失败: {result.status} {url}")
+        
+        return result
+    
+    async def _attempt(self, url: str, method: str, params: Optional[Dict], headers: Dict,
+                       max_bytes: int, sink: Optional[Callable[[bytes], Any]], attempt: int,
+                       proxy: Optional[str], sent: asyncio.Event = None, **kwargs) -> FetchResult:
+        """
+        经指定代理（来自 _get_proxy）发送一次请求，结束后回报代理池与代理熔断器
+        
+        网络异常记录在 result.error 中；请求被取消（如对冲中落后的一方）时只归还占用，不计为失败。
+        sent 在通过限速与并发槽位、请求即将发出时置位。
+        """
+        result = FetchResult(url=url, attempts=attempt + 1, proxy=proxy)
+        identity = self._identity(proxy)
+        # 同一代理/账号始终使用同一UA
+        if 'User-Agent' not in headers:
+            headers = dict(headers, **{'User-Agent': self.ua.for_identity(identity)})
+        started = time.monotonic()
+        cancelled = False
+        
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(url, identity)
             
-            return None
+            async with self.concurrency.slot(url) as slot:
+                self.logger.debug(f"请求: {method} {url} (尝试 {attempt + 1}, 代理 {proxy})")
+                if sent is not None:
+                    sent.set()
+                started = time.monotonic()
+                if self.cassette is not None and self.cassette.replaying:
+                    await self._replay(result, method, url, params, max_bytes, sink)
+                else:
+                    async with self.session.request(method, url, params=params, headers=headers,
+                                                    proxy=proxy, **kwargs) as response:
+                        result.status = response.status
+                        result.url = str(response.url)
+                        result.headers = response.headers
+                        
+                        if response.status < 400:
+                            await self._read_body(response, result, max_bytes, sink)
+                result.elapsed = time.monotonic() - started
+                slot.status = result.status
+                self.request_count += 1
+                if self.rate_limiter is not None:
+                    self.rate_limiter.report(url, result.status, identity)
+                
+                if self.cassette is not None and self.cassette.recording and sink is None \
+                        and not result.truncated:
+                    self.cassette.record(method, url, params, result.status, result.headers,
+                                         result.body, result.elapsed)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result.error = str(e) or e.__class__.__name__
+            self.logger.warning(f"请求异常 (尝试 {attempt + 1}): {result.error}")
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                self._release_proxy(proxy, url)
+            else:
+                self._report_proxy(proxy, url, result.status, started)
+        
+        if self.hedging is not None and result.status is not None and result.status < 400:
+            self.hedging.observe(urlsplit(url).netloc, result.elapsed)
+        return result
+    
+    def _can_hedge(self, sink: Optional[Callable[[bytes], Any]]) -> bool:
+        """是否可以对冲：已启用、至少两个代理、非流式写入、非回放"""
+        return self.hedging is not None and sink is None and self.proxy_pool is not None \
+            and len(self.proxy_pool.proxies) > 1 \
+            and not (self.cassette is not None and self.cassette.replaying)
+    
+    async def _hedged_attempt(self, url: str, method: str, params: Optional[Dict], headers: Dict,
+                              max_bytes: int, attempt: int, primary_proxy: Optional[str],
+                              **kwargs) -> FetchResult:
+        """
+        对冲请求：首发请求发出后超过该主机近期 p95 耗时仍未返回时，经另一个代理补发一次
+        
+        计时从首发请求通过限速与并发槽位后开始，排队等待不会触发补发。
+        取先得到有效响应（非网络异常、非 5xx、非封禁/限流）的一方，另一方取消；
+        两方都失败时返回后结束的结果，由外层按原规则重试。
+        """
+        host = urlsplit(url).netloc
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(self._attempt(url, method, params, headers, max_bytes, None,
+                                                      attempt, primary_proxy, sent=sent, **kwargs))
+        tasks = [primary]
+        try:
+            delay = self.hedging.delay(host)
+            if delay is None:
+                return await primary
+            
+            sending = asyncio.ensure_future(sent.wait())
+            tasks.append(sending)
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done():
+                return primary.result()
+            
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done:
+                return primary.result()
+            
+            backup_proxy = self._get_proxy(url, exclude={primary_proxy} if primary_proxy else None)
+            if backup_proxy is None:
+                return await primary
+            
+            self.hedging.on_hedge()
+            self.logger.debug(f"对冲请求: {url} 超过 {delay:.2f}s，经 {backup_proxy} 补发")
+            backup = asyncio.ensure_future(self._attempt(url, method, params, headers, max_bytes, None,
+                                                         attempt, backup_proxy, **kwargs))
+            tasks.append(backup)
+            
+            pending = {primary, backup}
+            result = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result.status is not None and result.status < 500 \
+                            and result.status not in PROXY_BLOCK_STATUSES:
+                        if task is backup:
+                            self.hedging.on_hedge_win()
+                        return result
+            return result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _read_body(self, response: aiohttp.ClientResponse, result: FetchResult,
+                         max_bytes: int, sink: Callable[[bytes], Any] = None):
+        """按块读取响应体，超过上限时中止"""
+        declared = response.content_length
+        if max_bytes and declared is not None and declared > max_bytes and sink is None:
+            result.truncated = True
+            result.error = f"响应体过大: {declared} > {max_bytes}"
+            self.logger.warning(f"{result.error} ({result.url})")
+            return
+        
+        result.encoding = response.charset
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(BODY_CHUNK_SIZE):
+            size += len(chunk)
+            if sink is not None:
+                sink(chunk)
+                continue
+            if max_bytes and size > max_bytes:
+                result.truncated = True
+                result.error = f"响应体超过上限: {max_bytes}"
+                self.logger.warning(f"{result.error} ({result.url})")
+                return
+            chunks.append(chunk)
+        
+        result.size = size
+        result.body = b''.join(chunks)
+    
+    async def _replay(self, result: FetchResult, method: str, url: str, params: Dict,
+                      max_bytes: int, sink: Callable[[bytes], Any] = None):
+        """从录制带回放响应（与真实请求相同的大小上限与 sink 处理）"""
+        interaction = await self.cassette.replay(method, url, params)
+        result.status = interaction.status
+        result.url = interaction.url
+        result.headers = CIMultiDict(interaction.headers)
+        if interaction.status >= 400:
+            return
+        
+        result.encoding = interaction.encoding
+        result.size = len(interaction.body)
+        if sink is not None:
+            sink(interaction.body)
+        elif max_bytes and result.size > max_bytes:
+            result.truncated = True
+            result.error = f"响应体超过上限: {max_bytes}"
+        else:
+            result.body = interaction.body
+    
+    async def _request(self, url: str, method: str = 'GET',
+                       retry_count: int = 3, **kwargs) -> Optional[FetchResult]:
+        """发送异步HTTP请求，带重试和限流（响应体已读取，失败返回None）"""
+        result = await self._fetch(url, method=method, retry_count=retry_count, **kwargs)
+        return result if result.ok else None
     
     async def _request_json(self, url: str, **kwargs) -> Optional[Dict]:
         """请求并返回JSON"""
+        result = await self._fetch(url, **kwargs)
+        if not result.ok:
+            return None
         try:
-            headers = kwargs.pop('headers', {})
-            headers['User-Agent'] = self.ua.random
-            proxy = self._get_proxy()
-            
-            async with self.semaphore:
-                async with self.session.get(url, headers=headers, proxy=proxy, **kwargs) as response:
-                    self.request_count += 1
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        self.error_count += 1
-                        return None
-        except Exception as e:
+            return result.json()
+        except ValueError as e:
             self.error_count += 1
             self.logger.error(f"请求JSON失败: {e}")
             return None
     
     async def _request_text(self, url: str, **kwargs) -> Optional[str]:
         """请求并返回文本"""
-        try:
-            headers = kwargs.pop('headers', {})
-            headers['User-Agent'] = self.ua.random
-            proxy = self._get_proxy()
-            
-            async with self.semaphore:
-                async with self.session.get(url, headers=headers, proxy=proxy, **kwargs) as response:
-                    self.request_count += 1
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        self.error_count += 1
-                        return None
-        except Exception as e:
-            self.error_count += 1
-            self.logger.error(f"请求文本失败: {e}")
-            return None
+        result = await self._fetch(url, **kwargs)
+        return result.text() if result.ok else None
     
-    def _parse_time(self, time_str: str) -> datetime:
-        """解析时间字符串"""
-        if not time_str:
-            return datetime.now()
-            
-        formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d %H:%M',
-            '%Y/%m/%d %H:%M:%S',
-            '%Y年%m月%d日 %H:%M',
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(time_str, fmt)
-            except ValueError:
-                continue
+    async def _request_text_if_modified(self, url: str, params: Dict = None, variant: str = None,
+                                        **kwargs) -> Tuple[Optional[str], Optional[Callable[[], Any]]]:
+        """
+        带缓存的条件请求（缓存读写在线程中执行）
+        
+        Returns:
+            (页面文本, store)；页面未变化（304或内容哈希相同）或请求失败时文本为None。
+            新内容的缓存条目不在请求时写入：调用方在该页数据全部产出后把 store 交给
+            _store_after_commit，被条数上限截断的页不交，下次仍会完整解析。
+        """
+        if self.http_cache is None:
+            return await self._request_text(url, params=params, **kwargs), None
+        
+        key = self.http_cache.make_key(url, params, variant)
+        entry = await asyncio.to_thread(self.http_cache.get, key)
         
-        # 相对时间处理
-        now = datetime.now()
-        if '刚刚' in time_str or '秒前' in time_str:
-            return now
-        elif '分钟前' in time_str:
-            minutes = int(''.join(filter(str.isdigit, time_str)) or 1)
-            return now.replace(minute=max(0, now.minute - minutes))
-        elif '小时前' in time_str:
-            hours = int(''.join(filter(str.isdigit, time_str)) or 1)
-            return now.replace(hour=max(0, now.hour - hours))
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.http_cache.conditional_headers(entry))
         
-        return now
+        result = await self._fetch(url, params=params, headers=headers, **kwargs)
+        if result.status == 304:
+            await asyncio.to_thread(self.http_cache.touch, key)
+            self.logger.debug(f"页面未修改(304): {url}")
+            return None, None
+        if not result.ok:
+            return None, None
+        
+        store = partial(self.http_cache.store, key, result.url, result.body, result.headers)
+        if entry and entry.content_hash == self.http_cache.content_hash(result.body):
+            # 内容与已缓存（已完整处理过）的一致，只更新 ETag 与访问时间
+            await asyncio.to_thread(store)
+            self.logger.debug(f"页面内容未变化: {url}")
+            return None, None
+        
+        return result.text(), store
+    
+    def _store_after_commit(self, store: Optional[Callable[[], Any]], record_ids: Iterable[str]):
+        """
+        页面数据已全部产出：绑定写入器时等这些记录落盘后再写入缓存条目，
+        未绑定写入器或该页没有产出新记录时立即写入
+        """
+        if store is None:
+            return
+        pending = set(record_ids)
+        if pending and self._writers:
+            self._pending_stores.append((pending, store))
+        else:
+            self._write_cache(store)
+    
+    def _confirm_cached(self, record_ids: List[str]):
+        """写入器提交回调：页面产出的记录都已落盘时写入其缓存条目"""
+        committed = set(record_ids)
+        waiting = []
+        for pending, store in self._pending_stores:
+            pending -= committed
+            if pending:
+                waiting.append((pending, store))
+            else:
+                self._write_cache(store)
+        self._pending_stores = waiting
+    
+    def _write_cache(self, store: Callable[[], Any]):
+        """在线程中写入缓存条目，close() 时等待完成"""
+        future = asyncio.ensure_future(asyncio.to_thread(store))
+        self._cache_writes.add(future)
+        future.add_done_callback(self._cache_write_done)
+    
+    def _cache_write_done(self, future: asyncio.Future):
+        self._cache_writes.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"写入页面缓存失败: {future.exception()}")
+    
+    def _parse_time(self, time_str: str) -> datetime:
+        """解析时间字符串（见 core.time_parser），无法解析时取当前时间"""
+        parsed = parse_time(time_str)
+        if parsed is None:
+            if time_str:
+                self.logger.warning(f"无法解析时间: {time_str}")
+            return datetime.now()
+        return parsed
     
     @abstractmethod
     async def collect(self, keywords: List[str], **kwargs) -> AsyncGenerator[RawData, None]:
@@ -275,9 +676,6 @@ class AsyncBaseCollector(ABC):
             async for data in self.collect(keywords, **kwargs):
                 results.append(data)
                 
-                # 自适应延迟
-                await self._adaptive_delay()
-                
         except Exception as e:
             self.logger.error(f"采集出错: {e}")
             raise
@@ -285,30 +683,35 @@ class AsyncBaseCollector(ABC):
         self.logger.info(f"采集完成: {len(results)} 条, 请求: {self.request_count}, 错误: {self.error_count}")
         return results
     
-    async def run_batch(self, keywords: List[str], batch_size: int = 5) -> List[RawData]:
-        """批量并发采集多个关键词"""
+    async def run_batch(self, keywords: List[str], batch_size: int = 5, **kwargs) -> List[RawData]:
+        """批量并发采集多个关键词
+
+        batch_size 个工作协程从关键词队列中持续取任务，
+        单个慢关键词只占用一个工作协程，不会阻塞其余关键词。
+        """
         all_results = []
+        queue: asyncio.Queue = asyncio.Queue()
+        for kw in keywords:
+            queue.put_nowait(kw)
         
-        # 分批处理关键词
-        for i in range(0, len(keywords), batch_size):
-            batch = keywords[i:i + batch_size]
-            
-            # 并发采集
-            tasks = [self._collect_keyword(kw) for kw in batch]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in batch_results:
-                if isinstance(result, list):
-                    all_results.extend(result)
-                elif isinstance(result, Exception):
-                    self.logger.error(f"批量采集异常: {result}")
+        async def worker():
+            while True:
+                try:
+                    kw = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    all_results.extend(await self._collect_keyword(kw, **kwargs))
+                except Exception as e:
+                    self.logger.error(f"批量采集异常 [{kw}]: {e}")
         
+        await asyncio.gather(*(worker() for _ in range(min(batch_size, len(keywords)))))
         return all_results
     
-    async def _collect_keyword(self, keyword: str) -> List[RawData]:
+    async def _collect_keyword(self, keyword: str, **kwargs) -> List[RawData]:
         """采集单个关键词"""
         results = []
-        async for data in self.collect([keyword]):
+        async for data in self.collect([keyword], **kwargs):
             results.append(data)
         return results
     
@@ -317,6 +720,21 @@ class AsyncBaseCollector(ABC):
         if self.session:
             await self.session.close()
             self.logger.info(f"会话已关闭 (请求: {self.request_count}, 错误: {self.error_count})")
+        # 先提交绑定的写入器，已产出的记录落盘后记入索引、写入页面缓存条目
+        for writer in self._writers:
+            if not writer.closed:
+                writer.commit()
+            writer.remove_commit_hook(self._confirm_seen)
+            writer.remove_commit_hook(self._confirm_cached)
+        self._writers.clear()
+        # 记录未全部落盘（如被下游丢弃）的页面不写入缓存，下次重新解析
+        self._pending_stores.clear()
+        if self._cache_writes:
+            await asyncio.gather(*self._cache_writes, return_exceptions=True)
+        if self.http_cache:
+            self.http_cache.close()
+        if self.seen_index:
+            self.seen_index.close()
     
     def get_stats(self) -> Dict[str, Any]:
         """获取采集统计"""
@@ -325,6 +743,13 @@ class AsyncBaseCollector(ABC):
             'request_count': self.request_count,
             'error_count': self.error_count,
             'error_rate': f"{error_rate:.1%}",
-            'adaptive_delay': f"{self.adaptive_delay:.2f}s",
-            'proxy_count': len(self.proxy_pool)
+            'rate_limits': self.rate_limiter.get_statistics() if self.rate_limiter else None,
+            'concurrency': self.concurrency.get_statistics() if self.concurrency else None,
+            'proxy_pool': self.proxy_pool.get_statistics() if self.proxy_pool else None,
+            'http_cache': self.http_cache.get_statistics() if self.http_cache else None,
+            'seen_index': self.seen_index.get_statistics() if self.seen_index else None,
+            'cassette': self.cassette.get_statistics() if self.cassette else None,
+            'coalescer': self.coalescer.get_statistics() if self.coalescer else None,
+            'circuit_breakers': self.breakers.get_statistics() if self.breakers else None,
+            'hedging': self.hedging.get_statistics() if self.hedging else None
         }
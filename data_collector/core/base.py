@@ -7,16 +7,21 @@ import time
 import random
 import hashlib
 from abc import ABC, abstractmethod
+from functools import partial
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Generator
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import List, Dict, Any, Optional, Generator, Callable, Tuple
 
 import httpx
-from fake_useragent import UserAgent
 
 from .config import Config
 from .logger import get_logger
 from .models import RawData, SourceType
+from .http_cache import ResponseCache
+from .seen_index import SeenIndex
+from .time_parser import parse_time
+from .http_client import RETRY_STATUSES, acquire_client, release_client
+from .user_agent import get_user_agents
+from .cassette import Cassette
 
 
 class BaseCollector(ABC):
@@ -27,30 +32,30 @@ class BaseCollector(ABC):
     def __init__(self, config: Config = None):
         self.config = config or Config()
         self.logger = get_logger(self.__class__.__name__)
-        self.ua = UserAgent()
+        self.ua = get_user_agents(self.config)
         self.session = None
+        # 请求录制/回放；录制/回放时不使用响应缓存，回放时不使用跨运行去重索引
+        self.cassette = Cassette.from_config(
+            self.config, self.source_type.value if self.source_type else 'default'
+        )
+        replaying = self.cassette is not None and self.cassette.replaying
+        self.http_cache = None if self.cassette else ResponseCache.from_config(self.config)
+        self.seen_index = None if replaying else SeenIndex.from_config(self.config)
         self._init_session()
     
     def _init_session(self):
-        """初始化HTTP会话"""
+        """初始化HTTP会话（默认与其他采集器共享连接池）"""
         request_config = self.config.request_config
         
-        self.session = httpx.Client(
-            timeout=request_config.get('timeout', 30),
-            follow_redirects=True,
-            headers=self._get_headers()
-        )
-        
-        # 配置代理
+        proxy_url = None
         if self.config.get('proxy', 'enabled'):
             proxy_url = self.config.get('proxy', 'url')
-            if proxy_url:
-                self.session = httpx.Client(
-                    timeout=request_config.get('timeout', 30),
-                    follow_redirects=True,
-                    headers=self._get_headers(),
-                    proxy=proxy_url
-                )
+        
+        self.max_retries = request_config.get('max_retries', 3)
+        self.session = acquire_client(
+            request_config, proxy_url,
+            shared=(request_config.get('pool', {}) or {}).get('shared', True)
+        )
     
     def _get_headers(self) -> Dict[str, str]:
         """获取请求头"""
@@ -63,6 +68,15 @@ class BaseCollector(ABC):
         content = '_'.join(str(a) for a in args)
         return hashlib.md5(content.encode()).hexdigest()[:16]
     
+    def _is_seen(self, record_id: str) -> bool:
+        """是否在往次运行中已采集过"""
+        return self.seen_index is not None and record_id in self.seen_index
+    
+    def _mark_seen(self, record_id: str):
+        """记录已产出的数据ID"""
+        if self.seen_index is not None:
+            self.seen_index.add(record_id)
+    
     def _delay(self, delay_range: List[int] = None):
         """随机延迟，避免被封"""
         if delay_range is None:
@@ -70,55 +84,109 @@ class BaseCollector(ABC):
         delay = random.uniform(delay_range[0], delay_range[1])
         time.sleep(delay)
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    @staticmethod
+    def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """重试等待时间：优先遵循 Retry-After（上限60秒），否则指数退避 2~10 秒"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), 60.0)
+        return min(max(2.0 ** attempt, 2.0), 10.0)
+    
     def _request(self, url: str, method: str = 'GET', **kwargs) -> httpx.Response:
-        """发送HTTP请求，带重试机制"""
-        self.logger.debug(f"请求: {method} {url}")
-        
+        """发送HTTP请求：网络异常与 429/5xx 重试，其余 4xx 直接抛出"""
         # 更新User-Agent
-        if 'headers' not in kwargs:
-            kwargs['headers'] = {}
-        kwargs['headers']['User-Agent'] = self.ua.random
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers['User-Agent'] = self.ua.random
         
-        response = self.session.request(method, url, **kwargs)
-        response.raise_for_status()
+        for attempt in range(1, max(1, self.max_retries) + 1):
+            self.logger.debug(f"请求: {method} {url} (尝试 {attempt})")
+            last = attempt >= self.max_retries
+            
+            try:
+                response = self._send(method, url, headers, **kwargs)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                self.logger.warning(f"请求异常 (尝试 {attempt}): {e}")
+                time.sleep(self._retry_delay(attempt))
+                continue
+            
+            if response.status_code in RETRY_STATUSES and not last:
+                self.logger.warning(f"请求失败: {response.status_code}，稍后重试 {url}")
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            
+            # 304 为条件请求的正常结果
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+    
+    def _send(self, method: str, url: str, headers: Dict[str, str], **kwargs) -> httpx.Response:
+        """发送一次请求（录制模式下记录响应，回放模式下从录制带返回）"""
+        params = kwargs.get('params')
+        if self.cassette is not None and self.cassette.replaying:
+            interaction = self.cassette.replay_sync(method, url, params)
+            return httpx.Response(
+                interaction.status,
+                headers=interaction.headers,
+                content=interaction.body,
+                request=httpx.Request(method, url, params=params)
+            )
         
+        started = time.monotonic()
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        if self.cassette is not None and self.cassette.recording:
+            self.cassette.record(method, url, params, response.status_code, response.headers,
+                                 response.content, time.monotonic() - started)
         return response
     
-    def _parse_time(self, time_str: str) -> datetime:
-        """解析时间字符串"""
-        # 常见时间格式
-        formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d %H:%M',
-            '%Y/%m/%d %H:%M:%S',
-            '%Y年%m月%d日 %H:%M',
-            '%m月%d日 %H:%M',
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(time_str, fmt)
-            except ValueError:
-                continue
+    def _request_if_modified(self, url: str, params: Dict = None, variant: str = None,
+                             **kwargs) -> Tuple[Optional[str], Optional[Callable[[], Any]]]:
+        """
+        带缓存的条件请求
+        
+        Args:
+            url: 请求地址
+            params: 查询参数
+            variant: 缓存键变体（同一页面按不同条件解析时区分）
+            
+        Returns:
+            (页面文本, store)；页面未变化（304或内容哈希相同）时文本为None，调用方可跳过解析。
+            新内容的缓存条目由调用方在该页数据全部产出后调用 store 写入，被条数上限截断时不写。
+        """
+        if self.http_cache is None:
+            return self._request(url, params=params, **kwargs).text, None
+        
+        key = self.http_cache.make_key(url, params, variant)
+        entry = self.http_cache.get(key)
+        
+        headers = kwargs.pop('headers', {})
+        headers.update(self.http_cache.conditional_headers(entry))
         
-        # 处理相对时间
-        now = datetime.now()
-        if '刚刚' in time_str or '秒前' in time_str:
-            return now
-        elif '分钟前' in time_str:
-            minutes = int(''.join(filter(str.isdigit, time_str)) or 1)
-            return now.replace(minute=max(0, now.minute - minutes))
-        elif '小时前' in time_str:
-            hours = int(''.join(filter(str.isdigit, time_str)) or 1)
-            return now.replace(hour=max(0, now.hour - hours))
-        elif '昨天' in time_str:
-            return now.replace(day=now.day - 1)
-        elif '今天' in time_str:
-            return now
-        
-        self.logger.warning(f"无法解析时间: {time_str}")
-        return now
+        response = self._request(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304:
+            self.http_cache.touch(key)
+            self.logger.debug(f"页面未修改(304): {url}")
+            return None, None
+        
+        store = partial(self.http_cache.store, key, str(response.url), response.content, response.headers)
+        if entry and entry.content_hash == self.http_cache.content_hash(response.content):
+            # 内容与已缓存（已完整处理过）的一致，只更新 ETag 与访问时间
+            store()
+            self.logger.debug(f"页面内容未变化: {url}")
+            return None, None
+        
+        return response.text, store
+    
+    def _parse_time(self, time_str: str) -> datetime:
+        """解析时间字符串（见 core.time_parser），无法解析时取当前时间"""
+        parsed = parse_time(time_str)
+        if parsed is None:
+            if time_str:
+                self.logger.warning(f"无法解析时间: {time_str}")
+            return datetime.now()
+        return parsed
     
     @abstractmethod
     def collect(self, keywords: List[str], **kwargs) -> Generator[RawData, None, None]:
@@ -179,9 +247,14 @@ class BaseCollector(ABC):
         return results
     
     def close(self):
-        """关闭会话"""
+        """关闭会话（共享连接池在最后一个采集器关闭时关闭）"""
         if self.session:
-            self.session.close()
+            release_client(self.session)
+            self.session = None
+        if self.http_cache:
+            self.http_cache.close()
+        if self.seen_index:
+            self.seen_index.close()
     
     def __enter__(self):
         return self
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+请求录制/回放 - 把真实请求与响应录制到本地压缩文件，离线按可配置的延迟与错误率回放
+"""
+
+import re
+import gzip
+import json
+import time
+import base64
+import random
+import asyncio
+import threading
+from pathlib import Path
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Mapping, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .logger import get_logger
+
+
+CHARSET_RE = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# 同一进程内多个采集器可能追加写同一个录制文件
+_write_lock = threading.Lock()
+
+# 不写入录制文件的响应头（录制的是解压后的响应体，长度/编码头已不适用）
+SKIP_HEADERS = ('set-cookie', 'content-encoding', 'content-length', 'transfer-encoding')
+
+
+@dataclass
+class Interaction:
+    """一次录制的请求与响应"""
+    method: str
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b''
+    elapsed: float = 0.0
+    
+    @property
+    def encoding(self) -> Optional[str]:
+        """Content-Type 中声明的编码"""
+        for name, value in self.headers.items():
+            if name.lower() == 'content-type':
+                match = CHARSET_RE.search(value)
+                return match.group(1).lower() if match else None
+        return None
+    
+    def to_line(self) -> str:
+        data = asdict(self)
+        data['body'] = base64.b64encode(self.body).decode('ascii')
+        return json.dumps(data, ensure_ascii=False) + '\n'
+    
+    @classmethod
+    def from_line(cls, line: str) -> 'Interaction':
+        data = json.loads(line)
+        data['body'] = base64.b64decode(data.get('body', ''))
+        return cls(**data)
+
+
+class Cassette:
+    """
+    录制带（每个数据源一个 gzip 压缩的 JSONL 文件）
+    
+    - record: 每次真实请求完成后追加一条记录（每条独立压缩，进程崩溃不影响已写入的记录）
+    - replay: 不发网络请求，按 方法 + 规范化URL（合并参数、排序、去掉 ignore_params）查找记录；
+      同一URL录制了多次时按顺序轮流返回。可模拟固定/录制时的延迟，并按 error_rate
+      注入 error_status 响应（用于验证重试与降级），随机数使用固定种子，结果可复现。
+      未录制的请求返回 404。
+    """
+    
+    def __init__(self, path: str, mode: str = 'replay', latency: Any = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: int = 0,
+                 ignore_params: List[str] = None):
+        self.logger = get_logger('Cassette')
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ignore_params = set(ignore_params or [])
+        self._rng = random.Random(seed)
+        
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.injected_errors = 0
+        
+        self._interactions: Dict[str, List[Interaction]] = {}
+        self._cursors: Dict[str, int] = {}
+        if self.replaying:
+            self._load()
+    
+    @classmethod
+    def from_config(cls, config, name: str) -> Optional['Cassette']:
+        """从配置创建，mode 为 off 时返回None"""
+        cassette_config = config.get('cassette', default={}) or {}
+        mode = cassette_config.get('mode', 'off')
+        if mode not in ('record', 'replay'):
+            return None
+        return cls(
+            path=Path(cassette_config.get('dir', './cassettes')) / f"{name}.jsonl.gz",
+            mode=mode,
+            latency=cassette_config.get('latency', 0.0),
+            jitter=cassette_config.get('jitter', 0.0),
+            error_rate=cassette_config.get('error_rate', 0.0),
+            error_status=cassette_config.get('error_status', 503),
+            seed=cassette_config.get('seed', 0),
+            ignore_params=cassette_config.get('ignore_params', [])
+        )
+    
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+    
+    def _load(self):
+        """加载录制文件"""
+        if not self.path.exists():
+            self.logger.warning(f"录制文件不存在，所有请求将返回404: {self.path}")
+            return
+        
+        count = 0
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    interaction = Interaction.from_line(line)
+                    key = self.make_key(interaction.method, interaction.url)
+                    self._interactions.setdefault(key, []).append(interaction)
+                    count += 1
+        except (OSError, EOFError, ValueError) as e:
+            # 录制进程崩溃时最后一条记录可能不完整
+            self.logger.warning(f"录制文件末尾不完整，已加载 {count} 条: {e}")
+        self.logger.info(f"加载录制 {self.path.name}: {count} 条, {len(self._interactions)} 个URL")
+    
+    def make_key(self, method: str, url: str, params: Mapping[str, Any] = None) -> str:
+        """方法 + 规范化URL（查询参数合并、排序，去掉 ignore_params）"""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        query += [(k, str(v)) for k, v in (params or {}).items()]
+        query = sorted((k, v) for k, v in query if k not in self.ignore_params)
+        return f"{method.upper()} {urlunsplit(parts._replace(query=urlencode(query), fragment=''))}"
+    
+    def record(self, method: str, url: str, params: Mapping[str, Any], status: int,
+               headers: Mapping[str, str], body: bytes, elapsed: float = 0.0):
+        """追加一条录制"""
+        interaction = Interaction(
+            method=method.upper(),
+            url=self.make_key(method, url, params).split(' ', 1)[1],
+            status=status,
+            headers={k: v for k, v in (headers or {}).items() if k.lower() not in SKIP_HEADERS},
+            body=body or b'',
+            elapsed=round(elapsed, 4)
+        )
+        data = gzip.compress(interaction.to_line().encode('utf-8'))
+        with _write_lock:
+            with open(self.path, 'ab') as f:
+                f.write(data)
+        self.recorded += 1
+    
+    def _next(self, method: str, url: str, params: Mapping[str, Any] = None) -> Interaction:
+        """查找录制（同一URL多条时轮流返回），按错误率注入错误响应"""
+        key = self.make_key(method, url, params)
+        
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.injected_errors += 1
+            return Interaction(method=method, url=url, status=self.error_status)
+        
+        recordings = self._interactions.get(key)
+        if not recordings:
+            self.misses += 1
+            self.logger.debug(f"未录制的请求: {key}")
+            return Interaction(method=method, url=url, status=404)
+        
+        index = self._cursors.get(key, 0)
+        self._cursors[key] = index + 1
+        self.replayed += 1
+        return recordings[index % len(recordings)]
+    
+    def _delay(self, interaction: Interaction) -> float:
+        """模拟延迟：固定值或录制时的耗时，加均匀抖动"""
+        base = interaction.elapsed if self.latency == 'recorded' else float(self.latency or 0)
+        if self.jitter:
+            base += self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+    
+    async def replay(self, method: str, url: str, params: Mapping[str, Any] = None) -> Interaction:
+        """回放一次请求（异步采集器）"""
+        interaction = self._next(method, url, params)
+        delay = self._delay(interaction)
+        if delay:
+            await asyncio.sleep(delay)
+        return interaction
+    
+    def replay_sync(self, method: str, url: str, params: Mapping[str, Any] = None) -> Interaction:
+        """回放一次请求（同步采集器）"""
+        interaction = self._next(method, url, params)
+        delay = self._delay(interaction)
+        if delay:
+            time.sleep(delay)
+        return interaction
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """录制/回放统计"""
+        if self.recording:
+            return {'mode': self.mode, 'recorded': self.recorded, 'file': str(self.path)}
+        return {
+            'mode': self.mode,
+            'replayed': self.replayed,
+            'misses': self.misses,
+            'injected_errors': self.injected_errors
+        }
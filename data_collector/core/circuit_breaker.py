@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+熔断器 - 按目标主机/代理记录连续失败，熔断期间直接跳过，到期后以少量试探请求半开恢复
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from .logger import get_logger
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    单个熔断器
+    
+    - closed: 正常放行，连续失败达到 failure_threshold 次后熔断
+    - open: 拒绝请求，reset_timeout 秒后进入半开
+    - half_open: 只放行 half_open_probes 个试探请求；成功则恢复，失败则重新熔断，
+      熔断时间翻倍（不超过 max_reset_timeout）
+    """
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    max_reset_timeout: float = 600.0
+    half_open_probes: int = 1
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    timeout: float = 0.0
+    probes: int = 0
+    trips: int = 0
+    
+    def allow(self, now: float = None) -> bool:
+        """是否放行一次请求（半开时占用一个试探名额，需配对调用 record/release）"""
+        if self.state == CLOSED:
+            return True
+        now = now or time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.timeout:
+                return False
+            self.state = HALF_OPEN
+            self.probes = 0
+        if self.probes >= self.half_open_probes:
+            return False
+        self.probes += 1
+        return True
+    
+    def blocked(self, now: float = None) -> bool:
+        """当前是否会拒绝请求（不占用试探名额）"""
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN:
+            return (now or time.monotonic()) - self.opened_at < self.timeout
+        return self.probes >= self.half_open_probes
+    
+    def record(self, ok: bool, now: float = None) -> Optional[str]:
+        """记录请求结果，状态变化时返回新状态"""
+        if self.state == HALF_OPEN:
+            self.probes = max(0, self.probes - 1)
+            if ok:
+                self._close()
+                return CLOSED
+            self._open(now, min(self.max_reset_timeout, max(self.timeout, self.reset_timeout) * 2))
+            return OPEN
+        
+        if ok:
+            self.failures = 0
+            return None
+        self.failures += 1
+        if self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open(now, self.reset_timeout)
+            return OPEN
+        return None
+    
+    def release(self):
+        """归还未产生结果的试探名额（请求被取消）"""
+        if self.state == HALF_OPEN:
+            self.probes = max(0, self.probes - 1)
+    
+    def _open(self, now: Optional[float], timeout: float):
+        self.state = OPEN
+        self.opened_at = now or time.monotonic()
+        self.timeout = timeout
+        self.trips += 1
+    
+    def _close(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = 0.0
+        self.probes = 0
+
+
+class CircuitBreakers:
+    """
+    熔断器注册表
+    
+    以 (类型, 名称) 为键，类型为 host（目标主机）或 proxy（代理地址），
+    两类各自使用 host_failures / proxy_failures 作为熔断阈值。
+    """
+    
+    def __init__(self, host_failures: int = 5, proxy_failures: int = 3, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 600.0, half_open_probes: int = 1):
+        self.logger = get_logger('CircuitBreaker')
+        self.thresholds = {'host': host_failures, 'proxy': proxy_failures}
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.half_open_probes = half_open_probes
+        self.breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        # 非 closed 状态的熔断器，选择代理时只需检查这些
+        self._tripped: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.rejected = 0
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['CircuitBreakers']:
+        """从配置创建，未启用时返回None"""
+        breaker_config = config.get('circuit_breaker', default={}) or {}
+        if not breaker_config.get('enabled', False):
+            return None
+        return cls(
+            host_failures=breaker_config.get('host_failures', 5),
+            proxy_failures=breaker_config.get('proxy_failures', 3),
+            reset_timeout=breaker_config.get('reset_timeout', 30),
+            max_reset_timeout=breaker_config.get('max_reset_timeout', 600),
+            half_open_probes=breaker_config.get('half_open_probes', 1)
+        )
+    
+    def get(self, kind: str, name: str) -> CircuitBreaker:
+        key = (kind, name)
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(
+                failure_threshold=self.thresholds.get(kind, 5),
+                reset_timeout=self.reset_timeout,
+                max_reset_timeout=self.max_reset_timeout,
+                half_open_probes=self.half_open_probes
+            )
+        return breaker
+    
+    def allow(self, kind: str, name: str) -> bool:
+        """是否放行（半开时占用试探名额）"""
+        if (kind, name) not in self._tripped:
+            return True
+        allowed = self.get(kind, name).allow()
+        if not allowed:
+            self.rejected += 1
+        return allowed
+    
+    def record(self, kind: str, name: str, ok: bool):
+        """记录请求结果"""
+        breaker = self.get(kind, name)
+        state = breaker.record(ok)
+        if state == OPEN:
+            self._tripped[(kind, name)] = breaker
+            self.logger.warning(f"熔断 {kind} {name}，{breaker.timeout:.0f} 秒后试探恢复")
+        elif state == CLOSED:
+            self._tripped.pop((kind, name), None)
+            self.logger.info(f"熔断恢复 {kind} {name}")
+    
+    def release(self, kind: str, name: str):
+        """请求被取消，归还试探名额"""
+        breaker = self._tripped.get((kind, name))
+        if breaker is not None:
+            breaker.release()
+    
+    def blocked(self, kind: str) -> Set[str]:
+        """该类型下当前会拒绝请求的名称（如需跳过的代理）"""
+        now = time.monotonic()
+        return {name for (k, name), breaker in self._tripped.items() if k == kind and breaker.blocked(now)}
+    
+    def get_statistics(self) -> Dict:
+        """熔断状态"""
+        return {
+            'rejected': self.rejected,
+            'tripped': {
+                f"{kind}:{name}": {'state': breaker.state, 'trips': breaker.trips,
+                                   'timeout': f"{breaker.timeout:.0f}s"}
+                for (kind, name), breaker in self._tripped.items()
+            }
+        }
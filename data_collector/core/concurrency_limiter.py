@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+并发限制器 - 按主机的自适应并发上限（延迟梯度），替代固定大小的信号量
+"""
+
+import math
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .logger import get_logger
+from .rate_limiter import THROTTLE_STATUSES
+
+
+@dataclass
+class AdaptiveLimit:
+    """
+    单个主机的并发上限（延迟梯度算法）
+    
+    每 window 个成功请求取一次平均延迟，基线为最近 probe_every 个窗口平均延迟的最小值。
+    梯度 = tolerance × 基线 / 当前窗口延迟：未超过容忍倍数时上限按 sqrt(limit) 增长，
+    排队导致延迟升高时按梯度收缩；在途请求不足上限一半时（负载不足）不增长。
+    持续满载时所有窗口都带排队延迟，基线会被慢慢抬高，因此每 probe_every 个窗口
+    以一半上限运行一个窗口重新测量基线。
+    被限流(418/429)、5xx 或超时时乘性收缩，同一窗口内最多收缩一次。
+    """
+    limit: float = 5.0
+    min_limit: int = 1
+    max_limit: int = 20
+    tolerance: float = 2.0        # 窗口延迟相对基线的容忍倍数
+    smoothing: float = 0.5        # 上限调整的平滑系数
+    backoff: float = 0.75         # 被限流/出错时的乘性因子
+    window: int = 30              # 每次调整的样本数
+    probe_every: int = 30         # 每隔多少个窗口以一半上限重新测量基线
+    adaptive: bool = True
+    in_flight: int = 0
+    rtt: float = 0.0              # 最近一个窗口的平均延迟
+    baseline_rtt: float = 0.0
+    drops: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    _window_rtts: List[float] = field(default_factory=list)
+    _window_peak: int = 0
+    _windows: int = 0
+    _history: Deque[float] = field(default_factory=deque)
+    _probing: bool = False
+    _backed_off: bool = False
+    
+    def __post_init__(self):
+        self.min_limit = max(1, int(self.min_limit))
+        self.max_limit = max(self.min_limit, int(self.max_limit))
+        self.limit = min(self.max_limit, max(self.min_limit, float(self.limit)))
+        self._history = deque(maxlen=max(1, self.probe_every) + 1)
+    
+    @property
+    def capacity(self) -> int:
+        limit = self.limit / 2 if self._probing else self.limit
+        return max(self.min_limit, int(limit))
+    
+    async def acquire(self):
+        """获取一个并发名额，超过上限时排队（先到先得）"""
+        if self.in_flight < self.capacity and not self.waiters:
+            self.in_flight += 1
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已分配名额但调用方被取消，归还名额
+                self.release()
+            else:
+                try:
+                    self.waiters.remove(future)
+                except ValueError:
+                    pass
+            raise
+    
+    def release(self):
+        """归还名额并唤醒排队者"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+    
+    def _wake(self):
+        while self.waiters and self.in_flight < self.capacity:
+            future = self.waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+    
+    def on_sample(self, rtt: float, in_flight: int):
+        """成功请求的延迟样本（in_flight 为该请求发出时的在途数）"""
+        if not self.adaptive or rtt <= 0:
+            return
+        # 测量基线的窗口只统计在降低后的上限内发出的请求
+        if self._probing and in_flight > self.capacity:
+            return
+        self._window_rtts.append(rtt)
+        self._window_peak = max(self._window_peak, in_flight)
+        if len(self._window_rtts) < self.window:
+            return
+        
+        self.rtt = sum(self._window_rtts) / len(self._window_rtts)
+        peak = self._window_peak
+        self._window_rtts = []
+        self._window_peak = 0
+        self._backed_off = False
+        self._windows += 1
+        self._history.append(self.rtt)
+        self.baseline_rtt = min(self._history)
+        
+        if self._probing:
+            self._probing = False
+            self._wake()
+            return
+        if self.probe_every and self._windows % self.probe_every == 0:
+            self._probing = True
+            return
+        
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline_rtt / self.rtt))
+        if gradient < 1.0:
+            target = self.limit * gradient
+        elif peak * 2 >= self.limit:
+            target = self.limit + math.sqrt(self.limit)
+        else:
+            return
+        self._set_limit((1 - self.smoothing) * self.limit + self.smoothing * target)
+    
+    def on_drop(self):
+        """被限流/出错：乘性收缩（同一窗口内只收缩一次，避免积压的失败连续减半）"""
+        self.drops += 1
+        if self.adaptive and not self._backed_off:
+            self._backed_off = True
+            self._set_limit(self.limit * self.backoff)
+    
+    def _set_limit(self, limit: float):
+        self.limit = min(self.max_limit, max(self.min_limit, limit))
+        self._wake()
+
+
+class ConcurrencySlot:
+    """一次请求占用的并发名额（async with），退出时按结果调整上限"""
+    
+    def __init__(self, limit: AdaptiveLimit):
+        self._limit = limit
+        self.status: Optional[int] = None
+        self.started = 0.0
+        self._in_flight = 0
+    
+    async def __aenter__(self) -> 'ConcurrencySlot':
+        await self._limit.acquire()
+        self._in_flight = self._limit.in_flight
+        self.started = time.monotonic()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        limit = self._limit
+        status = self.status
+        try:
+            if exc_type is not None:
+                if issubclass(exc_type, asyncio.TimeoutError):
+                    limit.on_drop()
+            elif status in THROTTLE_STATUSES or (status is not None and status >= 500):
+                limit.on_drop()
+            elif status is not None and status < 400:
+                limit.on_sample(time.monotonic() - self.started, self._in_flight)
+        finally:
+            limit.release()
+
+
+class ConcurrencyLimiter:
+    """
+    并发限制器
+    
+    adaptive 为 True 时按目标主机各自维护自适应上限（初始值为采集器的 max_concurrent，
+    限制在 [min_limit, max_limit]，hosts 中可按主机覆盖参数）；
+    为 False 时所有请求共享一个固定上限，与原来的信号量一致。
+    """
+    
+    def __init__(self, initial: int = 10, adaptive: bool = True, defaults: Dict = None,
+                 hosts: Dict[str, Dict] = None):
+        self.logger = get_logger('ConcurrencyLimiter')
+        self.initial = max(1, initial)
+        self.adaptive = adaptive
+        self.defaults = defaults or {}
+        self.hosts = {host.lower(): params for host, params in (hosts or {}).items()}
+        self.limits: Dict[str, AdaptiveLimit] = {}
+    
+    @classmethod
+    def from_config(cls, config, initial: int) -> 'ConcurrencyLimiter':
+        """从配置创建（initial 为采集器的 max_concurrent）"""
+        concurrency_config = dict(config.get('concurrency', default={}) or {})
+        hosts = concurrency_config.pop('hosts', {}) or {}
+        adaptive = concurrency_config.pop('adaptive', False)
+        return cls(initial=initial, adaptive=adaptive, defaults=concurrency_config, hosts=hosts)
+    
+    @property
+    def max_workers(self) -> int:
+        """可能达到的最大并发（分页调度器的工作协程数）"""
+        if not self.adaptive:
+            return self.initial
+        bounds = [self.defaults.get('max_limit', 20)]
+        bounds += [params.get('max_limit', bounds[0]) for params in self.hosts.values()]
+        return max(self.initial, *bounds)
+    
+    def get_limit(self, url: str) -> AdaptiveLimit:
+        """目标主机的并发上限（非自适应时全局共享一个）"""
+        host = urlsplit(url).netloc.lower() if self.adaptive else ''
+        limit = self.limits.get(host)
+        if limit is None:
+            if self.adaptive:
+                params = dict(self.defaults)
+                params.update(self.hosts.get(host, {}))
+                params.setdefault('limit', self.initial)
+                limit = AdaptiveLimit(**params)
+            else:
+                limit = AdaptiveLimit(limit=self.initial, min_limit=self.initial,
+                                      max_limit=self.initial, adaptive=False)
+            self.limits[host] = limit
+        return limit
+    
+    def slot(self, url: str) -> ConcurrencySlot:
+        """占用目标主机的一个并发名额（async with）"""
+        return ConcurrencySlot(self.get_limit(url))
+    
+    def describe(self) -> str:
+        """当前并发设置（日志用）"""
+        if not self.adaptive:
+            return str(self.initial)
+        return f"自适应, 初始 {self.initial}, 范围 {self.defaults.get('min_limit', 1)}~{self.max_workers}"
+    
+    def get_statistics(self) -> Dict[str, Dict]:
+        """各主机并发状态"""
+        return {
+            host or '*': {
+                'limit': round(limit.limit, 1),
+                'in_flight': limit.in_flight,
+                'queued': len(limit.waiters),
+                'rtt_ms': f"{limit.rtt * 1000:.0f}/{limit.baseline_rtt * 1000:.0f}",
+                'drops': limit.drops
+            }
+            for host, limit in self.limits.items()
+        }
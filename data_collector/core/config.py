@@ -15,6 +15,8 @@ class Config:
     
     _instance = None
     _config: Dict[str, Any] = {}
+    _config_path: Optional[Path] = None
+    _mtime: float = 0.0
     
     def __new__(cls):
         if cls._instance is None:
@@ -35,14 +37,39 @@ class Config:
         config_path = Path(config_path)
         
         if config_path.exists():
+            mtime = config_path.stat().st_mtime
             with open(config_path, 'r', encoding='utf-8') as f:
                 self._config = yaml.safe_load(f)
+            self._config_path = config_path
+            self._mtime = mtime
         else:
             raise FileNotFoundError(f"配置文件不存在: {config_path}")
         
         # 加载环境变量覆盖
         self._load_env_overrides()
     
+    def reload_if_changed(self) -> bool:
+        """
+        配置文件修改后重新加载（常驻进程热更新），返回是否已重新加载
+        
+        解析失败时保留原配置，文件再次修改后重试。
+        """
+        if self._config_path is None:
+            return False
+        try:
+            mtime = self._config_path.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        
+        try:
+            self.load(self._config_path)
+        except Exception:
+            self._mtime = mtime
+            raise
+        return True
+    
     def _load_env_overrides(self):
         """从环境变量加载敏感配置"""
         env_mappings = {
@@ -77,6 +104,10 @@ class Config:
                 return default
         return d
     
+    def set(self, *keys, value=None):
+        """设置配置值（仅运行时覆盖，不写回文件）"""
+        self._set_nested(keys, value)
+    
     @property
     def weibo(self) -> Dict:
         return self._config.get('weibo', {})
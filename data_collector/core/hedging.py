@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+对冲请求策略 - 请求耗时超过该主机近期 p95 时，经另一个代理补发一次，取先返回的结果
+"""
+
+import math
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .logger import get_logger
+
+
+class HedgePolicy:
+    """
+    对冲策略
+    
+    按目标主机记录最近 window 次成功请求的耗时，样本数达到 min_samples 后
+    以 quantile 分位数（不低于 min_delay）作为补发延迟；样本不足时不补发。
+    补发次数不超过总请求数的 max_ratio，整体变慢时不会成倍放大请求量。
+    """
+    
+    def __init__(self, quantile: float = 0.95, min_delay: float = 0.5, window: int = 200,
+                 min_samples: int = 20, max_ratio: float = 0.1):
+        self.logger = get_logger('HedgePolicy')
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._delays: Dict[str, float] = {}
+        self._pending: Dict[str, int] = {}
+        
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['HedgePolicy']:
+        """从配置创建，未启用时返回None"""
+        hedge_config = config.get('hedging', default={}) or {}
+        if not hedge_config.get('enabled', False):
+            return None
+        return cls(
+            quantile=hedge_config.get('quantile', 0.95),
+            min_delay=hedge_config.get('min_delay', 0.5),
+            window=hedge_config.get('window', 200),
+            min_samples=hedge_config.get('min_samples', 20),
+            max_ratio=hedge_config.get('max_ratio', 0.1)
+        )
+    
+    def observe(self, host: str, elapsed: float):
+        """记录一次成功请求的耗时"""
+        latencies = self._latencies.get(host)
+        if latencies is None:
+            latencies = self._latencies[host] = deque(maxlen=self.window)
+        latencies.append(elapsed)
+        
+        # 每积累一定样本重新计算分位数，不在每次请求时排序
+        pending = self._pending.get(host, 0) + 1
+        if pending >= 10 or host not in self._delays:
+            pending = 0
+            if len(latencies) >= self.min_samples:
+                ordered = sorted(latencies)
+                index = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+                self._delays[host] = max(self.min_delay, ordered[index])
+        self._pending[host] = pending
+    
+    def delay(self, host: str) -> Optional[float]:
+        """本次请求的补发延迟，不补发时返回None"""
+        self.requests += 1
+        if self.hedged >= self.max_ratio * self.requests:
+            return None
+        return self._delays.get(host)
+    
+    def on_hedge(self):
+        self.hedged += 1
+    
+    def on_hedge_win(self):
+        """补发的请求先返回"""
+        self.hedge_wins += 1
+    
+    def get_statistics(self) -> Dict:
+        """对冲统计"""
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'delays': {host: f"{delay * 1000:.0f}ms" for host, delay in self._delays.items()}
+        }
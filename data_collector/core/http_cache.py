@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP响应缓存 - 持久化、容量受限(LRU)，支持 ETag/Last-Modified 条件请求
+"""
+
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Optional, Mapping, Any
+
+from .logger import get_logger
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目（不含响应体）"""
+    key: str
+    url: str
+    etag: str = ''
+    last_modified: str = ''
+    content_hash: str = ''
+    size: int = 0
+    accessed: float = 0.0
+
+
+class ResponseCache:
+    """
+    列表页响应缓存
+    
+    以 URL + 参数为键保存响应体及校验信息，同步与异步采集器共用。
+    - 再次请求时携带 If-None-Match / If-Modified-Since
+    - 304 或内容哈希未变化时判定为未修改，调用方可跳过解析
+    - 总容量超过上限时按最近访问时间淘汰
+    """
+    
+    def __init__(self, path: str = "./output/.http_cache.db", max_bytes: int = 200 * 1024 * 1024):
+        self.logger = get_logger('ResponseCache')
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT DEFAULT '',
+                last_modified TEXT DEFAULT '',
+                content_hash TEXT DEFAULT '',
+                size INTEGER DEFAULT 0,
+                accessed REAL DEFAULT 0,
+                body BLOB
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        self._conn.commit()
+        
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self.total_bytes = row[0]
+    
+    @classmethod
+    def from_config(cls, config, namespace: str = None) -> Optional['ResponseCache']:
+        """
+        从配置创建，未启用时返回None
+        
+        namespace（如 article）使用 http_cache.<namespace> 下配置的独立库与容量，
+        与列表页缓存分开淘汰。
+        """
+        cache_config = config.get('http_cache', default={}) or {}
+        if not cache_config.get('enabled', False):
+            return None
+        if namespace:
+            namespace_config = cache_config.get(namespace, {}) or {}
+            return cls(
+                path=namespace_config.get('path', f'./output/.{namespace}_cache.db'),
+                max_bytes=int(namespace_config.get('max_size_mb', 100)) * 1024 * 1024
+            )
+        return cls(
+            path=cache_config.get('path', './output/.http_cache.db'),
+            max_bytes=int(cache_config.get('max_size_mb', 200)) * 1024 * 1024
+        )
+    
+    @staticmethod
+    def make_key(url: str, params: Mapping[str, Any] = None, variant: str = None) -> str:
+        """生成缓存键（URL + 排序后的参数 + 调用方变体标识）"""
+        raw = json.dumps([url, sorted((params or {}).items()), variant or ''],
+                         ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def content_hash(body: bytes) -> str:
+        return hashlib.sha1(body).hexdigest()
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """获取缓存条目"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, url, etag, last_modified, content_hash, size, accessed "
+                "FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+    
+    def get_body(self, key: str) -> Optional[bytes]:
+        """获取缓存的响应体"""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return zlib.decompress(row[0])
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """生成条件请求头"""
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+    
+    def touch(self, key: str):
+        """标记命中（304），刷新LRU访问时间"""
+        self.hits += 1
+        with self._lock:
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+    
+    def store(self, key: str, url: str, body: bytes, headers: Mapping[str, str]) -> bool:
+        """
+        保存响应
+        
+        Returns:
+            内容是否发生变化（首次缓存也视为变化）
+        """
+        digest = self.content_hash(body)
+        etag = headers.get('ETag', '') or ''
+        last_modified = headers.get('Last-Modified', '') or ''
+        now = time.time()
+        
+        entry = self.get(key)
+        if entry and entry.content_hash == digest:
+            self.hits += 1
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE responses SET etag = ?, last_modified = ?, accessed = ? WHERE key = ?",
+                    (etag, last_modified, now, key)
+                )
+                self._conn.commit()
+            return False
+        
+        self.misses += 1
+        compressed = zlib.compress(body)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, etag, last_modified, content_hash, size, accessed, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, digest, len(compressed), now, compressed)
+            )
+            self._conn.commit()
+            self.total_bytes += len(compressed) - (entry.size if entry else 0)
+            self._evict()
+        return True
+    
+    def _evict(self):
+        """超出容量时淘汰最久未访问的条目（调用方持有锁）"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.total_bytes -= size
+            evicted += 1
+        self._conn.commit()
+        self.logger.debug(f"缓存淘汰 {evicted} 条，当前 {self.total_bytes / 1024 / 1024:.1f}MB")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': f"{self.hits / max(total, 1):.1%}",
+            'size_mb': f"{self.total_bytes / 1024 / 1024:.1f}"
+        }
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
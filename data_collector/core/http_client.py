@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+同步HTTP客户端 - 连接池参数、可选HTTP/2，以及跨采集器共享的连接池
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from .logger import get_logger
+
+
+logger = get_logger('HttpClient')
+
+# 可重试的状态码（限流/服务端错误），其余 4xx 直接失败
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# 共享客户端注册表: (代理, 是否HTTP/2) -> [客户端, 引用数]
+_shared: Dict[Tuple[str, bool], list] = {}
+_shared_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_client(request_config: Dict, proxy: str = None) -> httpx.Client:
+    """
+    按 request 配置创建客户端
+    
+    request.pool 下可配置 max_connections / max_keepalive_connections /
+    keepalive_expiry / http2；http2 需要安装 h2，未安装时回退到 HTTP/1.1。
+    """
+    pool_config = request_config.get('pool', {}) or {}
+    
+    http2 = bool(pool_config.get('http2', False))
+    if http2 and not _http2_available():
+        logger.warning("未安装 h2（pip install httpx[http2]），回退到 HTTP/1.1")
+        http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=pool_config.get('max_connections', 20),
+        max_keepalive_connections=pool_config.get('max_keepalive_connections', 10),
+        keepalive_expiry=pool_config.get('keepalive_expiry', 30.0)
+    )
+    
+    return httpx.Client(
+        timeout=request_config.get('timeout', 30),
+        follow_redirects=True,
+        headers=request_config.get('headers', {}),
+        limits=limits,
+        http2=http2,
+        proxy=proxy or None
+    )
+
+
+def acquire_client(request_config: Dict, proxy: str = None, shared: bool = True) -> httpx.Client:
+    """
+    获取客户端
+    
+    shared=True 时同一代理的采集器共用一个连接池（复用 keep-alive 连接与 TLS 会话），
+    需与 release_client 配对调用，最后一个使用者释放时关闭。
+    """
+    if not shared:
+        return build_client(request_config, proxy)
+    
+    http2 = bool((request_config.get('pool', {}) or {}).get('http2', False))
+    key = (proxy or '', http2)
+    with _shared_lock:
+        slot = _shared.get(key)
+        if slot is None or slot[0].is_closed:
+            slot = _shared[key] = [build_client(request_config, proxy), 0]
+        slot[1] += 1
+        return slot[0]
+
+
+def release_client(client: Optional[httpx.Client]):
+    """释放客户端：共享客户端引用数归零时关闭，独占客户端直接关闭"""
+    if client is None:
+        return
+    with _shared_lock:
+        for key, slot in _shared.items():
+            if slot[0] is client:
+                slot[1] -= 1
+                if slot[1] <= 0:
+                    del _shared[key]
+                    client.close()
+                return
+    client.close()
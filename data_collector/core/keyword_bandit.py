@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+关键词收益调度 - 按历史“每次请求的新增记录数”分配翻页预算（UCB 多臂老虎机）
+"""
+
+import json
+import math
+import heapq
+import os
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+from .logger import get_logger
+
+
+@dataclass
+class KeywordYield:
+    """关键词累计收益（按轮次衰减）"""
+    requests: float = 0.0
+    new_records: float = 0.0
+    runs: int = 0
+    updated_at: str = ""
+    
+    @property
+    def mean(self) -> float:
+        """每次请求的平均新增记录数"""
+        return self.new_records / self.requests if self.requests else 0.0
+
+
+class KeywordBandit:
+    """
+    关键词预算分配器
+    
+    每个关键词是一个臂，收益为每页请求带来的新增（去重后）记录数。
+    分配时按 UCB 得分（平均收益 + 探索项）比例切分总页数预算，
+    每个关键词至少 min_pages 页、至多 max_pages 页；没有历史的关键词按当前最优臂对待。
+    往次统计每轮乘以 decay，关键词热度变化后能较快反映到分配上。
+    """
+    
+    def __init__(self, state_file: str = "./output/.keyword_yield.json",
+                 exploration: float = 0.3, decay: float = 0.8):
+        self.logger = get_logger('KeywordBandit')
+        self.state_file = Path(state_file)
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.exploration = exploration
+        self.decay = decay
+        self.stats: Dict[str, KeywordYield] = {}
+        self._load()
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['KeywordBandit']:
+        """从配置创建，未启用时返回None"""
+        bandit_config = config.get('batch_collect', 'bandit', default={}) or {}
+        if not bandit_config.get('enabled', False):
+            return None
+        return cls(
+            state_file=bandit_config.get('state_file', './output/.keyword_yield.json'),
+            exploration=bandit_config.get('exploration', 0.3),
+            decay=bandit_config.get('decay', 0.8)
+        )
+    
+    def _load(self):
+        """从文件加载统计"""
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for keyword, stats in data.items():
+                    self.stats[keyword] = KeywordYield(**stats)
+                self.logger.info(f"加载 {len(self.stats)} 个关键词的收益统计")
+            except Exception as e:
+                self.logger.error(f"加载关键词收益统计失败: {e}")
+    
+    def save(self):
+        """原子写入文件"""
+        try:
+            tmp_file = self.state_file.with_suffix('.tmp')
+            data = {keyword: asdict(stats) for keyword, stats in self.stats.items()}
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.error(f"保存关键词收益统计失败: {e}")
+    
+    def record(self, keyword: str, requests: int, new_records: int):
+        """记录一轮采集的收益（往次统计先按 decay 衰减）"""
+        if requests <= 0:
+            return
+        stats = self.stats.setdefault(keyword, KeywordYield())
+        stats.requests = stats.requests * self.decay + requests
+        stats.new_records = stats.new_records * self.decay + new_records
+        stats.runs += 1
+        stats.updated_at = datetime.now().isoformat()
+    
+    def scores(self, keywords: List[str], priors: Dict[str, float] = None) -> Dict[str, float]:
+        """
+        UCB 得分: 平均收益 + exploration * 收益尺度 * sqrt(ln(总请求数) / 该词请求数)
+        
+        收益尺度取已知关键词的最高平均收益，使探索项与收益同量级；
+        没有历史的关键词取已知关键词中的最高得分，再按 priors（如配置的页数）
+        相对最大值折算，全部没有历史时得分即与 priors 成比例。
+        """
+        priors = priors or {}
+        top_prior = max((priors.get(kw, 1.0) for kw in keywords), default=1.0) or 1.0
+        known = {kw: self.stats[kw] for kw in keywords if kw in self.stats and self.stats[kw].requests > 0}
+        if not known:
+            return {kw: priors.get(kw, 1.0) / top_prior for kw in keywords}
+        
+        total = sum(stats.requests for stats in known.values())
+        scale = max(max(stats.mean for stats in known.values()), 1.0)
+        scores = {
+            kw: stats.mean + self.exploration * scale * math.sqrt(math.log(max(total, 2)) / stats.requests)
+            for kw, stats in known.items()
+        }
+        best = max(scores.values())
+        return {
+            kw: scores[kw] if kw in scores else best * priors.get(kw, 1.0) / top_prior
+            for kw in keywords
+        }
+    
+    def allocate(self, keywords: List[str], budget: int, min_pages: int = 1,
+                 max_pages: int = None, priors: Dict[str, float] = None) -> Dict[str, int]:
+        """
+        按得分比例分配总页数预算
+        
+        先给每个关键词 min_pages 页保底，剩余页数用最大商数法（D'Hondt）逐页分配：
+        每次给 得分 / (已分得的额外页数 + 1) 最大的关键词，结果与得分成比例且为整数。
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords or budget <= 0:
+            return {kw: 0 for kw in keywords}
+        
+        min_pages = max(0, min(min_pages, budget // len(keywords)))
+        if max_pages is not None:
+            min_pages = min(min_pages, max_pages)
+        pages = {kw: min_pages for kw in keywords}
+        remaining = budget - min_pages * len(keywords)
+        
+        scores = self.scores(keywords, priors)
+        heap = [(-scores[kw], i, kw) for i, kw in enumerate(keywords)]
+        heapq.heapify(heap)
+        
+        while remaining > 0 and heap:
+            _, i, kw = heapq.heappop(heap)
+            if max_pages is not None and pages[kw] >= max_pages:
+                continue
+            pages[kw] += 1
+            remaining -= 1
+            extra = pages[kw] - min_pages
+            heapq.heappush(heap, (-scores[kw] / (extra + 1), i, kw))
+        
+        return pages
+    
+    def get_statistics(self, keywords: List[str] = None,
+                       priors: Dict[str, float] = None) -> Dict[str, Dict]:
+        """各关键词收益统计"""
+        keywords = keywords if keywords is not None else list(self.stats)
+        scores = self.scores(keywords, priors)
+        result = {}
+        for kw in keywords:
+            stats = self.stats.get(kw, KeywordYield())
+            result[kw] = {
+                'requests': round(stats.requests, 1),
+                'new_records': round(stats.new_records, 1),
+                'yield': round(stats.mean, 2),
+                'score': round(scores[kw], 2),
+                'runs': stats.runs
+            }
+        return result
@@ -3,17 +3,45 @@
 代理池管理
 """
 
+import os
+import re
+import json
+import time
+import heapq
 import asyncio
-import random
-from typing import List, Optional, Dict
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Dict, Set, Tuple, AsyncGenerator
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
 
 import aiohttp
 
 from .logger import get_logger
 
 
+def _score(success_count: int, fail_count: int, response_time: float) -> float:
+    """综合成功率和响应时间的评分（越高越好）"""
+    total = success_count + fail_count
+    if total == 0:
+        return 50.0
+    
+    success_rate = success_count / total
+    time_score = max(0, 100 - response_time * 10)
+    return success_rate * 70 + time_score * 0.3
+
+
+@dataclass
+class HostStats:
+    """代理针对某个目标主机的表现"""
+    success_count: int = 0
+    fail_count: int = 0
+    response_time: float = 0.0
+    
+    @property
+    def score(self) -> float:
+        return _score(self.success_count, self.fail_count, self.response_time)
+
+
 @dataclass
 class Proxy:
     """代理信息"""
@@ -25,103 +53,354 @@ class Proxy:
     last_check: datetime = field(default_factory=datetime.now)
     response_time: float = 0.0
     is_valid: bool = True
+    consecutive_failures: int = 0
+    in_flight: int = 0
+    hosts: Dict[str, HostStats] = field(default_factory=dict)
+    version: int = 0
     
     @property
     def score(self) -> float:
         """计算代理评分（越高越好）"""
-        total = self.success_count + self.fail_count
-        if total == 0:
-            return 50.0
-        
-        success_rate = self.success_count / total
-        # 综合成功率和响应时间
-        time_score = max(0, 100 - self.response_time * 10)
-        return success_rate * 70 + time_score * 0.3
+        return _score(self.success_count, self.fail_count, self.response_time)
+    
+    def host_score(self, host: str) -> float:
+        """针对目标主机的评分，该主机无记录时使用总体评分"""
+        stats = self.hosts.get(host)
+        if stats and stats.success_count + stats.fail_count:
+            return stats.score
+        return self.score
+    
+    def to_state(self) -> Dict:
+        """持久化字段（不含在途数等运行时状态）"""
+        state = asdict(self)
+        state.pop('in_flight')
+        state.pop('version')
+        state['last_used'] = self.last_used.isoformat()
+        state['last_check'] = self.last_check.isoformat()
+        return state
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> 'Proxy':
+        state = dict(state)
+        state['last_used'] = datetime.fromisoformat(state['last_used'])
+        state['last_check'] = datetime.fromisoformat(state['last_check'])
+        state['hosts'] = {host: HostStats(**stats) for host, stats in state.get('hosts', {}).items()}
+        return cls(**state)
+
+
+# 选择用的堆条目: (-有效评分, 版本号, 代理地址)
+HeapEntry = Tuple[float, int, str]
+
+# 纯文本代理列表中的 ip:port
+PLAIN_PROXY_RE = re.compile(r'(?:(https?|socks[45])://)?(\d{1,3}(?:\.\d{1,3}){3}):(\d{2,5})')
 
 
 class ProxyPool:
-    """代理池管理器"""
+    """
+    代理池管理器
+    
+    按目标主机各维护一个最大堆（惰性失效）：
+    - 代理评分变化时版本号加一，只重新入当前目标主机的堆，选择为 O(log n)
+    - 其他主机堆中的条目出堆时发现版本落后，按当前评分重新入堆后再比较
+    - 有效评分 = 主机评分 - 在途请求数 × 惩罚，并发请求自然分散到多个好代理
+    - 每次请求的结果和耗时回报后立即影响排序，连续失败的代理直接失效；
+      被目标站限流只降低该主机评分，不使代理失效
     
-    def __init__(self):
+    指定 state_file 时评分、耗时和有效性持久化到本地，启动时加载；
+    采集期间由后台任务按限定速率复检过期/无效代理。
+    """
+    
+    IN_FLIGHT_PENALTY = 10.0
+    
+    def __init__(self, max_consecutive_failures: int = 3, state_file: str = None,
+                 check_url: str = "http://httpbin.org/ip", revalidate_interval: float = 60.0,
+                 revalidate_batch: int = 5, stale_after: float = 1800.0,
+                 sources: List[str] = None):
         self.logger = get_logger('ProxyPool')
         self.proxies: Dict[str, Proxy] = {}
         self._lock = asyncio.Lock()
+        self.max_consecutive_failures = max_consecutive_failures
+        
+        # 目标主机 -> 堆，'' 为不区分主机的总体堆
+        self._heaps: Dict[str, List[HeapEntry]] = {'': []}
+        # 目标主机 -> {代理地址: 该堆中有效条目的版本号}，其余条目出堆时丢弃
+        self._live: Dict[str, Dict[str, int]] = {'': {}}
         
-        # 免费代理API（示例）
-        self.free_proxy_apis = [
+        # 持久化与后台复检
+        self.state_file = Path(state_file) if state_file else None
+        self.check_url = check_url
+        self.revalidate_interval = revalidate_interval
+        self.revalidate_batch = revalidate_batch
+        self.stale_after = stale_after
+        self._revalidate_task: Optional[asyncio.Task] = None
+        self._ingest_task: Optional[asyncio.Task] = None
+        
+        # 出现第一个可用代理时置位
+        self.ready = asyncio.Event()
+        
+        # 免费代理API（示例），支持 geonode 风格JSON或每行 ip:port 的纯文本
+        self.free_proxy_apis = sources or [
             "https://proxylist.geonode.com/api/proxy-list?limit=50&page=1&sort_by=lastChecked&sort_type=desc",
         ]
+        
+        if self.state_file:
+            self.load()
+    
+    @classmethod
+    def from_config(cls, config) -> 'ProxyPool':
+        """从配置创建（加载上次保存的代理状态）"""
+        proxy_config = config.get('proxy', default={}) or {}
+        return cls(
+            max_consecutive_failures=proxy_config.get('max_consecutive_failures', 3),
+            state_file=proxy_config.get('state_file', './output/.proxy_pool.json'),
+            check_url=proxy_config.get('check_url', 'http://httpbin.org/ip'),
+            revalidate_interval=proxy_config.get('revalidate_interval', 60),
+            revalidate_batch=proxy_config.get('revalidate_batch', 5),
+            stale_after=proxy_config.get('stale_after', 1800),
+            sources=proxy_config.get('sources') or None
+        )
+    
+    def load(self):
+        """从状态文件加载代理"""
+        if not self.state_file or not self.state_file.exists():
+            return
+        
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                states = json.load(f)
+            for state in states:
+                proxy = Proxy.from_state(state)
+                self.proxies[proxy.url] = proxy
+                self._push_all(proxy)
+            
+            valid = sum(1 for p in self.proxies.values() if p.is_valid)
+            if valid:
+                self.ready.set()
+            self.logger.info(f"加载 {len(self.proxies)} 个代理状态 ({valid} 个可用)")
+        except Exception as e:
+            self.logger.error(f"加载代理状态失败: {e}")
+    
+    def save(self):
+        """原子写入状态文件"""
+        if not self.state_file:
+            return
+        
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump([p.to_state() for p in self.proxies.values()], f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.error(f"保存代理状态失败: {e}")
+    
+    def _entry(self, proxy: Proxy, host: str) -> HeapEntry:
+        score = proxy.host_score(host) - proxy.in_flight * self.IN_FLIGHT_PENALTY
+        return (-score, proxy.version, proxy.url)
+    
+    def _push(self, proxy: Proxy, host: str = ''):
+        """评分变化后重新入该主机的堆（该堆中的旧条目随版本号失效）"""
+        proxy.version += 1
+        heap = self._heaps.get(host)
+        if not proxy.is_valid or heap is None:
+            return
+        heapq.heappush(heap, self._entry(proxy, host))
+        self._live[host][proxy.url] = proxy.version
+        # 失效条目过多时重建
+        if len(heap) > 4 * len(self.proxies) + 64:
+            self._heaps[host] = self._build_heap(host)
+    
+    def _push_all(self, proxy: Proxy):
+        """新加入或恢复有效的代理入所有主机的堆"""
+        proxy.version += 1
+        if not proxy.is_valid:
+            return
+        for host, heap in self._heaps.items():
+            heapq.heappush(heap, self._entry(proxy, host))
+            self._live[host][proxy.url] = proxy.version
+    
+    def _build_heap(self, host: str) -> List[HeapEntry]:
+        heap = [self._entry(p, host) for p in self.proxies.values() if p.is_valid]
+        heapq.heapify(heap)
+        self._live[host] = {url: version for _, version, url in heap}
+        return heap
+    
+    def add(self, url: str, protocol: str = "http") -> bool:
+        """添加代理（同步），已存在时返回False"""
+        if url in self.proxies:
+            return False
+        proxy = Proxy(url=url, protocol=protocol)
+        self.proxies[url] = proxy
+        self._push_all(proxy)
+        self.logger.debug(f"添加代理: {url}")
+        return True
     
     async def add_proxy(self, url: str, protocol: str = "http"):
         """添加代理"""
         async with self._lock:
-            if url not in self.proxies:
-                self.proxies[url] = Proxy(url=url, protocol=protocol)
-                self.logger.debug(f"添加代理: {url}")
+            self.add(url, protocol)
     
     async def add_proxies(self, urls: List[str], protocol: str = "http"):
         """批量添加代理"""
         for url in urls:
             await self.add_proxy(url, protocol)
     
-    async def get_proxy(self) -> Optional[str]:
-        """获取一个可用代理（基于评分）"""
-        async with self._lock:
-            valid_proxies = [p for p in self.proxies.values() if p.is_valid]
-            
-            if not valid_proxies:
-                return None
+    def select(self, host: str = '', exclude: Set[str] = None) -> Optional[str]:
+        """
+        选择当前有效评分最高的代理（同步，O(log n)）
+        
+        选中后在途数加一，调用方必须在请求结束后调用 report 或 release 归还。
+        exclude 中的代理（如已熔断的代理、对冲请求的首发代理）本次不选择。
+        """
+        heap = self._heaps.get(host)
+        if heap is None:
+            heap = self._heaps[host] = self._build_heap(host)
+        live = self._live[host]
+        
+        skipped = []
+        selected = None
+        while heap:
+            _, version, url = heap[0]
+            proxy = self.proxies.get(url)
+            if proxy is None or not proxy.is_valid or live.get(url) != version:
+                heapq.heappop(heap)
+                if live.get(url) == version:
+                    del live[url]
+                continue
+            if proxy.version != version:
+                # 评分在其他主机的请求中变化过，按当前评分重新入堆
+                heapq.heapreplace(heap, self._entry(proxy, host))
+                live[url] = proxy.version
+                continue
+            if exclude and url in exclude:
+                skipped.append(heapq.heappop(heap))
+                continue
             
-            # 按评分排序，取前30%中随机选择
-            valid_proxies.sort(key=lambda p: p.score, reverse=True)
-            top_count = max(1, len(valid_proxies) // 3)
-            selected = random.choice(valid_proxies[:top_count])
+            proxy.in_flight += 1
+            proxy.last_used = datetime.now()
+            self._push(proxy, host)
+            selected = url
+            break
+        
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return selected
+    
+    def release(self, proxy_url: str, host: str = ''):
+        """归还在途计数但不记录结果（请求被取消，如对冲请求中落后的一方）"""
+        proxy = self.proxies.get(proxy_url)
+        if proxy is None:
+            return
+        proxy.in_flight = max(0, proxy.in_flight - 1)
+        self._push(proxy, host)
+    
+    def report(self, proxy_url: str, host: str = '', ok: bool = True,
+               response_time: float = 0.0, release: bool = True, throttled: bool = False):
+        """
+        回报一次请求结果
+        
+        Args:
+            proxy_url: 代理地址
+            host: 目标主机
+            ok: 是否成功（被限流/封禁、5xx、网络异常均视为失败）
+            response_time: 耗时(秒)
+            release: 是否归还 select 占用的在途计数（检测请求为False）
+            throttled: 被目标站限流（如 418/429），只降低该主机评分，不计入代理失效判断
+        """
+        proxy = self.proxies.get(proxy_url)
+        if proxy is None:
+            return
+        
+        was_valid = proxy.is_valid
+        if release:
+            proxy.in_flight = max(0, proxy.in_flight - 1)
+        proxy.last_check = datetime.now()
+        
+        stats = proxy.hosts.setdefault(host, HostStats()) if host else None
+        
+        if ok:
+            proxy.success_count += 1
+            proxy.consecutive_failures = 0
+            proxy.response_time = response_time if proxy.success_count == 1 else \
+                (proxy.response_time + response_time) / 2
+            proxy.is_valid = True
+            self.ready.set()
+            if stats:
+                stats.success_count += 1
+                stats.response_time = response_time if stats.success_count == 1 else \
+                    (stats.response_time + response_time) / 2
+        elif throttled:
+            # 限流针对的是请求频率而非代理本身，换代理分散请求即可
+            if stats:
+                stats.fail_count += 1
+        else:
+            proxy.fail_count += 1
+            proxy.consecutive_failures += 1
+            if stats:
+                stats.fail_count += 1
             
-            selected.last_used = datetime.now()
-            return selected.url
+            # 连续失败或失败率过高标记为无效
+            total = proxy.success_count + proxy.fail_count
+            if proxy.is_valid and (proxy.consecutive_failures >= self.max_consecutive_failures
+                                   or (total >= 5 and proxy.fail_count / total > 0.5)):
+                proxy.is_valid = False
+                self.logger.warning(f"代理标记为无效: {proxy_url}")
+        
+        if proxy.is_valid and not was_valid:
+            self._push_all(proxy)
+        else:
+            self._push(proxy, host)
+    
+    async def get_proxy(self, host: str = '') -> Optional[str]:
+        """获取一个可用代理（基于评分）"""
+        async with self._lock:
+            return self.select(host)
     
-    async def report_success(self, proxy_url: str, response_time: float = 0.0):
+    async def report_success(self, proxy_url: str, response_time: float = 0.0, host: str = ''):
         """报告代理成功"""
         async with self._lock:
-            if proxy_url in self.proxies:
-                proxy = self.proxies[proxy_url]
-                proxy.success_count += 1
-                proxy.response_time = (proxy.response_time + response_time) / 2
-                proxy.is_valid = True
+            self.report(proxy_url, host, ok=True, response_time=response_time)
     
-    async def report_failure(self, proxy_url: str):
+    async def report_failure(self, proxy_url: str, host: str = ''):
         """报告代理失败"""
         async with self._lock:
-            if proxy_url in self.proxies:
-                proxy = self.proxies[proxy_url]
-                proxy.fail_count += 1
-                
-                # 失败率过高标记为无效
-                total = proxy.success_count + proxy.fail_count
-                if total >= 5 and proxy.fail_count / total > 0.5:
-                    proxy.is_valid = False
-                    self.logger.warning(f"代理标记为无效: {proxy_url}")
-    
-    async def check_proxy(self, proxy_url: str, timeout: int = 10) -> bool:
-        """检测代理是否可用"""
-        test_url = "http://httpbin.org/ip"
-        
+            self.report(proxy_url, host, ok=False)
+    
+    @staticmethod
+    def _new_session(limit: int = 20) -> aiohttp.ClientSession:
+        """检测/抓取共用的会话（不复用连接：经不同代理的连接无法共享）"""
+        connector = aiohttp.TCPConnector(limit=limit, force_close=True, enable_cleanup_closed=True)
+        return aiohttp.ClientSession(connector=connector)
+    
+    async def _probe(self, session: aiohttp.ClientSession, proxy_url: str,
+                     timeout: int = 10) -> Optional[float]:
+        """经代理请求检测地址，成功返回耗时(秒)，失败返回None"""
         try:
-            start = datetime.now()
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    test_url, 
-                    proxy=proxy_url, 
-                    timeout=aiohttp.ClientTimeout(total=timeout)
-                ) as response:
-                    if response.status == 200:
-                        elapsed = (datetime.now() - start).total_seconds()
-                        await self.report_success(proxy_url, elapsed)
-                        return True
+            start = time.monotonic()
+            async with session.get(
+                self.check_url, 
+                proxy=proxy_url, 
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 200:
+                    return time.monotonic() - start
         except Exception as e:
             self.logger.debug(f"代理检测失败 {proxy_url}: {e}")
+        return None
+    
+    async def check_proxy(self, proxy_url: str, timeout: int = 10,
+                          session: aiohttp.ClientSession = None) -> bool:
+        """检测代理是否可用（可传入共享会话）"""
+        if session is None:
+            async with self._new_session(limit=1) as own_session:
+                return await self.check_proxy(proxy_url, timeout, own_session)
+        
+        elapsed = await self._probe(session, proxy_url, timeout)
+        if elapsed is not None:
+            self.report(proxy_url, ok=True, response_time=elapsed, release=False)
+            return True
         
-        await self.report_failure(proxy_url)
+        self.report(proxy_url, ok=False, release=False)
         return False
     
     async def check_all(self, concurrency: int = 10):
@@ -130,40 +409,198 @@ class ProxyPool:
         
         semaphore = asyncio.Semaphore(concurrency)
         
-        async def check_with_limit(proxy_url):
-            async with semaphore:
-                return await self.check_proxy(proxy_url)
-        
-        tasks = [check_with_limit(url) for url in self.proxies.keys()]
-        results = await asyncio.gather(*tasks)
+        async with self._new_session(limit=concurrency) as session:
+            async def check_with_limit(proxy_url):
+                async with semaphore:
+                    return await self.check_proxy(proxy_url, session=session)
+            
+            tasks = [check_with_limit(url) for url in list(self.proxies.keys())]
+            results = await asyncio.gather(*tasks)
         
         valid_count = sum(1 for r in results if r)
         self.logger.info(f"代理检测完成: {valid_count}/{len(self.proxies)} 可用")
     
-    async def load_free_proxies(self):
-        """从免费API加载代理"""
-        for api_url in self.free_proxy_apis:
+    async def revalidate(self, limit: int = None) -> int:
+        """
+        复检一批过期或无效的代理
+        
+        优先检测最久未验证的代理，每批最多 limit 个；正在使用中的代理由实时回报更新，不重复检测。
+        
+        Returns:
+            本批检测数量
+        """
+        now = datetime.now()
+        due = [
+            p for p in self.proxies.values()
+            if p.in_flight == 0 and (not p.is_valid or (now - p.last_check).total_seconds() >= self.stale_after)
+        ]
+        if not due:
+            return 0
+        
+        due.sort(key=lambda p: p.last_check)
+        batch = due[:limit or self.revalidate_batch]
+        async with self._new_session(limit=len(batch)) as session:
+            results = await asyncio.gather(*(self.check_proxy(p.url, session=session) for p in batch))
+        self.save()
+        
+        self.logger.debug(f"后台复检 {len(batch)} 个代理，{sum(results)} 个可用")
+        return len(batch)
+    
+    async def _revalidate_loop(self):
+        while True:
+            await asyncio.sleep(self.revalidate_interval)
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            proxies = data.get('data', [])
-                            
-                            for p in proxies:
-                                ip = p.get('ip')
-                                port = p.get('port')
-                                protocols = p.get('protocols', ['http'])
-                                
-                                if ip and port:
-                                    protocol = protocols[0] if protocols else 'http'
-                                    proxy_url = f"{protocol}://{ip}:{port}"
-                                    await self.add_proxy(proxy_url, protocol)
-                            
-                            self.logger.info(f"从 {api_url} 加载 {len(proxies)} 个代理")
-                            
+                await self.revalidate()
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                self.logger.warning(f"加载免费代理失败: {e}")
+                self.logger.warning(f"后台复检失败: {e}")
+    
+    def start_revalidation(self):
+        """启动后台复检任务（需在事件循环中调用）"""
+        if self._revalidate_task is None and self.revalidate_interval > 0:
+            self._revalidate_task = asyncio.create_task(self._revalidate_loop())
+            self.logger.info(
+                f"后台复检已启动: 每 {self.revalidate_interval}s 最多 {self.revalidate_batch} 个"
+            )
+    
+    async def stop_revalidation(self):
+        """停止后台复检并保存状态"""
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+            try:
+                await self._revalidate_task
+            except asyncio.CancelledError:
+                pass
+            self._revalidate_task = None
+        self.save()
+    
+    @staticmethod
+    def _parse_source(text: str) -> List[Tuple[str, str]]:
+        """解析代理源：geonode 风格JSON（data: [{ip, port, protocols}]）或纯文本 ip:port 列表"""
+        candidates = []
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        
+        if isinstance(data, dict):
+            for p in data.get('data', []):
+                ip = p.get('ip')
+                port = p.get('port')
+                protocols = p.get('protocols', ['http'])
+                if ip and port:
+                    protocol = protocols[0] if protocols else 'http'
+                    candidates.append((f"{protocol}://{ip}:{port}", protocol))
+        else:
+            for match in PLAIN_PROXY_RE.finditer(text):
+                protocol = match.group(1) or 'http'
+                candidates.append((f"{protocol}://{match.group(2)}:{match.group(3)}", protocol))
+        
+        return candidates
+    
+    async def _scrape_source(self, session: aiohttp.ClientSession,
+                             api_url: str) -> AsyncGenerator[Tuple[str, str], None]:
+        """抓取一个代理源，逐个产出候选代理"""
+        try:
+            async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status != 200:
+                    self.logger.warning(f"代理源返回 {response.status}: {api_url}")
+                    return
+                text = await response.text()
+        except Exception as e:
+            self.logger.warning(f"加载免费代理失败: {e}")
+            return
+        
+        candidates = self._parse_source(text)
+        self.logger.info(f"从 {api_url} 获取 {len(candidates)} 个候选代理")
+        for candidate in candidates:
+            yield candidate
+    
+    async def load_free_proxies(self):
+        """从免费API加载代理（并发抓取所有源，不检测）"""
+        async with self._new_session() as session:
+            async def load(api_url):
+                async for proxy_url, protocol in self._scrape_source(session, api_url):
+                    self.add(proxy_url, protocol)
+            
+            await asyncio.gather(*(load(api_url) for api_url in self.free_proxy_apis))
+    
+    async def ingest(self, workers: int = 20, queue_size: int = 100, timeout: int = 10) -> int:
+        """
+        流式导入：并发抓取所有代理源，边抓取边检测
+        
+        候选代理即时去重后进入有界队列，由 workers 个检测协程经共享会话验证，
+        通过检测的代理立即加入代理池可供选择（并置位 ready），无需等待抓取全部完成。
+        
+        Returns:
+            新加入的可用代理数量
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        seen = set(self.proxies)
+        stats = {'candidates': 0, 'added': 0}
+        done = object()
+        
+        async with self._new_session(limit=workers + len(self.free_proxy_apis)) as session:
+            async def produce(api_url):
+                async for proxy_url, protocol in self._scrape_source(session, api_url):
+                    if proxy_url in seen:
+                        continue
+                    seen.add(proxy_url)
+                    stats['candidates'] += 1
+                    await queue.put((proxy_url, protocol))
+            
+            async def validate():
+                while True:
+                    candidate = await queue.get()
+                    if candidate is done:
+                        return
+                    proxy_url, protocol = candidate
+                    elapsed = await self._probe(session, proxy_url, timeout)
+                    if elapsed is not None and self.add(proxy_url, protocol):
+                        self.report(proxy_url, ok=True, response_time=elapsed, release=False)
+                        stats['added'] += 1
+                        if stats['added'] == 1:
+                            self.logger.info(f"首个可用代理就绪: {proxy_url} ({elapsed:.2f}s)")
+            
+            validators = [asyncio.create_task(validate()) for _ in range(workers)]
+            try:
+                await asyncio.gather(*(produce(api_url) for api_url in self.free_proxy_apis))
+                for _ in validators:
+                    await queue.put(done)
+                await asyncio.gather(*validators)
+            finally:
+                for task in validators:
+                    task.cancel()
+        
+        self.save()
+        self.logger.info(f"代理导入完成: {stats['added']}/{stats['candidates']} 个候选可用")
+        return stats['added']
+    
+    def start_ingest(self, workers: int = 20) -> asyncio.Task:
+        """后台启动流式导入（需在事件循环中调用），配合 wait_ready 使用"""
+        if self._ingest_task is None or self._ingest_task.done():
+            self._ingest_task = asyncio.create_task(self.ingest(workers=workers))
+        return self._ingest_task
+    
+    async def wait_ready(self, timeout: float = 30.0) -> bool:
+        """等待首个可用代理，超时返回False"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def stop(self):
+        """停止所有后台任务（导入、复检）并保存状态"""
+        if self._ingest_task is not None:
+            self._ingest_task.cancel()
+            try:
+                await self._ingest_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._ingest_task = None
+        await self.stop_revalidation()
     
     def get_statistics(self) -> Dict:
         """获取代理池统计"""
@@ -174,6 +611,7 @@ class ProxyPool:
             'total': len(self.proxies),
             'valid': valid,
             'invalid': len(self.proxies) - valid,
+            'in_flight': sum(p.in_flight for p in self.proxies.values()),
             'avg_score': f"{avg_score:.1f}"
         }
     
@@ -186,3 +624,4 @@ class ProxyPool:
             
             if invalid:
                 self.logger.info(f"清理 {len(invalid)} 个无效代理")
+                self.save()
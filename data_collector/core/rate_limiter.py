@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+请求限速器 - 按主机/身份划分的令牌桶 + AIMD 自适应速率
+"""
+
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .logger import get_logger
+
+
+# 触发乘性减速的状态码（限流/反爬）
+THROTTLE_STATUSES = (418, 429)
+
+
+@dataclass
+class TokenBucket:
+    """令牌桶，速率按 AIMD 调整"""
+    rate: float = 1.0              # 当前速率(请求/秒)
+    burst: float = 3.0             # 桶容量
+    min_rate: float = 0.1
+    max_rate: float = 5.0
+    increase_step: float = 0.05    # 每次成功的加性增量
+    decrease_factor: float = 0.5   # 被限流时的乘性因子
+    cooldown: float = 0.0          # 被限流后的冷却时间(秒)
+    tokens: float = field(default=None)
+    updated: float = field(default_factory=time.monotonic)
+    throttled_count: int = 0
+    
+    def __post_init__(self):
+        if self.tokens is None:
+            self.tokens = self.burst
+    
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+    
+    def reserve(self) -> float:
+        """预留一个令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+    
+    def on_success(self):
+        """加性增速"""
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+    
+    def on_throttled(self):
+        """乘性减速，并清空已积累的令牌"""
+        self.throttled_count += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - self.cooldown * self.rate
+
+
+class RateLimiter:
+    """
+    限速器注册表
+    
+    以 (主机, 身份) 为键维护令牌桶，身份可以是代理地址或 Cookie 标识，
+    同一主机下不同代理/账号各自独立计速。
+    """
+    
+    def __init__(self, defaults: Dict = None, hosts: Dict[str, Dict] = None):
+        self.logger = get_logger('RateLimiter')
+        self.defaults = defaults or {}
+        self.hosts = hosts or {}
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['RateLimiter']:
+        """从配置创建，rate_limit.enabled 为 false 时返回None（不限速）"""
+        rate_config = dict(config.get('rate_limit', default={}) or {})
+        if not rate_config.pop('enabled', True):
+            return None
+        hosts = rate_config.pop('hosts', {}) or {}
+        return cls(defaults=rate_config, hosts=hosts)
+    
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+    
+    def get_bucket(self, url: str, identity: Optional[str] = None) -> TokenBucket:
+        """获取 (主机, 身份) 对应的令牌桶"""
+        host = self._host(url)
+        key = (host, identity or '')
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            params = dict(self.defaults)
+            params.update(self.hosts.get(host, {}))
+            bucket = TokenBucket(**params)
+            self.buckets[key] = bucket
+        return bucket
+    
+    async def acquire(self, url: str, identity: Optional[str] = None):
+        """获取发送请求的许可，必要时等待"""
+        wait = self.get_bucket(url, identity).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def report(self, url: str, status: Optional[int], identity: Optional[str] = None):
+        """根据响应状态调整速率"""
+        bucket = self.get_bucket(url, identity)
+        if status in THROTTLE_STATUSES:
+            bucket.on_throttled()
+            self.logger.warning(
+                f"被限流({status}) {self._host(url)}，速率降至 {bucket.rate:.2f}/s"
+            )
+        elif status is not None and status < 400:
+            bucket.on_success()
+    
+    def get_statistics(self) -> Dict[str, Dict]:
+        """各令牌桶状态"""
+        return {
+            f"{host}|{identity}" if identity else host: {
+                'rate': f"{bucket.rate:.2f}/s",
+                'throttled': bucket.throttled_count
+            }
+            for (host, identity), bucket in self.buckets.items()
+        }
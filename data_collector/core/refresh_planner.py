@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+轮询间隔规划 - 按关键词新帖速度自适应调整常驻采集的刷新间隔
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+from .logger import get_logger
+
+
+@dataclass
+class KeywordSchedule:
+    """关键词轮询状态"""
+    keyword: str
+    max_pages: int = 10
+    velocity: float = 0.0        # 新帖速度(条/小时，指数平滑)
+    interval: float = 0.0        # 当前轮询间隔(秒)
+    next_due: float = 0.0        # 下次轮询时间(时间戳)
+    last_polled: float = 0.0
+    polls: int = 0
+
+
+class RefreshPlanner:
+    """
+    轮询间隔规划器
+    
+    每次轮询后按 本次新增条数 / 距上次轮询的时长 估计新帖速度（指数平滑），
+    间隔取“预计积累 target_new 条新帖所需的时间”，限制在 [min_interval, max_interval]；
+    本次速度高于平滑值时按本次速度计算，突发话题下一轮立即加密。
+    连续没有新帖的关键词间隔逐次翻倍直至 max_interval。
+    """
+    
+    def __init__(self, state_file: str = "./output/.refresh_schedule.json",
+                 min_interval: float = 300, max_interval: float = 21600,
+                 target_new: float = 10, smoothing: float = 0.5):
+        self.logger = get_logger('RefreshPlanner')
+        self.state_file = Path(state_file)
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.smoothing = smoothing
+        self.schedules: Dict[str, KeywordSchedule] = {}
+        self._load()
+    
+    @classmethod
+    def from_config(cls, config) -> 'RefreshPlanner':
+        """从配置创建"""
+        daemon_config = config.get('daemon', default={}) or {}
+        planner = cls(state_file=daemon_config.get('state_file', './output/.refresh_schedule.json'))
+        planner.apply_config(config)
+        return planner
+    
+    def apply_config(self, config):
+        """应用 daemon 配置中的间隔参数（配置热加载时调用）"""
+        daemon_config = config.get('daemon', default={}) or {}
+        self.min_interval = daemon_config.get('min_interval', 300)
+        self.max_interval = daemon_config.get('max_interval', 21600)
+        self.target_new = daemon_config.get('target_new', 10)
+        self.smoothing = daemon_config.get('smoothing', 0.5)
+    
+    def _load(self):
+        """从文件加载轮询状态（重启后沿用已学到的间隔）"""
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for keyword, schedule in data.items():
+                    self.schedules[keyword] = KeywordSchedule(**schedule)
+                self.logger.info(f"加载 {len(self.schedules)} 个关键词的轮询状态")
+            except Exception as e:
+                self.logger.error(f"加载轮询状态失败: {e}")
+    
+    def save(self):
+        """原子写入文件"""
+        try:
+            tmp_file = self.state_file.with_suffix('.tmp')
+            data = {keyword: asdict(schedule) for keyword, schedule in self.schedules.items()}
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.error(f"保存轮询状态失败: {e}")
+    
+    def sync(self, keywords: Dict[str, int]) -> Tuple[List[str], List[str]]:
+        """
+        同步关键词集合 {关键词: 页数}
+        
+        新增关键词立即到期，已删除的关键词移除，已有关键词只更新页数。
+        Returns:
+            (新增关键词, 移除关键词)
+        """
+        added = [kw for kw in keywords if kw not in self.schedules]
+        removed = [kw for kw in self.schedules if kw not in keywords]
+        
+        for kw in removed:
+            del self.schedules[kw]
+        for kw, max_pages in keywords.items():
+            schedule = self.schedules.setdefault(kw, KeywordSchedule(keyword=kw))
+            schedule.max_pages = max_pages
+        
+        return added, removed
+    
+    def due(self, now: float = None, limit: int = None) -> List[KeywordSchedule]:
+        """已到期的关键词，最早到期的在前"""
+        now = now or time.time()
+        schedules = sorted(
+            (s for s in self.schedules.values() if s.next_due <= now),
+            key=lambda s: s.next_due
+        )
+        return schedules[:limit] if limit else schedules
+    
+    def next_due(self) -> Optional[float]:
+        """最近一次到期时间"""
+        return min((s.next_due for s in self.schedules.values()), default=None)
+    
+    def record(self, keyword: str, new_records: int, now: float = None) -> Optional[KeywordSchedule]:
+        """记录一次轮询结果并计算下次轮询时间"""
+        schedule = self.schedules.get(keyword)
+        if schedule is None:
+            return None
+        now = now or time.time()
+        
+        rate = None
+        if schedule.last_polled:
+            hours = max(now - schedule.last_polled, 1.0) / 3600
+            rate = new_records / hours
+            if schedule.polls > 1:
+                schedule.velocity = self.smoothing * rate + (1 - self.smoothing) * schedule.velocity
+            else:
+                schedule.velocity = rate
+        
+        schedule.interval = self._interval(schedule, rate)
+        schedule.last_polled = now
+        schedule.next_due = now + schedule.interval
+        schedule.polls += 1
+        return schedule
+    
+    def retry(self, keyword: str, now: float = None) -> Optional[KeywordSchedule]:
+        """轮询失败：不计入速度和间隔，min_interval 后重试"""
+        schedule = self.schedules.get(keyword)
+        if schedule is None:
+            return None
+        schedule.next_due = (now or time.time()) + self.min_interval
+        return schedule
+    
+    def _interval(self, schedule: KeywordSchedule, rate: Optional[float]) -> float:
+        """按新帖速度计算间隔"""
+        # 首次轮询（增量水位线之前的积压不代表速度）
+        if rate is None:
+            return self.min_interval
+        
+        velocity = max(schedule.velocity, rate)
+        if velocity <= 0:
+            interval = max(schedule.interval, self.min_interval) * 2
+        else:
+            interval = self.target_new / velocity * 3600
+        return min(self.max_interval, max(self.min_interval, interval))
+    
+    def get_statistics(self) -> Dict[str, Dict]:
+        """各关键词轮询状态"""
+        return {
+            kw: {
+                'velocity': f"{s.velocity:.1f}/h",
+                'interval': f"{s.interval / 60:.0f}min",
+                'next_due': datetime.fromtimestamp(s.next_due).strftime('%H:%M:%S') if s.next_due else '-'
+            }
+            for kw, s in self.schedules.items()
+        }
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+请求合并 - 相同请求并发时只发一次网络请求，近期结果（含空页、404）短期缓存
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Mapping, Any, Awaitable, Callable, Tuple
+
+from .logger import get_logger
+from .rate_limiter import THROTTLE_STATUSES
+
+
+class RequestCoalescer:
+    """
+    请求合并器（进程内、单事件循环）
+    
+    - single-flight: 同一键的请求正在进行时，后来者等待同一个结果，不再发请求
+    - 结果缓存: 成功响应保留 ttl 秒；空页、封禁/不存在(negative_statuses)和 5xx
+      保留 negative_ttl 秒，期间重复请求直接返回缓存结果，不再冲击已知无效的页面
+    - 条目数超过 max_entries 或响应体总大小超过 max_bytes 时按最近使用淘汰(LRU)
+    
+    网络异常（无状态码）、截断的响应和限流(418/429)不缓存：限流是暂时的，
+    由限速器冷却后照常重试，不应在冷却结束后仍拦住请求。
+    """
+    
+    def __init__(self, ttl: float = 60, negative_ttl: float = 600, max_entries: int = 256,
+                 max_bytes: int = 16 * 1024 * 1024,
+                 negative_statuses: Tuple[int, ...] = (403, 404, 410)):
+        self.logger = get_logger('RequestCoalescer')
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.negative_statuses = tuple(negative_statuses)
+        
+        # key -> (过期时间, 结果)，按使用顺序排列
+        self._cache: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.total_bytes = 0
+        
+        self.hits = 0
+        self.negative_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['RequestCoalescer']:
+        """从配置创建，未启用时返回None"""
+        coalesce_config = config.get('request_coalescing', default={}) or {}
+        if not coalesce_config.get('enabled', False):
+            return None
+        return cls(
+            ttl=coalesce_config.get('ttl', 60),
+            negative_ttl=coalesce_config.get('negative_ttl', 600),
+            max_entries=coalesce_config.get('max_entries', 256),
+            max_bytes=int(coalesce_config.get('max_size_mb', 16)) * 1024 * 1024,
+            negative_statuses=tuple(coalesce_config.get('negative_statuses', (403, 404, 410)))
+        )
+    
+    @staticmethod
+    def make_key(method: str, url: str, params: Mapping[str, Any] = None,
+                 headers: Mapping[str, str] = None) -> str:
+        """请求键：方法 + URL + 排序后的参数与请求头（不含按身份变化的 User-Agent）"""
+        raw = json.dumps([
+            method.upper(), url,
+            sorted((params or {}).items()),
+            sorted((k.lower(), v) for k, v in (headers or {}).items() if k.lower() != 'user-agent')
+        ], ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def is_negative(self, result) -> bool:
+        """是否为已知无效的结果"""
+        return result.status in self.negative_statuses or result.status >= 500
+    
+    def get(self, key: str) -> Optional[Any]:
+        """未过期的缓存结果"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires <= time.monotonic():
+            self._remove(key)
+            return None
+        self._cache.move_to_end(key)
+        return result
+    
+    def put(self, key: str, result, negative: bool = None):
+        """缓存结果（网络异常、截断的响应、限流与超过总大小上限的响应不缓存）"""
+        if result.status is None or result.truncated or result.status in THROTTLE_STATUSES:
+            return
+        size = len(result.body or b'')
+        if size > self.max_bytes:
+            return
+        if negative is None:
+            negative = self.is_negative(result)
+        ttl = self.negative_ttl if negative else self.ttl
+        if ttl <= 0:
+            return
+        
+        self._remove(key)
+        self._cache[key] = (time.monotonic() + ttl, result)
+        self.total_bytes += size
+        while len(self._cache) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._cache)))
+    
+    def _remove(self, key: str):
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[1].body or b'')
+    
+    def mark_negative(self, key: str):
+        """把已缓存的结果标记为无效（如解析后才能判断的空页），按 negative_ttl 保留"""
+        entry = self._cache.get(key)
+        if entry is not None:
+            self.put(key, entry[1], negative=True)
+    
+    async def run(self, key: str, fetch: Callable[[], Awaitable[Any]], cache: bool = True) -> Any:
+        """
+        执行请求：命中缓存直接返回，相同请求进行中时等待其结果，否则调用 fetch
+        
+        cache=False 时只合并进行中的相同请求，结果不进入缓存（如新闻正文，只会请求一次）。
+        调用方之间共享同一个结果对象，不应修改它。
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            if self.is_negative(cached):
+                self.negative_hits += 1
+            return cached
+        
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                # shield: 等待方被取消时不影响发起方与其他等待方
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 发起方被取消，由等待方重新发起
+                self.coalesced -= 1
+                return await self.run(key, fetch, cache)
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待方时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            if cache:
+                self.put(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """合并与缓存统计"""
+        total = self.hits + self.coalesced + self.misses
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'saved_rate': f"{(self.hits + self.coalesced) / max(total, 1):.1%}",
+            'entries': len(self._cache),
+            'size_mb': f"{self.total_bytes / 1024 / 1024:.1f}"
+        }
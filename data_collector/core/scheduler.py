@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+分页任务调度器 - 多关键词/多搜索类型的分页请求并发重叠执行
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Awaitable, Callable, Iterable, List, Optional, Set
+
+from .logger import get_logger
+
+
+@dataclass
+class PageStream:
+    """一条分页流（如 关键词 + 搜索类型），同一条流内按页顺序抓取"""
+    keyword: str
+    search_type: str = ''
+    start_page: int = 1
+    max_pages: int = 10
+    context: Any = None
+    page: int = 0
+    
+    def __post_init__(self):
+        if not self.page:
+            self.page = self.start_page
+
+
+@dataclass
+class PageResult:
+    """单页抓取结果"""
+    stream: PageStream
+    page: int
+    items: List[Any] = field(default_factory=list)
+    has_more: bool = True
+    error: Optional[str] = None
+    store: Optional[Callable[[], Any]] = None  # 该页数据全部产出后写入条件请求缓存
+
+
+FetchFunc = Callable[[PageStream, int], Awaitable[PageResult]]
+
+
+class PageScheduler:
+    """
+    工作池调度器
+    
+    - 同时最多 max_workers 个页面请求在途，跨所有分页流共享
+    - 每条分页流同一时刻只有一页在途，保证页序
+    - 页间延迟通过定时回填实现，不占用工作协程
+    - 结果按完成顺序流式输出
+    """
+    
+    def __init__(self, fetch: FetchFunc, max_workers: int = 5,
+                 page_delay: float = 0.0, stop_event: asyncio.Event = None):
+        self.logger = get_logger('PageScheduler')
+        self.fetch = fetch
+        self.max_workers = max(1, max_workers)
+        self.page_delay = page_delay
+        self.stop_event = stop_event
+    
+    async def run(self, streams: Iterable[PageStream]) -> AsyncGenerator[PageResult, None]:
+        """执行调度，按完成顺序产出每一页的结果"""
+        streams = [s for s in streams if s.page <= s.max_pages]
+        if not streams:
+            return
+        
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.max_workers * 2)
+        timers: Set[asyncio.TimerHandle] = set()
+        done = object()
+        state = {'alive': len(streams)}
+        
+        for stream in streams:
+            ready.put_nowait(stream)
+        
+        def requeue(stream: PageStream, handle_box: list):
+            timers.discard(handle_box[0])
+            ready.put_nowait(stream)
+        
+        async def finish_stream():
+            state['alive'] -= 1
+            if state['alive'] == 0:
+                await results.put(done)
+        
+        async def worker():
+            while True:
+                stream = await ready.get()
+                
+                if self.stop_event is not None and self.stop_event.is_set():
+                    await finish_stream()
+                    continue
+                
+                page = stream.page
+                try:
+                    result = await self.fetch(stream, page)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"分页抓取异常 [{stream.keyword}/{stream.search_type}] 第{page}页: {e}")
+                    result = PageResult(stream=stream, page=page, has_more=False, error=str(e))
+                
+                await results.put(result)
+                
+                if result.has_more and page < stream.max_pages:
+                    stream.page = page + 1
+                    if self.page_delay > 0:
+                        box = [None]
+                        box[0] = loop.call_later(self.page_delay, requeue, stream, box)
+                        timers.add(box[0])
+                    else:
+                        ready.put_nowait(stream)
+                else:
+                    await finish_stream()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_workers, len(streams)))]
+        
+        try:
+            while True:
+                result = await results.get()
+                if result is done:
+                    break
+                yield result
+        finally:
+            for handle in timers:
+                handle.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+已采集ID索引 - 跨运行去重，布隆过滤器 + SQLite 精确存储
+"""
+
+import math
+import struct
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Any, Set
+
+from .logger import get_logger
+
+
+class BloomFilter:
+    """定长位数组布隆过滤器（双重哈希）"""
+    
+    def __init__(self, num_bits: int, num_hashes: int, bits: bytearray = None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+    
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float, max_bytes: int = None) -> 'BloomFilter':
+        """按预期容量和误判率计算位数与哈希次数，位数组不超过 max_bytes"""
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if max_bytes:
+            num_bits = min(num_bits, max_bytes * 8)
+        num_hashes = max(1, min(16, int(round(num_bits / capacity * math.log(2)))))
+        return cls(num_bits, num_hashes)
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        h2 |= 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, key: str):
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+    
+    def expected_error_rate(self, count: int) -> float:
+        """当前元素数量下的理论误判率"""
+        return (1 - math.exp(-self.num_hashes * count / self.num_bits)) ** self.num_hashes
+    
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+
+class SeenIndex:
+    """
+    已采集记录索引
+    
+    以 RawData.id 为键，跨运行记录已经产出过的数据。
+    - 布隆过滤器常驻内存，绝大多数新ID无需访问磁盘即可判定
+    - 布隆命中后再查 SQLite 精确确认，不会误判为重复
+    - 位数组随关闭写入 .bloom 文件，下次启动直接加载，与库内数量不一致时重建
+    - 多个实例共用同一库时，关闭时库内数量与本实例覆盖的数量不一致则先从库重建再写入
+    """
+    
+    BLOOM_MAGIC = b'SEENBLM1'
+    FLUSH_SIZE = 1000
+    
+    def __init__(self, path: str = "./output/.seen_ids.db", capacity: int = 50_000_000,
+                 error_rate: float = 0.01, max_bytes: int = 64 * 1024 * 1024):
+        self.logger = get_logger('SeenIndex')
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.bloom_path = self.path.with_suffix(self.path.suffix + '.bloom')
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        
+        self.lookups = 0
+        self.hits = 0
+        self.false_positives = 0
+        
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._conn.commit()
+        
+        # 以库内实际行数为准，其他实例写入的ID也计算在内
+        self.count = self._count_rows()
+        
+        self.bloom = BloomFilter.for_capacity(capacity, error_rate, max_bytes)
+        if not self._load_bloom():
+            self._rebuild_bloom()
+        
+        if self.bloom.expected_error_rate(capacity) > error_rate * 1.5:
+            self.logger.warning(
+                f"内存上限 {max_bytes // 1024 // 1024}MB 不足以在 {capacity} 条时保持误判率 {error_rate}，"
+                f"预计 {self.bloom.expected_error_rate(capacity):.2%}"
+            )
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['SeenIndex']:
+        """从配置创建，未启用时返回None"""
+        dedup_config = config.get('dedup', default={}) or {}
+        if not dedup_config.get('enabled', False):
+            return None
+        return cls(
+            path=dedup_config.get('path', './output/.seen_ids.db'),
+            capacity=int(dedup_config.get('capacity', 50_000_000)),
+            error_rate=float(dedup_config.get('error_rate', 0.01)),
+            max_bytes=int(dedup_config.get('max_memory_mb', 64)) * 1024 * 1024
+        )
+    
+    def _load_bloom(self) -> bool:
+        """加载持久化的位数组，参数或数量不匹配时返回False"""
+        if not self.bloom_path.exists():
+            return False
+        try:
+            with open(self.bloom_path, 'rb') as f:
+                header = f.read(32)
+                magic, num_bits, num_hashes, count = struct.unpack('<8sQQQ', header)
+                if (magic != self.BLOOM_MAGIC or num_bits != self.bloom.num_bits
+                        or num_hashes != self.bloom.num_hashes or count != self.count):
+                    return False
+                bits = bytearray(f.read())
+            if len(bits) != self.bloom.size_bytes:
+                return False
+            self.bloom = BloomFilter(num_bits, num_hashes, bits)
+            return True
+        except Exception as e:
+            self.logger.warning(f"加载布隆过滤器失败，将重建: {e}")
+            return False
+    
+    def _count_rows(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+    
+    def _rebuild_bloom(self):
+        """从精确存储重建位数组"""
+        if not self.count:
+            return
+        self.logger.info(f"重建布隆过滤器: {self.count} 条")
+        for (record_id,) in self._conn.execute("SELECT id FROM seen"):
+            self.bloom.add(record_id)
+    
+    def _save_bloom(self):
+        """
+        原子写入位数组
+        
+        本实例的位数组只覆盖启动时库内的ID和自己写入的ID，库内数量更多说明
+        其他实例也写入过，此时在同一读事务内从库重建，保证文件头数量与位数组一致。
+        """
+        self._conn.execute("BEGIN")
+        try:
+            total = self._count_rows()
+            if total != self.count:
+                self.bloom = BloomFilter(self.bloom.num_bits, self.bloom.num_hashes)
+                self.count = total
+                self._rebuild_bloom()
+        finally:
+            self._conn.commit()
+        
+        tmp_path = self.bloom_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack('<8sQQQ', self.BLOOM_MAGIC, self.bloom.num_bits,
+                                self.bloom.num_hashes, self.count))
+            f.write(self.bloom.bits)
+        tmp_path.replace(self.bloom_path)
+    
+    def contains(self, record_id: str) -> bool:
+        """是否已采集过"""
+        with self._lock:
+            self.lookups += 1
+            if record_id in self._pending:
+                self.hits += 1
+                return True
+            if record_id not in self.bloom:
+                return False
+            row = self._conn.execute("SELECT 1 FROM seen WHERE id = ?", (record_id,)).fetchone()
+            if row:
+                self.hits += 1
+                return True
+            self.false_positives += 1
+            return False
+    
+    __contains__ = contains
+    
+    def add(self, record_id: str):
+        """记录ID（批量落盘）"""
+        with self._lock:
+            self.bloom.add(record_id)
+            self._pending.add(record_id)
+            if len(self._pending) >= self.FLUSH_SIZE:
+                self._flush()
+    
+    def add_many(self, record_ids: Iterable[str]):
+        """批量记录ID"""
+        for record_id in record_ids:
+            self.add(record_id)
+    
+    def _flush(self):
+        if not self._pending:
+            return
+        before = self._conn.total_changes
+        self._conn.executemany("INSERT OR IGNORE INTO seen (id) VALUES (?)",
+                               [(record_id,) for record_id in self._pending])
+        self._conn.commit()
+        self.count += self._conn.total_changes - before
+        self._pending.clear()
+    
+    def flush(self):
+        """写入待提交的ID"""
+        with self._lock:
+            self._flush()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """索引统计"""
+        negatives = self.lookups - self.hits
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': f"{self.hits / max(self.lookups, 1):.1%}",
+            'bloom_false_positives': self.false_positives,
+            'bloom_fp_rate': f"{self.false_positives / max(negatives, 1):.2%}",
+            'total_ids': self.count + len(self._pending),
+            'memory_mb': f"{self.bloom.size_bytes / 1024 / 1024:.1f}"
+        }
+    
+    def close(self):
+        """落盘并关闭"""
+        with self._lock:
+            try:
+                self._flush()
+                self._save_bloom()
+            except Exception as e:
+                self.logger.error(f"保存已采集索引失败: {e}")
+            self._conn.close()
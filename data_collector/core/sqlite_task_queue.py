@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite 任务队列 - 与 TaskQueue 接口一致，支持多进程按租约领取任务
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import threading
+from pathlib import Path
+from datetime import datetime
+from dataclasses import fields
+from typing import List, Dict, Optional, Iterable
+
+from .logger import get_logger
+from .task_queue import Task, TaskStatus, new_task_id
+
+
+TASK_COLUMNS = tuple(f.name for f in fields(Task))
+INSERT_SQL = (
+    f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in TASK_COLUMNS)})"
+)
+
+# 可被领取的状态（RUNNING 需租约已过期）
+CLAIMABLE_STATUSES = (TaskStatus.PENDING.value, TaskStatus.PAUSED.value)
+
+
+class SQLiteTaskQueue:
+    """
+    SQLite（WAL）任务队列
+    
+    - 每次更新只写一行，按状态建索引，统计与待处理查询走索引
+    - 多个进程可共用同一个队列文件：claim 在写事务中原子领取任务并设置租约，
+      工作进程定期 heartbeat 续约，进程崩溃后租约过期的任务可被其他进程重新领取
+    - 未经 claim 直接 mark_running 的任务没有租约，不会被其他进程抢走
+    - 数据库读写在线程中执行，等待其他进程的写锁（busy_timeout）时不阻塞事件循环
+    """
+    
+    def __init__(self, db_file: str = "./output/.task_queue.db"):
+        self.logger = get_logger('SQLiteTaskQueue')
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                page INTEGER NOT NULL DEFAULT 1,
+                max_pages INTEGER NOT NULL DEFAULT 10,
+                collected_count INTEGER NOT NULL DEFAULT 0,
+                error_count INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT,
+                updated_at TEXT,
+                error_message TEXT DEFAULT '',
+                worker_id TEXT DEFAULT '',
+                lease_expires REAL DEFAULT 0,
+                cursors TEXT DEFAULT '{}',
+                finished_types TEXT DEFAULT '[]'
+            )
+        """)
+        self._migrate()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (status, lease_expires)")
+    
+    def _migrate(self):
+        """为旧版本数据库补充新增列"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if 'cursors' not in existing:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN cursors TEXT DEFAULT '{}'")
+        if 'finished_types' not in existing:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN finished_types TEXT DEFAULT '[]'")
+    
+    @staticmethod
+    def _row_to_task(row) -> Task:
+        data = dict(zip(TASK_COLUMNS, row))
+        data['cursors'] = json.loads(data['cursors'] or '{}')
+        data['finished_types'] = json.loads(data['finished_types'] or '[]')
+        return Task.from_dict(data)
+    
+    def _select(self, where: str = '', params: tuple = ()) -> List[Task]:
+        sql = f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks {where}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_task(row) for row in rows]
+    
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """执行一条写语句，返回影响的行数"""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+    
+    def _transaction(self, func):
+        """在 IMMEDIATE 事务中执行 func(conn)，多进程写入互斥"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self._conn)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+    
+    @staticmethod
+    def _task_params(task: Task) -> tuple:
+        data = task.to_dict()
+        data['status'] = task.status.value
+        data['cursors'] = json.dumps(task.cursors)
+        data['finished_types'] = json.dumps(task.finished_types)
+        return tuple(data[c] for c in TASK_COLUMNS)
+    
+    async def add_task(self, keyword: str, source: str, max_pages: int = 10) -> Task:
+        """添加任务"""
+        task_id = new_task_id(source, keyword)
+        task = Task(id=task_id, keyword=keyword, source=source, max_pages=max_pages)
+        await asyncio.to_thread(self._execute, INSERT_SQL, self._task_params(task))
+        self.logger.info(f"添加任务: {task_id}")
+        return task
+    
+    async def add_batch(self, keywords: List[str], source: str, max_pages: int = 10) -> List[Task]:
+        """批量添加任务（单个事务）"""
+        tasks = [
+            Task(id=new_task_id(source, keyword), keyword=keyword, source=source, max_pages=max_pages)
+            for keyword in keywords
+        ]
+        await asyncio.to_thread(
+            self._transaction,
+            lambda conn: conn.executemany(INSERT_SQL, [self._task_params(task) for task in tasks])
+        )
+        self.logger.info(f"添加 {len(tasks)} 个任务")
+        return tasks
+    
+    async def get_pending_tasks(self) -> List[Task]:
+        """获取待处理任务（含租约已过期的运行中任务，仅用于展示，执行任务需通过 claim 领取）"""
+        return await asyncio.to_thread(
+            self._select,
+            "WHERE status IN (?, ?) OR (status = ? AND lease_expires > 0 AND lease_expires < ?) "
+            "ORDER BY created_at",
+            CLAIMABLE_STATUSES + (TaskStatus.RUNNING.value, time.time())
+        )
+    
+    async def get_task(self, task_id: str) -> Optional[Task]:
+        """获取任务"""
+        tasks = await asyncio.to_thread(self._select, "WHERE id = ?", (task_id,))
+        return tasks[0] if tasks else None
+    
+    async def update_task(self, task_id: str, expected_worker: str = None, **kwargs) -> bool:
+        """
+        更新任务状态（只写一行）
+        
+        指定 expected_worker 时只在任务仍由该工作进程持有时更新（租约被接管后不覆盖），
+        返回是否更新成功。
+        """
+        updates = {k: v for k, v in kwargs.items() if k in TASK_COLUMNS and k != 'id'}
+        if isinstance(updates.get('status'), TaskStatus):
+            updates['status'] = updates['status'].value
+        if 'cursors' in updates:
+            updates['cursors'] = json.dumps(updates['cursors'])
+        if 'finished_types' in updates:
+            updates['finished_types'] = json.dumps(updates['finished_types'])
+        updates['updated_at'] = datetime.now().isoformat()
+        
+        assignments = ', '.join(f"{k} = ?" for k in updates)
+        where, params = "id = ?", (task_id,)
+        if expected_worker is not None:
+            where, params = "id = ? AND worker_id = ?", (task_id, expected_worker)
+        rowcount = await asyncio.to_thread(
+            self._execute, f"UPDATE tasks SET {assignments} WHERE {where}", tuple(updates.values()) + params
+        )
+        if rowcount == 0 and expected_worker is not None:
+            self.logger.warning(f"[{expected_worker}] 任务已被其他进程接管，不更新: {task_id}")
+            return False
+        return rowcount > 0
+    
+    async def mark_running(self, task_id: str, page: int = None):
+        """标记任务运行中"""
+        kwargs = {'status': TaskStatus.RUNNING}
+        if page is not None:
+            kwargs['page'] = page
+        await self.update_task(task_id, **kwargs)
+    
+    async def mark_completed(self, task_id: str, collected_count: int = 0, worker_id: str = None) -> bool:
+        """标记任务完成（指定 worker_id 时仅在仍持有租约时更新）"""
+        return await self.update_task(
+            task_id,
+            expected_worker=worker_id,
+            status=TaskStatus.COMPLETED,
+            collected_count=collected_count,
+            worker_id='',
+            lease_expires=0
+        )
+    
+    async def mark_failed(self, task_id: str, error_message: str = "", worker_id: str = None) -> bool:
+        """标记任务失败（指定 worker_id 时仅在仍持有租约时更新）"""
+        return await self.update_task(
+            task_id,
+            expected_worker=worker_id,
+            status=TaskStatus.FAILED,
+            error_message=error_message,
+            worker_id='',
+            lease_expires=0
+        )
+    
+    async def save_cursor(self, task_id: str, search_type: str, page: int, finished: bool = False):
+        """记录分页游标：search_type 已完成到第 page 页，finished 表示该分页流已翻完（单行读改写）"""
+        await asyncio.to_thread(self._save_cursor, task_id, search_type, page, finished)
+    
+    def _save_cursor(self, task_id: str, search_type: str, page: int, finished: bool):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cursors, finished_types FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+            if row is None:
+                return
+            cursors = json.loads(row[0] or '{}')
+            cursors[search_type] = max(page, cursors.get(search_type, 0))
+            finished_types = json.loads(row[1] or '[]')
+            if finished and search_type not in finished_types:
+                finished_types.append(search_type)
+            self._conn.execute(
+                "UPDATE tasks SET cursors = ?, finished_types = ?, page = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(cursors), json.dumps(finished_types), min(cursors.values()) + 1,
+                 datetime.now().isoformat(), task_id)
+            )
+    
+    async def mark_paused(self, task_id: str, page: int, collected_count: int,
+                          worker_id: str = None) -> bool:
+        """标记任务暂停（用于断点续传，指定 worker_id 时仅在仍持有租约时更新）"""
+        return await self.update_task(
+            task_id,
+            expected_worker=worker_id,
+            status=TaskStatus.PAUSED,
+            page=page,
+            collected_count=collected_count,
+            worker_id='',
+            lease_expires=0
+        )
+    
+    async def resume_task(self, task_id: str) -> Optional[Task]:
+        """恢复暂停的任务"""
+        task = await self.get_task(task_id)
+        if task and task.status == TaskStatus.PAUSED:
+            await self.update_task(task_id, status=TaskStatus.PENDING)
+            return task
+        return None
+    
+    async def claim(self, worker_id: str, limit: int = 1, lease: float = 300.0,
+                    source: str = None, exclude: Iterable[str] = ()) -> List[Task]:
+        """
+        原子领取任务
+        
+        在 IMMEDIATE 事务中选出可领取的任务（待处理/暂停，或租约过期的运行中任务）
+        并标记为运行中、写入租约，多个进程同时领取不会拿到同一任务。
+        exclude 为本轮已执行过的任务ID，暂停的任务在同一轮内不会被再次领取。
+        """
+        now = time.time()
+        where = "(status IN (?, ?) OR (status = ? AND lease_expires > 0 AND lease_expires < ?))"
+        params = CLAIMABLE_STATUSES + (TaskStatus.RUNNING.value, now)
+        if source:
+            where += " AND source = ?"
+            params += (source,)
+        exclude = list(exclude)
+        if exclude:
+            where += f" AND id NOT IN ({', '.join('?' * len(exclude))})"
+            params += tuple(exclude)
+        
+        def take(conn) -> List[Task]:
+            rows = conn.execute(
+                f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE {where} "
+                f"ORDER BY created_at LIMIT ?",
+                params + (limit,)
+            ).fetchall()
+            tasks = [self._row_to_task(row) for row in rows]
+            for task in tasks:
+                task.status = TaskStatus.RUNNING
+                task.worker_id = worker_id
+                task.lease_expires = now + lease
+                task.updated_at = datetime.now().isoformat()
+                conn.execute(
+                    "UPDATE tasks SET status = ?, worker_id = ?, lease_expires = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (task.status.value, worker_id, task.lease_expires, task.updated_at, task.id)
+                )
+            return tasks
+        
+        tasks = await asyncio.to_thread(self._transaction, take)
+        for task in tasks:
+            self.logger.info(f"[{worker_id}] 领取任务: {task.id}")
+        return tasks
+    
+    async def heartbeat(self, task_id: str, worker_id: str, lease: float = 300.0) -> bool:
+        """续约，返回False表示租约已被其他进程接管"""
+        rowcount = await asyncio.to_thread(
+            self._execute,
+            "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker_id = ? AND status = ?",
+            (time.time() + lease, task_id, worker_id, TaskStatus.RUNNING.value)
+        )
+        if rowcount == 0:
+            self.logger.warning(f"[{worker_id}] 任务租约已失效: {task_id}")
+            return False
+        return True
+    
+    async def clear_completed(self):
+        """清除已完成任务"""
+        rowcount = await asyncio.to_thread(
+            self._execute, "DELETE FROM tasks WHERE status = ?", (TaskStatus.COMPLETED.value,)
+        )
+        self.logger.info(f"清除 {rowcount} 个已完成任务")
+    
+    def get_statistics(self) -> Dict[str, int]:
+        """获取任务统计（按状态索引聚合）"""
+        stats = {
+            'total': 0,
+            'pending': 0,
+            'running': 0,
+            'completed': 0,
+            'failed': 0,
+            'paused': 0
+        }
+        
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        for status, count in rows:
+            stats[status] = count
+            stats['total'] += count
+        
+        return stats
+    
+    def close(self):
+        """关闭数据库"""
+        with self._lock:
+            self._conn.close()
+
+
+def default_worker_id() -> str:
+    """工作进程标识: 主机名-进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
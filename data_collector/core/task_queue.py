@@ -3,12 +3,16 @@
 任务队列 - 支持断点续传
 """
 
+import os
 import json
+import time
+import uuid
 import asyncio
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 
 from .logger import get_logger
@@ -22,6 +26,11 @@ class TaskStatus(str, Enum):
     PAUSED = "paused"
 
 
+def new_task_id(source: str, keyword: str) -> str:
+    """生成任务ID：可读前缀加随机后缀，同一秒内重复添加同一关键词也不会冲突"""
+    return f"{source}_{keyword}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
 @dataclass
 class Task:
     """采集任务"""
@@ -36,6 +45,10 @@ class Task:
     created_at: str = ""
     updated_at: str = ""
     error_message: str = ""
+    worker_id: str = ""            # 领取该任务的工作进程
+    lease_expires: float = 0.0     # 租约到期时间戳，0 表示无租约
+    cursors: Dict[str, int] = field(default_factory=dict)  # 搜索类型 -> 最后完成的页
+    finished_types: List[str] = field(default_factory=list)  # 已翻完的搜索类型（续传时跳过）
     
     def __post_init__(self):
         if not self.created_at:
@@ -52,44 +65,197 @@ class Task:
 
 
 class TaskQueue:
-    """持久化任务队列 - 支持断点续传"""
+    """
+    持久化任务队列 - 支持断点续传
+    
+    快照（queue_file）+ 追加日志（queue_file.journal）：每次更新只追加一行任务状态，
+    加载时先读快照再重放日志；日志累计 compact_every 条后在后台线程合并为新快照，
+    合并时已完成任务移入归档文件（queue_file.archive.jsonl）。
+    
+    每个日志文件以代数行 {"gen": N} 开头，快照记录已合并到的代数，
+    重放时跳过不大于快照代数的日志（合并后、删除旧日志前进程中断时不会重复重放）。
+    """
     
-    def __init__(self, queue_file: str = "./output/.task_queue.json"):
+    def __init__(self, queue_file: str = "./output/.task_queue.json", compact_every: int = 1000,
+                 archive_completed: bool = True):
         self.logger = get_logger('TaskQueue')
         self.queue_file = Path(queue_file)
         self.queue_file.parent.mkdir(parents=True, exist_ok=True)
+        self.journal_file = self.queue_file.with_name(self.queue_file.name + '.journal')
+        self.archive_file = self.queue_file.with_name(self.queue_file.name + '.archive.jsonl')
+        # 合并进行中时旧日志改名为此文件，合并完成后删除
+        self._compacting_file = self.queue_file.with_name(self.queue_file.name + '.journal.compacting')
+        self.compact_every = compact_every
+        self.archive_completed = archive_completed
         
         self.tasks: Dict[str, Task] = {}
+        self.archived_count = 0
+        # 当前日志的代数
+        self.generation = 1
         self._lock = asyncio.Lock()
+        self._journal_records = 0
+        self._journal = None
+        self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='task-queue-compact')
+        self._compaction: Optional[Future] = None
         
         # 加载已有任务
         self._load()
     
     def _load(self):
-        """从文件加载任务"""
+        """加载快照并重放日志"""
+        merged = 0
         if self.queue_file.exists():
             try:
                 with open(self.queue_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    for task_id, task_data in data.items():
-                        self.tasks[task_id] = Task.from_dict(task_data)
-                self.logger.info(f"加载 {len(self.tasks)} 个任务")
+                # 兼容旧格式 {task_id: task}
+                tasks = data.get('tasks', {}) if 'tasks' in data else data
+                self.archived_count = data.get('archived', 0) if 'tasks' in data else 0
+                merged = data.get('generation', 0) if 'tasks' in data else 0
+                for task_id, task_data in tasks.items():
+                    self.tasks[task_id] = Task.from_dict(task_data)
             except Exception as e:
                 self.logger.error(f"加载任务失败: {e}")
+        
+        replayed, compacting_gen = self._replay(self._compacting_file, merged)
+        count, journal_gen = self._replay(self.journal_file, merged)
+        replayed += count
+        # 已有日志继续追加（沿用其代数），否则新日志的代数大于所有已知代数
+        if journal_gen is not None:
+            self.generation = journal_gen
+        else:
+            self.generation = max(merged, compacting_gen or 0) + 1
+        
+        self._journal_records = replayed
+        if self.tasks or replayed:
+            self.logger.info(f"加载 {len(self.tasks)} 个任务 (重放日志 {replayed} 条)")
+    
+    def _replay(self, path: Path, merged: int = 0) -> Tuple[int, Optional[int]]:
+        """
+        重放日志文件，忽略末尾不完整的行和已合并进快照（代数不大于 merged）的记录
+        
+        Returns:
+            (重放条数, 文件末尾的代数)，文件不存在时代数为None
+        """
+        if not path.exists():
+            return 0, None
+        
+        count = 0
+        skipped = 0
+        # 没有代数行的旧日志视为未合并
+        generation = merged + 1
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"跳过不完整的日志行: {path.name}")
+                    continue
+                if 'gen' in record:
+                    generation = record['gen']
+                    continue
+                if generation <= merged:
+                    skipped += 1
+                    continue
+                if 'del' in record:
+                    self.tasks.pop(record['del'], None)
+                else:
+                    task = Task.from_dict(record)
+                    self.tasks[task.id] = task
+                count += 1
+        if skipped:
+            self.logger.info(f"跳过已合并进快照的日志 {skipped} 条: {path.name}")
+        return count, generation
+    
+    def _append(self, record: Dict):
+        """追加一条日志，达到阈值时触发后台合并"""
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
+                if self._journal.tell() == 0:
+                    self._journal.write(json.dumps({'gen': self.generation}) + '\n')
+            self._journal.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._journal.flush()
+            self._journal_records += 1
+        except Exception as e:
+            self.logger.error(f"写入任务日志失败: {e}")
+            return
+        
+        if self._journal_records >= self.compact_every:
+            self.compact()
+    
+    def _save_task(self, task: Task):
+        """记录任务的最新状态"""
+        self._append(task.to_dict())
+    
+    def compact(self, wait: bool = False):
+        """
+        合并日志为新快照
+        
+        当前日志改名后立即换用新日志，快照在后台线程写入（先写临时文件再替换），
+        期间的更新写入新日志，不阻塞事件循环。
+        """
+        if self._compaction is not None and not self._compaction.done():
+            if not wait:
+                return
+            self._compaction.result()
+        
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_file.exists():
+            if self._compacting_file.exists():
+                # 上次合并未完成（进程中断），其日志尚未写入快照，接在后面
+                with open(self._compacting_file, 'ab') as dst, open(self.journal_file, 'rb') as src:
+                    dst.write(src.read())
+                self.journal_file.unlink()
+            else:
+                os.replace(self.journal_file, self._compacting_file)
+        self._journal_records = 0
+        
+        archived = []
+        if self.archive_completed:
+            archived = [tid for tid, t in self.tasks.items() if t.status == TaskStatus.COMPLETED]
+        archived_data = [self.tasks.pop(tid).to_dict() for tid in archived]
+        self.archived_count += len(archived_data)
+        snapshot = {
+            'tasks': {tid: task.to_dict() for tid, task in self.tasks.items()},
+            'archived': self.archived_count,
+            'generation': self.generation
+        }
+        # 此后的更新写入下一代日志
+        self.generation += 1
+        
+        self._compaction = self._compactor.submit(self._write_snapshot, snapshot, archived_data)
+        if wait:
+            self._compaction.result()
     
-    def _save(self):
-        """保存任务到文件"""
+    def _write_snapshot(self, snapshot: Dict, archived: List[Dict]):
+        """写入归档与快照（后台线程）"""
         try:
-            data = {tid: task.to_dict() for tid, task in self.tasks.items()}
-            with open(self.queue_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 先归档再替换快照：合并中途进程退出时归档可能出现重复任务，但不会丢失
+            if archived:
+                with open(self.archive_file, 'a', encoding='utf-8') as f:
+                    for data in archived:
+                        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n')
+            
+            tmp_file = self.queue_file.with_name(self.queue_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.queue_file)
+            
+            if self._compacting_file.exists():
+                self._compacting_file.unlink()
+            self.logger.debug(f"任务队列已合并: {len(snapshot['tasks'])} 个任务, 归档 {len(archived)} 个")
         except Exception as e:
             self.logger.error(f"保存任务失败: {e}")
     
     async def add_task(self, keyword: str, source: str, max_pages: int = 10) -> Task:
         """添加任务"""
         async with self._lock:
-            task_id = f"{source}_{keyword}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            task_id = new_task_id(source, keyword)
             
             task = Task(
                 id=task_id,
@@ -99,7 +265,7 @@ class TaskQueue:
             )
             
             self.tasks[task_id] = task
-            self._save()
+            self._save_task(task)
             
             self.logger.info(f"添加任务: {task_id}")
             return task
@@ -113,23 +279,28 @@ class TaskQueue:
         return tasks
     
     async def get_pending_tasks(self) -> List[Task]:
-        """获取待处理任务"""
+        """获取待处理任务（仅用于展示，执行任务需通过 claim 领取）"""
         return [t for t in self.tasks.values() if t.status in (TaskStatus.PENDING, TaskStatus.PAUSED)]
     
     async def get_task(self, task_id: str) -> Optional[Task]:
         """获取任务"""
         return self.tasks.get(task_id)
     
-    async def update_task(self, task_id: str, **kwargs):
-        """更新任务状态"""
+    async def update_task(self, task_id: str, expected_worker: str = None, **kwargs) -> bool:
+        """更新任务状态（指定 expected_worker 时只在任务仍由该工作进程持有时更新）"""
         async with self._lock:
-            if task_id in self.tasks:
-                task = self.tasks[task_id]
-                for key, value in kwargs.items():
-                    if hasattr(task, key):
-                        setattr(task, key, value)
-                task.updated_at = datetime.now().isoformat()
-                self._save()
+            task = self.tasks.get(task_id)
+            if task is None:
+                return False
+            if expected_worker is not None and task.worker_id != expected_worker:
+                self.logger.warning(f"[{expected_worker}] 任务已被其他进程接管，不更新: {task_id}")
+                return False
+            for key, value in kwargs.items():
+                if hasattr(task, key):
+                    setattr(task, key, value)
+            task.updated_at = datetime.now().isoformat()
+            self._save_task(task)
+            return True
     
     async def mark_running(self, task_id: str, page: int = None):
         """标记任务运行中"""
@@ -138,26 +309,43 @@ class TaskQueue:
             kwargs['page'] = page
         await self.update_task(task_id, **kwargs)
     
-    async def mark_completed(self, task_id: str, collected_count: int = 0):
-        """标记任务完成"""
-        await self.update_task(
+    async def mark_completed(self, task_id: str, collected_count: int = 0, worker_id: str = None) -> bool:
+        """标记任务完成（指定 worker_id 时仅在仍持有租约时更新）"""
+        return await self.update_task(
             task_id,
+            expected_worker=worker_id,
             status=TaskStatus.COMPLETED,
             collected_count=collected_count
         )
     
-    async def mark_failed(self, task_id: str, error_message: str = ""):
-        """标记任务失败"""
-        await self.update_task(
+    async def mark_failed(self, task_id: str, error_message: str = "", worker_id: str = None) -> bool:
+        """标记任务失败（指定 worker_id 时仅在仍持有租约时更新）"""
+        return await self.update_task(
             task_id,
+            expected_worker=worker_id,
             status=TaskStatus.FAILED,
             error_message=error_message
         )
     
-    async def mark_paused(self, task_id: str, page: int, collected_count: int):
-        """标记任务暂停（用于断点续传）"""
-        await self.update_task(
+    async def save_cursor(self, task_id: str, search_type: str, page: int, finished: bool = False):
+        """记录分页游标：search_type 已完成到第 page 页，finished 表示该分页流已翻完"""
+        task = self.tasks.get(task_id)
+        if task is None:
+            return
+        cursors = dict(task.cursors)
+        cursors[search_type] = max(page, cursors.get(search_type, 0))
+        finished_types = list(task.finished_types)
+        if finished and search_type not in finished_types:
+            finished_types.append(search_type)
+        await self.update_task(task_id, cursors=cursors, finished_types=finished_types,
+                               page=min(cursors.values()) + 1)
+    
+    async def mark_paused(self, task_id: str, page: int, collected_count: int,
+                          worker_id: str = None) -> bool:
+        """标记任务暂停（用于断点续传，指定 worker_id 时仅在仍持有租约时更新）"""
+        return await self.update_task(
             task_id,
+            expected_worker=worker_id,
             status=TaskStatus.PAUSED,
             page=page,
             collected_count=collected_count
@@ -171,22 +359,55 @@ class TaskQueue:
             return task
         return None
     
+    async def claim(self, worker_id: str, limit: int = 1, lease: float = 300.0,
+                    source: str = None, exclude: Iterable[str] = ()) -> List[Task]:
+        """
+        领取任务（文件队列仅保证进程内互斥，多进程请使用 sqlite 后端）
+        
+        exclude 为本轮已执行过的任务ID，暂停的任务在同一轮内不会被再次领取
+        """
+        exclude = set(exclude)
+        async with self._lock:
+            now = time.time()
+            tasks = [
+                t for t in self.tasks.values()
+                if (t.status in (TaskStatus.PENDING, TaskStatus.PAUSED)
+                    or (t.status == TaskStatus.RUNNING and 0 < t.lease_expires < now))
+                and (source is None or t.source == source)
+                and t.id not in exclude
+            ][:limit]
+            for task in tasks:
+                task.status = TaskStatus.RUNNING
+                task.worker_id = worker_id
+                task.lease_expires = now + lease
+                task.updated_at = datetime.now().isoformat()
+                self._save_task(task)
+            return tasks
+    
+    async def heartbeat(self, task_id: str, worker_id: str, lease: float = 300.0) -> bool:
+        """续约，返回False表示租约已失效"""
+        task = self.tasks.get(task_id)
+        if task is None or task.worker_id != worker_id or task.status != TaskStatus.RUNNING:
+            return False
+        task.lease_expires = time.time() + lease
+        return True
+    
     async def clear_completed(self):
         """清除已完成任务"""
         async with self._lock:
             completed = [tid for tid, t in self.tasks.items() if t.status == TaskStatus.COMPLETED]
             for tid in completed:
                 del self.tasks[tid]
-            self._save()
+                self._append({'del': tid})
             self.logger.info(f"清除 {len(completed)} 个已完成任务")
     
     def get_statistics(self) -> Dict[str, int]:
         """获取任务统计"""
         stats = {
-            'total': len(self.tasks),
+            'total': len(self.tasks) + self.archived_count,
             'pending': 0,
             'running': 0,
-            'completed': 0,
+            'completed': self.archived_count,
             'failed': 0,
             'paused': 0
         }
@@ -195,3 +416,24 @@ class TaskQueue:
             stats[task.status.value] = stats.get(task.status.value, 0) + 1
         
         return stats
+    
+    def close(self):
+        """合并日志并关闭"""
+        if self._journal_records or self._journal is not None:
+            self.compact(wait=True)
+        elif self._compaction is not None:
+            self._compaction.result()
+        self._compactor.shutdown()
+
+
+def create_task_queue(config) -> 'TaskQueue':
+    """按配置 task_queue.backend 创建任务队列: json（默认）/ sqlite"""
+    queue_config = config.get('task_queue', default={}) or {}
+    if queue_config.get('backend', 'json') == 'sqlite':
+        from .sqlite_task_queue import SQLiteTaskQueue
+        return SQLiteTaskQueue(queue_config.get('db_path', './output/.task_queue.db'))
+    return TaskQueue(
+        queue_config.get('path', './output/.task_queue.json'),
+        compact_every=queue_config.get('compact_every', 1000),
+        archive_completed=queue_config.get('archive_completed', True)
+    )
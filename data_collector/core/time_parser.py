@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+发布时间解析 - 同步与异步采集器共用
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+# 带年份的绝对时间
+ABSOLUTE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y年%m月%d日 %H:%M',
+    '%Y-%m-%d',
+)
+
+# 不带年份的时间（取当前年份，晚于当前时间时视为去年）
+YEARLESS_FORMATS = (
+    '%m月%d日 %H:%M',
+    '%m-%d %H:%M',
+)
+
+RELATIVE_RE = re.compile(r'(\d+)\s*(秒|分钟|小时|天)前')
+CLOCK_RE = re.compile(r'(\d{1,2}):(\d{2})')
+
+RELATIVE_UNITS = {'秒': 'seconds', '分钟': 'minutes', '小时': 'hours', '天': 'days'}
+
+
+def parse_time(time_str: str, now: datetime = None) -> Optional[datetime]:
+    """
+    解析页面上的发布时间，无法解析时返回None
+    
+    支持绝对时间、不带年份的 "12月15日 08:30"、相对时间（刚刚、5分钟前、3小时前）
+    以及 "今天 08:30" / "昨天 08:30"（未给出时刻时取当前时刻）。
+    """
+    if not time_str:
+        return None
+    time_str = time_str.strip()
+    now = now or datetime.now()
+    
+    for fmt in ABSOLUTE_FORMATS:
+        try:
+            return datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+    
+    for fmt in YEARLESS_FORMATS:
+        try:
+            # 先按闰年匹配格式，"2月29日" 也能通过
+            datetime.strptime(f"2000 {time_str}", '%Y ' + fmt)
+        except ValueError:
+            continue
+        # 取不晚于当前时间的最近年份：1月初看到的 "12月31日" 属于去年，"2月29日" 属于最近的闰年
+        for year in range(now.year, now.year - 9, -1):
+            try:
+                parsed = datetime.strptime(f"{year} {time_str}", '%Y ' + fmt)
+            except ValueError:
+                continue
+            if parsed <= now + timedelta(days=1):
+                return parsed
+        return None
+    
+    if '刚刚' in time_str:
+        return now
+    match = RELATIVE_RE.search(time_str)
+    if match:
+        return now - timedelta(**{RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+    
+    for word, days in (('今天', 0), ('昨天', 1), ('前天', 2)):
+        if word in time_str:
+            day = now - timedelta(days=days)
+            clock = CLOCK_RE.search(time_str)
+            if clock:
+                return day.replace(hour=int(clock.group(1)), minute=int(clock.group(2)),
+                                   second=0, microsecond=0)
+            return day
+    
+    return None
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+User-Agent 提供器 - 进程内只加载一次本地数据，预采样为轮换数组，可按身份绑定固定UA
+"""
+
+import random
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import Config
+from .logger import get_logger
+
+
+logger = get_logger('UserAgent')
+
+# 本地快照与 fake_useragent 均不可用时的兜底
+DEFAULT_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+)
+
+
+class UserAgentProvider:
+    """
+    User-Agent 提供器
+    
+    创建时不加载任何数据，首次取UA时才从本地快照（request.user_agents.file，每行一个UA）
+    或 fake_useragent 自带的数据集（不联网）中预采样 pool_size 个UA；
+    之后 random 只在数组上轮换，一轮结束后重新打乱。
+    for_identity 为每个代理/账号绑定一个固定UA，同一身份的请求看起来来自同一浏览器。
+    """
+    
+    def __init__(self, pool_size: int = 32, snapshot_file: str = None,
+                 browsers: List[str] = None):
+        self.pool_size = max(1, pool_size)
+        self.snapshot_file = snapshot_file
+        self.browsers = browsers
+        
+        self._pool: Optional[List[str]] = None
+        self._cursor = 0
+        self._bound: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config) -> 'UserAgentProvider':
+        """从配置创建"""
+        ua_config = config.get('request', 'user_agents', default={}) or {}
+        return cls(
+            pool_size=ua_config.get('pool_size', 32),
+            snapshot_file=ua_config.get('file'),
+            browsers=ua_config.get('browsers')
+        )
+    
+    def _read_snapshot(self) -> List[str]:
+        """读取本地快照文件"""
+        path = Path(self.snapshot_file)
+        if not path.exists():
+            logger.warning(f"User-Agent 快照不存在: {path}")
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    
+    def _sample_fake_useragent(self) -> List[str]:
+        """从 fake_useragent 自带数据集采样（仅在首次取UA时导入）"""
+        try:
+            from fake_useragent import UserAgent
+        except ImportError:
+            return []
+        
+        kwargs = {'browsers': self.browsers} if self.browsers else {}
+        try:
+            ua = UserAgent(**kwargs)
+            # 新版本可直接按占比从数据集中抽样（ua.random 每次都要过滤整个数据集）
+            records = [r for r in getattr(ua, 'data_browsers', None) or []
+                       if not self.browsers or r.get('browser') in self.browsers]
+            if records:
+                weights = [r.get('percent') or 0.01 for r in records]
+                return list({r['useragent'] for r in random.choices(records, weights, k=self.pool_size * 2)})
+            return list({ua.random for _ in range(self.pool_size * 2)})
+        except Exception as e:
+            logger.warning(f"fake_useragent 加载失败: {e}")
+            return []
+    
+    def _load(self) -> List[str]:
+        """加载并预采样UA数组"""
+        candidates = self._read_snapshot() if self.snapshot_file else []
+        if not candidates:
+            candidates = self._sample_fake_useragent()
+        if not candidates:
+            candidates = list(DEFAULT_USER_AGENTS)
+        
+        pool = random.sample(candidates, min(self.pool_size, len(candidates)))
+        logger.debug(f"User-Agent 预采样 {len(pool)} 个（候选 {len(candidates)} 个）")
+        return pool
+    
+    def _ensure_pool(self) -> List[str]:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._load()
+        return self._pool
+    
+    @property
+    def random(self) -> str:
+        """轮换取下一个UA（与 fake_useragent 的 ua.random 用法一致）"""
+        pool = self._ensure_pool()
+        with self._lock:
+            if self._cursor >= len(pool):
+                random.shuffle(pool)
+                self._cursor = 0
+            ua = pool[self._cursor]
+            self._cursor += 1
+        return ua
+    
+    def for_identity(self, identity: Optional[str]) -> str:
+        """身份（代理/账号）绑定的固定UA，无身份时轮换"""
+        if not identity:
+            return self.random
+        ua = self._bound.get(identity)
+        if ua is None:
+            ua = self._bound.setdefault(identity, self.random)
+        return ua
+
+
+_provider: Optional[UserAgentProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_user_agents(config=None) -> UserAgentProvider:
+    """进程内共享的UA提供器（创建开销可忽略，数据在首次取UA时加载）"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = UserAgentProvider.from_config(config or Config())
+    return _provider
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+增量采集水位线 - 记录每个 (关键词, 搜索类型) 已采集到的最新微博
+"""
+
+import re
+import json
+import os
+from pathlib import Path
+from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+from .logger import get_logger
+
+
+@dataclass
+class Watermark:
+    """水位线：已采集到的最新微博ID和发布时间"""
+    mid: int = 0
+    publish_time: str = ""
+    updated_at: str = ""
+
+
+class WatermarkStore:
+    """持久化水位线存储"""
+    
+    def __init__(self, store_file: str = "./output/.weibo_watermarks.json"):
+        self.logger = get_logger('WatermarkStore')
+        self.store_file = Path(store_file)
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        self.marks: Dict[str, Watermark] = {}
+        self._load()
+    
+    @staticmethod
+    def _key(keyword: str, search_type: str) -> str:
+        return f"{search_type}|{keyword}"
+    
+    def _load(self):
+        """从文件加载水位线"""
+        if self.store_file.exists():
+            try:
+                with open(self.store_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for key, mark in data.items():
+                    self.marks[key] = Watermark(**mark)
+                self.logger.info(f"加载 {len(self.marks)} 条水位线")
+            except Exception as e:
+                self.logger.error(f"加载水位线失败: {e}")
+    
+    def _save(self):
+        """原子写入文件"""
+        try:
+            tmp_file = self.store_file.with_suffix('.tmp')
+            data = {key: asdict(mark) for key, mark in self.marks.items()}
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.store_file)
+        except Exception as e:
+            self.logger.error(f"保存水位线失败: {e}")
+    
+    def get(self, keyword: str, search_type: str) -> Optional[Watermark]:
+        """获取水位线"""
+        return self.marks.get(self._key(keyword, search_type))
+    
+    def update(self, keyword: str, search_type: str, mid: int, publish_time: datetime = None):
+        """推进水位线（只前进不后退）"""
+        key = self._key(keyword, search_type)
+        current = self.marks.get(key)
+        if current and current.mid >= mid:
+            return
+        
+        self.marks[key] = Watermark(
+            mid=mid,
+            publish_time=publish_time.isoformat() if publish_time else "",
+            updated_at=datetime.now().isoformat()
+        )
+        self._save()
+
+
+def parse_since(value: str) -> datetime:
+    """
+    解析 --since 截止时间
+    
+    支持绝对时间（2025-12-15、2025-12-15 08:00）和相对时间（30m、6h、2d）
+    """
+    value = value.strip()
+    
+    match = re.fullmatch(r'(\d+)\s*([mhd])', value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = {'m': timedelta(minutes=amount), 'h': timedelta(hours=amount), 'd': timedelta(days=amount)}[unit]
+        return datetime.now() - delta
+    
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    
+    raise ValueError(f"无法解析时间: {value}（示例: 2025-12-15 08:00 / 6h / 2d）")
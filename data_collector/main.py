@@ -5,15 +5,28 @@ AICity 异步数据采集工具 - 高性能版本
 Usage:
     python main.py collect --source weibo --keywords "信阳,供暖"
     python main.py collect --source weibo --keywords "信阳" --concurrent 10
+    python main.py collect --source weibo --keywords "信阳" --since 6h
+    python main.py collect --source news --keywords "信阳,供暖" --sites baidu,sogou,toutiao
+    python main.py collect --source gov --keywords "供暖,物业" --sites xinyang,henan
     python main.py process --input ./output/raw_xxx.jsonl
     python main.py stats
     python main.py resume  # 断点续传
+    python main.py collect --source weibo --keywords "信阳,供暖" --enqueue  # 只入队
+    python main.py collect --source weibo --keywords "信阳" --cassette record  # 录制请求与响应
+    python main.py collect --source weibo --keywords "信阳" --cassette replay --full  # 离线回放
+    python main.py worker  # 从任务队列领取任务（可多进程同时运行，需 task_queue.backend: sqlite）
+    python main.py daemon  # 常驻采集，按关键词新帖速度自适应轮询，热加载关键词配置
     python main.py proxy --check  # 检测代理
+    python main.py benchmark --concurrency 3,10,20  # 本地模拟接口的端到端吞吐基准测试
 """
 
 import asyncio
 import argparse
+import signal
 import sys
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
 from pathlib import Path
 from datetime import datetime
 
@@ -22,28 +35,161 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from core.config import Config
 from core.logger import get_logger, setup_logger
-from core.task_queue import TaskQueue, TaskStatus
+from core.task_queue import TaskStatus, create_task_queue
+from core.sqlite_task_queue import default_worker_id
 from core.proxy_pool import ProxyPool
 from core.models import RawData
-from collectors import AsyncWeiboCollector
+from core.watermark import parse_since
+from core.refresh_planner import RefreshPlanner
+from collectors import AsyncWeiboCollector, AsyncNewsCollector, AsyncGovCollector
 from processors import DataCleaner, SentimentAnalyzer
 from storage import FileStorage
 
 
 logger = get_logger('AsyncMain')
 
+# 数据源 -> 异步采集器
+COLLECTORS = {
+    'weibo': AsyncWeiboCollector,
+    'news': AsyncNewsCollector,
+    'gov': AsyncGovCollector,
+}
+
+
+def install_stop_handler(stop_event: asyncio.Event):
+    """
+    SIGINT/SIGTERM 时置位 stop_event：不再发起新的页面请求，在途页面完成、
+    数据与分页游标落盘后正常退出；再次中断恢复默认行为（立即退出）
+    """
+    loop = asyncio.get_running_loop()
+    signals = (signal.SIGINT, signal.SIGTERM)
+    
+    def on_signal():
+        logger.warning("收到中断信号，等待在途页面完成后保存断点（再次中断立即退出）")
+        stop_event.set()
+        for sig in signals:
+            loop.remove_signal_handler(sig)
+    
+    for sig in signals:
+        try:
+            loop.add_signal_handler(sig, on_signal)
+        except (NotImplementedError, RuntimeError):
+            # Windows 事件循环不支持信号处理
+            pass
+
+
+def page_checkpoint(task_queue, task_by_keyword: dict, writer):
+    """分页检查点：该页数据先落盘，再记录任务在该搜索类型上完成的页"""
+    async def on_page(keyword: str, search_type: str, page: int, finished: bool = False):
+        task = task_by_keyword.get(keyword)
+        if task is None:
+            return
+        writer.commit()
+        await task_queue.save_cursor(task.id, search_type, page, finished)
+    return on_page
+
+
+def failed_keywords(collector) -> set:
+    """最近一次采集中有分页流因请求失败而停止的关键词（任务暂停，resume 从失败页继续）"""
+    return {keyword for keyword, _, _ in getattr(collector, 'failed_streams', [])}
+
+
+async def pause_tasks(task_queue, tasks: list, counts: dict, worker_id: str = None):
+    """中断后将任务标记为暂停，页码取已保存的游标"""
+    for task in tasks:
+        current = await task_queue.get_task(task.id) or task
+        await task_queue.mark_paused(task.id, current.page, task.collected_count + counts.get(task.keyword, 0),
+                                     worker_id=worker_id)
+    logger.warning(f"采集已中断，{len(tasks)} 个任务的数据与分页游标已保存，可用 resume 继续")
+
+
+async def run_task(collector, task, task_queue, writer, stop_event: asyncio.Event,
+                   worker_id: str = None) -> int:
+    """
+    执行单个任务：从分页游标处继续，逐页记录检查点，中断时暂停任务
+    
+    worker_id 为领取该任务的工作进程，结束状态只在仍持有租约时写入。
+    """
+    if task.cursors:
+        logger.info(f"恢复任务: {task.keyword}, 已完成页 {task.cursors}, 已翻完 {task.finished_types}")
+    await task_queue.mark_running(task.id)
+    
+    counts = Counter()
+    try:
+        async for data in collector.collect(
+            [task.keyword],
+            max_pages=task.max_pages,
+            cursors={task.keyword: task.cursors},
+            finished={task.keyword: task.finished_types},
+            on_page=page_checkpoint(task_queue, {task.keyword: task}, writer),
+            stop_event=stop_event
+        ):
+            writer.write(data)
+            counts[task.keyword] += 1
+        writer.commit()
+        
+        if stop_event.is_set() or task.keyword in failed_keywords(collector):
+            await pause_tasks(task_queue, [task], counts, worker_id)
+        elif await task_queue.mark_completed(task.id, task.collected_count + counts[task.keyword],
+                                             worker_id=worker_id):
+            logger.info(f"任务完成: {task.keyword} ({task.source}), 采集 {counts[task.keyword]} 条")
+    except Exception as e:
+        await task_queue.mark_failed(task.id, str(e), worker_id=worker_id)
+        logger.error(f"任务失败: {task.keyword} - {e}")
+    
+    return counts[task.keyword]
+
+
+async def run_claimed(collector, task, task_queue, writer, stop_event: asyncio.Event,
+                      worker_id: str, lease: float = 300.0):
+    """执行已领取的任务，按 1/3 租约间隔续期；租约被其他进程接管时取消执行"""
+    lost = asyncio.Event()
+    
+    async def keep_lease(runner: asyncio.Task):
+        while True:
+            await asyncio.sleep(lease / 3)
+            if not await task_queue.heartbeat(task.id, worker_id, lease):
+                logger.warning(f"任务租约已失效，停止执行: {task.id}")
+                lost.set()
+                runner.cancel()
+                return
+    
+    runner = asyncio.create_task(
+        run_task(collector, task, task_queue, writer, stop_event, worker_id=worker_id)
+    )
+    heartbeat = asyncio.create_task(keep_lease(runner))
+    try:
+        await runner
+    except asyncio.CancelledError:
+        # 租约失效导致的取消只放弃该任务；调用方自身被取消时继续向上抛出
+        if not lost.is_set():
+            raise
+    finally:
+        heartbeat.cancel()
+
 
 async def async_collect(args):
     """异步采集数据"""
     config = Config()
+    if args.cassette:
+        config.set('cassette', 'mode', value=args.cassette)
     storage = FileStorage(config)
-    task_queue = TaskQueue()
-    proxy_pool = ProxyPool()
+    task_queue = create_task_queue(config)
+    proxy_pool = ProxyPool.from_config(config)
     
-    # 加载代理
+    # 加载代理：优先使用上次保存的代理状态；没有可用代理时后台流式导入，
+    # 只等待首个代理通过检测即开始采集，其余代理边检测边加入。使用代理时不直连
     if args.use_proxy:
-        await proxy_pool.load_free_proxies()
-        await proxy_pool.check_all(concurrency=20)
+        config.set('proxy', 'required', value=True)
+        if not any(p.is_valid for p in proxy_pool.proxies.values()):
+            proxy_pool.start_ingest(workers=config.get('proxy', 'ingest_workers', default=20))
+            ready_timeout = config.get('proxy', 'ready_timeout', default=30)
+            if not await proxy_pool.wait_ready(ready_timeout):
+                logger.error(f"{ready_timeout}s 内没有可用代理，取消采集")
+                await proxy_pool.stop()
+                task_queue.close()
+                return 0
+        proxy_pool.start_revalidation()
         logger.info(f"代理池状态: {proxy_pool.get_statistics()}")
     
     # 解析关键词
@@ -53,113 +199,331 @@ async def async_collect(args):
     tasks = await task_queue.add_batch(keywords, args.source, args.max_pages)
     logger.info(f"创建 {len(tasks)} 个采集任务")
     
-    all_data = []
+    # 只入队，由 worker 进程领取执行
+    if args.enqueue:
+        task_queue.close()
+        return 0
     
     # 选择采集器
+    collect_kwargs = {'max_pages': args.max_pages}
     if args.source == 'weibo':
-        async with AsyncWeiboCollector(config) as collector:
-            # 设置并发数
-            collector.max_concurrent = args.concurrent
+        collect_kwargs['since'] = args.since
+        if args.full:
+            collect_kwargs['incremental'] = False
+    if args.source == 'news' and args.full_content:
+        collect_kwargs['full_content'] = True
+    if args.sites:
+        collect_kwargs['sources'] = args.sites.split(',')
+    
+    collector = COLLECTORS[args.source](config)
+    # 设置并发数（需在会话初始化前设置）
+    collector.max_concurrent = args.concurrent
+    # 注入代理池：请求按目标主机选代理并实时回报结果（配置中的代理会追加进来）
+    if args.use_proxy:
+        collector.proxy_pool = proxy_pool
+    
+    # 采集结果边采边写，分组落盘；落盘后才记入去重索引
+    writer = storage.open_stream(data_type='raw')
+    collector.attach_writer(writer)
+    
+    stop_event = asyncio.Event()
+    install_stop_handler(stop_event)
+    
+    async with collector:
+        # 所有任务的分页请求由调度器统一重叠执行
+        task_by_keyword = {task.keyword: task for task in tasks}
+        counts = Counter()
+        for task in tasks:
+            await task_queue.mark_running(task.id)
+        
+        collect_kwargs['on_page'] = page_checkpoint(task_queue, task_by_keyword, writer)
+        collect_kwargs['stop_event'] = stop_event
+        
+        try:
+            async for data in collector.collect(keywords, **collect_kwargs):
+                writer.write(data)
+                if data.keywords:
+                    counts[data.keywords[0]] += 1
             
-            # 如果有代理池，注入
-            if proxy_pool.proxies:
-                collector.proxy_pool = list(proxy_pool.proxies.keys())
+            if stop_event.is_set():
+                await pause_tasks(task_queue, tasks, counts)
+            else:
+                failed = failed_keywords(collector)
+                for keyword, task in task_by_keyword.items():
+                    if keyword not in failed:
+                        await task_queue.mark_completed(task.id, counts[keyword])
+                        logger.info(f"任务完成: {keyword}, 采集 {counts[keyword]} 条")
+                paused = [task for keyword, task in task_by_keyword.items() if keyword in failed]
+                if paused:
+                    await pause_tasks(task_queue, paused, counts)
             
+        except Exception as e:
             for task in tasks:
-                try:
-                    await task_queue.mark_running(task.id)
-                    logger.info(f"执行任务: {task.keyword}")
-                    
-                    data = await collector.run([task.keyword], max_pages=task.max_pages)
-                    all_data.extend(data)
-                    
-                    await task_queue.mark_completed(task.id, len(data))
-                    logger.info(f"任务完成: {task.keyword}, 采集 {len(data)} 条")
-                    
-                except KeyboardInterrupt:
-                    # 断点保存
-                    await task_queue.mark_paused(task.id, collector.request_count, len(all_data))
-                    logger.warning("用户中断，已保存断点")
-                    break
-                    
-                except Exception as e:
-                    await task_queue.mark_failed(task.id, str(e))
-                    logger.error(f"任务失败: {task.keyword} - {e}")
-            
-            # 输出统计
-            stats = collector.get_stats()
-            logger.info(f"采集统计: {stats}")
+                await task_queue.mark_failed(task.id, str(e))
+            logger.error(f"任务失败: {keywords} - {e}")
+        
+        finally:
+            writer.close()
+        
+        # 输出统计
+        stats = collector.get_stats()
+        logger.info(f"采集统计: {stats}")
     
-    # 保存数据
-    if all_data:
-        filepath = storage.save(all_data, data_type='raw')
-        logger.info(f"保存 {len(all_data)} 条数据到: {filepath}")
+    if args.use_proxy:
+        await proxy_pool.stop()
     
     # 显示任务统计
     queue_stats = task_queue.get_statistics()
     logger.info(f"任务统计: {queue_stats}")
+    task_queue.close()
     
-    return all_data
+    return writer.count
 
 
 async def resume_tasks(args):
     """断点续传 - 恢复未完成任务"""
     config = Config()
     storage = FileStorage(config)
-    task_queue = TaskQueue()
+    task_queue = create_task_queue(config)
     
-    # 获取待处理任务
-    pending_tasks = await task_queue.get_pending_tasks()
+    worker_id = default_worker_id()
+    writer = None
     
-    if not pending_tasks:
-        logger.info("没有待处理的任务")
+    try:
+        # 获取待处理任务
+        pending_tasks = await task_queue.get_pending_tasks()
+        
+        if not pending_tasks:
+            logger.info("没有待处理的任务")
+            return
+        
+        logger.info(f"发现 {len(pending_tasks)} 个待处理任务")
+        
+        writer = storage.open_stream(data_type='raw_resumed')
+        stop_event = asyncio.Event()
+        install_stop_handler(stop_event)
+        
+        # 按数据源分组恢复，逐个领取后执行，不会与工作进程重复执行同一任务
+        attempted = set()
+        sources = {task.source for task in pending_tasks}
+        for source in sorted(sources):
+            collector_cls = COLLECTORS.get(source)
+            if collector_cls is None:
+                skipped = sum(1 for task in pending_tasks if task.source == source)
+                logger.warning(f"跳过不支持的数据源任务: {source} ({skipped} 个)")
+                continue
+            
+            async with collector_cls(config) as collector:
+                collector.attach_writer(writer)
+                while not stop_event.is_set():
+                    # 本轮已执行过的任务不再领取，否则数据流失败后暂停的任务会被立刻重新领取
+                    claimed = await task_queue.claim(worker_id, limit=1, source=source, exclude=attempted)
+                    if not claimed:
+                        break
+                    attempted.add(claimed[0].id)
+                    # 从各搜索类型最后完成的页之后继续
+                    await run_claimed(collector, claimed[0], task_queue, writer, stop_event, worker_id)
+    finally:
+        if writer is not None:
+            writer.close()
+        task_queue.close()
+    
+    logger.info(f"断点续传完成，共采集 {writer.count} 条新数据")
+
+
+async def run_worker(args):
+    """工作进程 - 从任务队列原子领取任务执行，租约定期续期，崩溃后任务可被其他进程接管"""
+    config = Config()
+    storage = FileStorage(config)
+    task_queue = create_task_queue(config)
+    worker_id = args.worker_id or default_worker_id()
+    
+    # 每个进程写自己的文件，避免多进程追加同一文件
+    writer = storage.open_stream(
+        filename=f"raw_{worker_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    collectors = {}
+    attempted = set()
+    finished = 0
+    stop_event = asyncio.Event()
+    install_stop_handler(stop_event)
+    
+    logger.info(f"工作进程启动: {worker_id}")
+    try:
+        async with AsyncExitStack() as stack:
+            while not stop_event.is_set() and (args.max_tasks <= 0 or finished < args.max_tasks):
+                # 本进程暂停过的任务不再领取，留给其他进程或下次启动
+                claimed = await task_queue.claim(worker_id, limit=1, lease=args.lease,
+                                                 source=args.source, exclude=attempted)
+                if not claimed:
+                    if args.poll <= 0:
+                        break
+                    await asyncio.sleep(args.poll)
+                    continue
+                
+                task = claimed[0]
+                attempted.add(task.id)
+                collector_cls = COLLECTORS.get(task.source)
+                if collector_cls is None:
+                    await task_queue.mark_failed(task.id, f"不支持的数据源: {task.source}")
+                    continue
+                
+                collector = collectors.get(task.source)
+                if collector is None:
+                    collector = collector_cls(config)
+                    collector.max_concurrent = args.concurrent
+                    collector.attach_writer(writer)
+                    collectors[task.source] = await stack.enter_async_context(collector)
+                
+                await run_claimed(collector, task, task_queue, writer, stop_event, worker_id, args.lease)
+                finished += 1
+    finally:
+        writer.close()
+        task_queue.close()
+    
+    logger.info(f"工作进程结束: {worker_id}, 完成 {finished} 个任务, 采集 {writer.count} 条")
+
+
+def daemon_keywords(config) -> dict:
+    """常驻采集的关键词 {关键词: 页数}：daemon.keywords，未配置时取批量采集任务"""
+    daemon_config = config.get('daemon', default={}) or {}
+    max_pages = daemon_config.get('max_pages', 5)
+    if daemon_config.get('keywords'):
+        return {kw: max_pages for kw in daemon_config['keywords']}
+    
+    keywords = {}
+    for task in config.get('batch_collect', 'tasks', default=[]) or []:
+        for kw in task.get('keywords', []):
+            keywords.setdefault(kw, min(task.get('max_pages', max_pages), max_pages))
+    return keywords
+
+
+async def run_daemon(args):
+    """
+    常驻采集 - 会话、连接池、去重索引与水位线常驻内存，按关键词到期时间轮询
+    
+    每轮取到期的关键词做一次增量采集（翻到水位线即停），按新增条数更新该词的轮询间隔；
+    settings.yaml 修改后自动重新加载，关键词增删无需重启。
+    """
+    config = Config()
+    storage = FileStorage(config)
+    planner = RefreshPlanner.from_config(config)
+    
+    def sync_keywords():
+        added, removed = planner.sync(daemon_keywords(config))
+        if added or removed:
+            logger.info(f"关键词更新: 新增 {added}, 移除 {removed}")
+    
+    sync_keywords()
+    if not planner.schedules:
+        logger.warning("没有可轮询的关键词，请配置 daemon.keywords 或 batch_collect.tasks")
         return
     
-    logger.info(f"发现 {len(pending_tasks)} 个待处理任务")
+    stop_event = asyncio.Event()
+    install_stop_handler(stop_event)
+    
+    collector = AsyncWeiboCollector(config)
+    collector.max_concurrent = args.concurrent
+    writer = None
+    writer_day = None
     
-    all_data = []
+    async def commit_page(keyword, search_type, page, finished=False):
+        # 每页数据先落盘，水位线只在数据落盘后推进
+        writer.commit()
     
-    async with AsyncWeiboCollector(config) as collector:
-        for task in pending_tasks:
-            try:
-                # 从断点页开始
-                start_page = task.page
-                logger.info(f"恢复任务: {task.keyword}, 从第 {start_page} 页开始")
+    logger.info(f"常驻采集启动: {len(planner.schedules)} 个关键词")
+    async with collector:
+        try:
+            while not stop_event.is_set():
+                daemon_config = config.get('daemon', default={}) or {}
+                try:
+                    if config.reload_if_changed():
+                        logger.info("配置文件已更新，重新加载")
+                        daemon_config = config.get('daemon', default={}) or {}
+                        planner.apply_config(config)
+                        sync_keywords()
+                except Exception as e:
+                    logger.warning(f"重新加载配置失败，沿用原配置: {e}")
                 
-                await task_queue.mark_running(task.id, start_page)
+                due = planner.due(limit=daemon_config.get('batch_size', 10))
+                if not due:
+                    # 睡到最近的到期时间，期间定期检查配置文件
+                    next_due = planner.next_due()
+                    wait = daemon_config.get('reload_interval', 30)
+                    if next_due is not None:
+                        wait = max(1.0, min(wait, next_due - time.time()))
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-                data = await collector.run(
-                    [task.keyword], 
-                    max_pages=task.max_pages,
-                    start_page=start_page
-                )
-                all_data.extend(data)
+                # 输出文件按天切换
+                today = datetime.now().strftime('%Y%m%d')
+                if writer_day != today:
+                    if writer is not None:
+                        writer.close()
+                    writer = storage.open_stream(filename=f"raw_daemon_{today}")
+                    collector.attach_writer(writer)
+                    writer_day = today
                 
-                await task_queue.mark_completed(task.id, task.collected_count + len(data))
+                counts = Counter()
+                keywords = [s.keyword for s in due]
+                try:
+                    async for data in collector.collect(
+                        keywords,
+                        page_budget={s.keyword: s.max_pages for s in due},
+                        search_types=daemon_config.get('search_types', ['realtime']),
+                        incremental=True,
+                        on_page=commit_page,
+                        stop_event=stop_event
+                    ):
+                        writer.write(data)
+                        if data.keywords:
+                            counts[data.keywords[0]] += 1
+                    writer.commit()
+                    failed = failed_keywords(collector)
+                except Exception as e:
+                    logger.error(f"轮询失败: {keywords} - {e}")
+                    failed = set(keywords)
                 
-            except Exception as e:
-                await task_queue.mark_failed(task.id, str(e))
-                logger.error(f"恢复任务失败: {task.keyword} - {e}")
-    
-    if all_data:
-        storage.save(all_data, data_type='raw_resumed')
-    
-    logger.info(f"断点续传完成，共采集 {len(all_data)} 条新数据")
+                if stop_event.is_set():
+                    break
+                
+                for schedule in due:
+                    if schedule.keyword in failed:
+                        # 失败或部分失败的轮询不代表新帖速度，保持原间隔，稍后重试
+                        planner.retry(schedule.keyword)
+                        logger.warning(f"  {schedule.keyword}: 轮询未完成，{planner.min_interval:.0f} 秒后重试")
+                        continue
+                    planner.record(schedule.keyword, counts[schedule.keyword])
+                    logger.info(
+                        f"  {schedule.keyword}: 新增 {counts[schedule.keyword]} 条, "
+                        f"速度 {schedule.velocity:.1f}/h, 下次 {schedule.interval:.0f} 秒后"
+                    )
+                planner.save()
+        finally:
+            if writer is not None:
+                writer.close()
+            planner.save()
+    
+    logger.info(f"常驻采集结束，统计: {collector.get_stats()}")
 
 
 async def manage_proxy(args):
-    """代理池管理"""
-    proxy_pool = ProxyPool()
+    """代理池管理（结果保存到本地，采集时直接复用）"""
+    config = Config()
+    proxy_pool = ProxyPool.from_config(config)
     
     if args.load:
-        await proxy_pool.load_free_proxies()
+        await proxy_pool.ingest(workers=args.concurrent)
         logger.info(f"加载完成: {proxy_pool.get_statistics()}")
     
     if args.check:
         if not proxy_pool.proxies:
-            await proxy_pool.load_free_proxies()
-        
-        await proxy_pool.check_all(concurrency=args.concurrent)
+            await proxy_pool.ingest(workers=args.concurrent)
+        else:
+            await proxy_pool.check_all(concurrency=args.concurrent)
         
         stats = proxy_pool.get_statistics()
         print(f"\n代理池统计:")
@@ -171,11 +535,13 @@ async def manage_proxy(args):
     if args.cleanup:
         await proxy_pool.cleanup_invalid()
         logger.info("清理完成")
+    
+    proxy_pool.save()
 
 
 async def show_status(args):
     """显示状态"""
-    task_queue = TaskQueue()
+    task_queue = create_task_queue(Config())
     
     stats = task_queue.get_statistics()
     
@@ -199,6 +565,7 @@ async def show_status(args):
             print(f"  - {task.keyword} ({task.source}) [页{task.page}/{task.max_pages}]")
         if len(pending) > 5:
             print(f"  ... 还有 {len(pending) - 5} 个任务")
+    task_queue.close()
     
     print("\n" + "=" * 50)
 
@@ -323,11 +690,31 @@ def main():
     
     # collect 命令
     collect_parser = subparsers.add_parser('collect', help='异步采集数据')
-    collect_parser.add_argument('--source', '-s', default='weibo', help='数据源')
+    collect_parser.add_argument('--source', '-s', default='weibo', choices=list(COLLECTORS), help='数据源')
+    collect_parser.add_argument('--sites', type=str, help='新闻/政务站点(逗号分隔)，如 baidu,sogou,toutiao 或 xinyang,henan')
     collect_parser.add_argument('--keywords', '-k', type=str, help='关键词(逗号分隔)')
     collect_parser.add_argument('--max-pages', '-p', type=int, default=10, help='最大页数')
-    collect_parser.add_argument('--concurrent', '-c', type=int, default=5, help='并发数')
+    collect_parser.add_argument('--concurrent', '-c', type=int, default=5, help='并发数（启用 concurrency.adaptive 时为初始值）')
     collect_parser.add_argument('--use-proxy', action='store_true', help='使用代理池')
+    collect_parser.add_argument('--since', type=parse_since, help='只采集该时间之后的微博，如 "2025-12-15 08:00" 或 6h、2d')
+    collect_parser.add_argument('--full', action='store_true', help='忽略增量水位线，完整翻页')
+    collect_parser.add_argument('--full-content', action='store_true', help='新闻：并发抓取正文（默认只有标题+摘要）')
+    collect_parser.add_argument('--enqueue', action='store_true', help='只创建任务，由 worker 进程执行')
+    collect_parser.add_argument('--cassette', choices=['record', 'replay'],
+                                help='录制请求与响应到 cassette.dir，或从录制离线回放（不访问网络）')
+    
+    # worker 命令
+    worker_parser = subparsers.add_parser('worker', help='从任务队列领取并执行任务（可多进程）')
+    worker_parser.add_argument('--source', '-s', choices=list(COLLECTORS), help='只领取该数据源的任务')
+    worker_parser.add_argument('--concurrent', '-c', type=int, default=5, help='并发数（启用 concurrency.adaptive 时为初始值）')
+    worker_parser.add_argument('--lease', type=float, default=300, help='任务租约时长(秒)，按 1/3 间隔续期')
+    worker_parser.add_argument('--poll', type=float, default=0, help='队列为空时的轮询间隔(秒)，0 表示直接退出')
+    worker_parser.add_argument('--max-tasks', type=int, default=0, help='最多执行的任务数，0 表示不限')
+    worker_parser.add_argument('--worker-id', type=str, help='工作进程标识，默认 主机名-进程号')
+    
+    # daemon 命令
+    daemon_parser = subparsers.add_parser('daemon', help='常驻采集（自适应轮询间隔，热加载配置）')
+    daemon_parser.add_argument('--concurrent', '-c', type=int, default=5, help='并发数（启用 concurrency.adaptive 时为初始值）')
     
     # resume 命令
     resume_parser = subparsers.add_parser('resume', help='断点续传')
@@ -350,6 +737,11 @@ def main():
     # stats 命令
     stats_parser = subparsers.add_parser('stats', help='显示统计信息')
     
+    # benchmark 命令
+    from benchmarks.bench_collect import add_arguments as add_benchmark_arguments
+    benchmark_parser = subparsers.add_parser('benchmark', help='端到端采集基准测试（本地模拟微博接口，输出JSON）')
+    add_benchmark_arguments(benchmark_parser)
+    
     args = parser.parse_args()
     
     if args.command is None:
@@ -363,6 +755,10 @@ def main():
         asyncio.run(async_collect(args))
     elif args.command == 'resume':
         asyncio.run(resume_tasks(args))
+    elif args.command == 'worker':
+        asyncio.run(run_worker(args))
+    elif args.command == 'daemon':
+        asyncio.run(run_daemon(args))
     elif args.command == 'proxy':
         asyncio.run(manage_proxy(args))
     elif args.command == 'status':
@@ -371,6 +767,9 @@ def main():
         process_data(args)
     elif args.command == 'stats':
         show_stats(args)
+    elif args.command == 'benchmark':
+        from benchmarks.bench_collect import run as run_benchmark
+        run_benchmark(args)
 
 
 if __name__ == '__main__':
@@ -5,5 +5,6 @@
 
 from .file_storage import FileStorage
 from .mongo_storage import MongoStorage
+from .stream_writer import StreamWriter
 
-__all__ = ['FileStorage', 'MongoStorage']
+__all__ = ['FileStorage', 'MongoStorage', 'StreamWriter']
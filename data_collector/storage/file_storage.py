@@ -12,6 +12,7 @@ from typing import List, Union
 from core.models import RawData, CleanedData
 from core.config import Config
 from core.logger import get_logger
+from .stream_writer import StreamWriter
 
 
 class FileStorage:
@@ -63,6 +64,29 @@ class FileStorage:
         self.logger.info(f"保存 {len(data)} 条数据到: {filepath}")
         return str(filepath)
     
+    def open_stream(self, filename: str = None, data_type: str = 'raw') -> StreamWriter:
+        """
+        打开流式写入器（始终为JSONL格式）
+        
+        Args:
+            filename: 文件名（不含扩展名），已存在时追加
+            data_type: 数据类型 raw/cleaned/annotated
+            
+        Returns:
+            StreamWriter，调用方逐条 write，结束时 close（支持 with）
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"{data_type}_{timestamp}"
+        
+        stream_config = self.config.get('storage', 'file', 'stream', default={}) or {}
+        return StreamWriter(
+            self.output_dir / f"{filename}.jsonl",
+            commit_every=stream_config.get('commit_every', 200),
+            commit_interval=stream_config.get('commit_interval', 2.0),
+            fsync=stream_config.get('fsync', True)
+        )
+    
     def _save_jsonl(self, data: List, filename: str) -> Path:
         """保存为JSONL格式"""
         filepath = self.output_dir / f"{filename}.jsonl"
@@ -137,12 +161,21 @@ class FileStorage:
             raise ValueError(f"不支持的文件格式: {suffix}")
     
     def _load_jsonl(self, filepath: Path) -> List[dict]:
-        """加载JSONL文件"""
+        """加载JSONL文件（容忍写入中断留下的不完整末行）"""
         data = []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    data.append(json.loads(line))
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+        
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                data.append(json.loads(line))
+            except json.JSONDecodeError:
+                if index == len(lines) - 1 and not line.endswith('\n'):
+                    self.logger.warning(f"跳过不完整的末行: {filepath.name}")
+                    continue
+                raise
         return data
     
     def _load_json(self, filepath: Path) -> List[dict]:
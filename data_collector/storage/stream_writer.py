@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+流式写入 - 采集结果逐条追加到 JSONL，按条数/时间分组提交落盘
+"""
+
+import os
+import json
+import time
+import asyncio
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+from pydantic import BaseModel
+
+from core.logger import get_logger
+
+
+class StreamWriter:
+    """
+    JSONL 追加写入器
+    
+    - 记录先进入内存缓冲，累计 commit_every 条或距上次提交超过 commit_interval 秒时
+      一次性写入并 fsync（分组提交），内存占用与运行时长无关
+    - 在事件循环中创建时启动定时提交，没有新记录写入时缓冲也不会超过 commit_interval 秒未落盘
+    - 提交回调（add_commit_hook）在落盘后收到本次提交记录的ID，用于落盘后再记入去重索引
+    - 打开已有文件时，截掉崩溃留下的不完整末行，之后的追加不会与残行拼接
+    """
+    
+    def __init__(self, filepath: Union[str, Path], commit_every: int = 200,
+                 commit_interval: float = 2.0, fsync: bool = True):
+        self.logger = get_logger('StreamWriter')
+        self.path = Path(filepath)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = max(1, commit_every)
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        
+        self.count = 0          # 本次写入条数
+        self.committed = 0      # 已落盘条数
+        self._buffer: List[str] = []
+        self._buffer_ids: List[str] = []
+        self._commit_hooks: List[Callable[[List[str]], Any]] = []
+        self._last_commit = time.monotonic()
+        self._autocommit: Optional[asyncio.Task] = None
+        
+        self._repair_tail()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            if self.commit_interval > 0:
+                self._autocommit = asyncio.create_task(self._autocommit_loop())
+    
+    async def _autocommit_loop(self):
+        """定时提交缓冲中超时的记录"""
+        while True:
+            await asyncio.sleep(self.commit_interval)
+            self.maybe_commit()
+    
+    def _repair_tail(self):
+        """截断文件末尾不完整的一行"""
+        if not self.path.exists():
+            return
+        
+        with open(self.path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            
+            # 向前查找最后一个换行符
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                pos = f.read(end - start).rfind(b'\n')
+                if pos != -1:
+                    keep = start + pos + 1
+                    break
+                end = start
+            else:
+                keep = 0
+            
+            f.truncate(keep)
+            self.logger.warning(f"{self.path.name} 末行不完整，已截断 {size - keep} 字节")
+    
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+    
+    def add_commit_hook(self, hook: Callable[[List[str]], Any]):
+        """注册提交回调，参数为本次落盘记录的ID列表"""
+        self._commit_hooks.append(hook)
+    
+    def remove_commit_hook(self, hook: Callable[[List[str]], Any]):
+        if hook in self._commit_hooks:
+            self._commit_hooks.remove(hook)
+    
+    def write(self, item: Union[BaseModel, dict]):
+        """追加一条记录"""
+        if isinstance(item, BaseModel):
+            line = item.model_dump_json(exclude_none=True)
+            record_id = getattr(item, 'id', None)
+        else:
+            line = json.dumps(item, ensure_ascii=False, default=str)
+            record_id = item.get('id')
+        
+        self._buffer.append(line + '\n')
+        if record_id and self._commit_hooks:
+            self._buffer_ids.append(record_id)
+        self.count += 1
+        
+        if len(self._buffer) >= self.commit_every:
+            self.commit()
+        else:
+            self.maybe_commit()
+    
+    def maybe_commit(self):
+        """距上次提交超过 commit_interval 秒时提交"""
+        if self._buffer and time.monotonic() - self._last_commit >= self.commit_interval:
+            self.commit()
+    
+    def commit(self):
+        """写入缓冲区并落盘"""
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.committed += len(self._buffer)
+            self._buffer.clear()
+            
+            record_ids, self._buffer_ids = self._buffer_ids, []
+            for hook in self._commit_hooks:
+                try:
+                    hook(record_ids)
+                except Exception as e:
+                    self.logger.error(f"提交回调失败: {e}")
+        self._last_commit = time.monotonic()
+    
+    def close(self):
+        """提交剩余记录并关闭，未写入任何数据时删除空文件"""
+        if self._file.closed:
+            return
+        
+        if self._autocommit is not None:
+            self._autocommit.cancel()
+            self._autocommit = None
+        self.commit()
+        self._file.close()
+        
+        if self.path.stat().st_size == 0:
+            self.path.unlink()
+        elif self.count:
+            self.logger.info(f"写入 {self.count} 条数据到: {self.path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
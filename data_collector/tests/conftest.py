@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共配置 - 以 data_collector 为导入根目录，运行时文件写入临时目录
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """切换到临时目录，配置中的 ./output、./logs 等相对路径都落在这里"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+熔断器测试
+"""
+
+from core.circuit_breaker import CircuitBreaker, CircuitBreakers, CLOSED, OPEN, HALF_OPEN
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    assert breaker.record(False, now=0) is None
+    breaker.record(True, now=0)
+    breaker.record(False, now=0)
+    breaker.record(False, now=0)
+    assert breaker.state == CLOSED
+    
+    assert breaker.record(False, now=1) == OPEN
+    assert not breaker.allow(now=5)
+    assert breaker.blocked(now=5)
+
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, half_open_probes=1)
+    breaker.record(False, now=1)
+    
+    assert breaker.allow(now=12)
+    assert breaker.state == HALF_OPEN
+    # 试探名额已占用
+    assert not breaker.allow(now=12)
+    
+    assert breaker.record(True, now=13) == CLOSED
+    assert breaker.allow(now=13)
+
+
+def test_failed_probe_doubles_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, max_reset_timeout=30)
+    breaker.record(False, now=1)
+    
+    breaker.allow(now=12)
+    assert breaker.record(False, now=12) == OPEN
+    assert breaker.timeout == 20
+    
+    breaker.allow(now=33)
+    breaker.record(False, now=33)
+    assert breaker.timeout == 30
+
+
+def test_release_returns_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record(False, now=1)
+    assert breaker.allow(now=12)
+    breaker.release()
+    assert breaker.allow(now=12)
+
+
+def test_registry_uses_per_kind_thresholds():
+    breakers = CircuitBreakers(host_failures=3, proxy_failures=1, reset_timeout=60)
+    breakers.record('proxy', 'http://p1', False)
+    breakers.record('host', 'm.weibo.cn', False)
+    
+    assert breakers.blocked('proxy') == {'http://p1'}
+    assert breakers.blocked('host') == set()
+    assert not breakers.allow('proxy', 'http://p1')
+    assert breakers.allow('proxy', 'http://p2')
+    assert breakers.rejected == 1
+    assert breakers.get_statistics()['tripped']['proxy:http://p1']['state'] == OPEN
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+条件请求缓存测试 - 列表页的缓存条目在数据落盘后才写入
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from core.config import Config
+from core.async_base import FetchResult
+from core.models import RawData, SourceType
+from collectors.async_gov import AsyncGovCollector
+from storage.stream_writer import StreamWriter
+
+KEYWORDS = ['信阳']
+
+
+@pytest.fixture
+def collector(workdir, monkeypatch):
+    config = Config()
+    monkeypatch.setitem(config._config, 'dedup', {'enabled': False})
+    monkeypatch.setitem(config._config, 'request_coalescing', {'enabled': False})
+    collector = AsyncGovCollector(config)
+    
+    async def fetch(url, **kwargs):
+        return FetchResult(url=url, status=200, headers={}, body=b'<html>list</html>')
+    
+    def parse(html, source, keywords, prefix):
+        return [
+            RawData(id=f"{prefix}-{i}", source=SourceType.GOV, content='政务',
+                    publish_time=datetime.now())
+            for i in range(5)
+        ]
+    
+    monkeypatch.setattr(collector, '_fetch', fetch)
+    monkeypatch.setattr(collector, '_parse_gov_news', lambda *args: parse(*args, 'news'))
+    monkeypatch.setattr(collector, '_parse_complaints', lambda *args: parse(*args, 'complaint'))
+    return collector
+
+
+def cached_pages(collector) -> int:
+    source = collector.GOV_SOURCES['xinyang']
+    variant = ','.join(sorted(KEYWORDS))
+    return sum(
+        collector.http_cache.get(collector.http_cache.make_key(source['base_url'] + source[field], None, variant))
+        is not None
+        for field in ('news_url', 'complaint_url')
+    )
+
+
+def test_store_waits_for_writer_commit(collector, workdir):
+    async def scenario():
+        writer = StreamWriter(workdir / 'raw.jsonl', commit_every=1000, commit_interval=3600)
+        collector.attach_writer(writer)
+        async for data in collector.collect(KEYWORDS, max_items=100):
+            writer.write(data)
+        
+        before_commit = cached_pages(collector)
+        writer.commit()
+        await asyncio.gather(*collector._cache_writes)
+        after_commit = cached_pages(collector)
+        await collector.close()
+        writer.close()
+        return before_commit, after_commit
+    
+    assert asyncio.run(scenario()) == (0, 2)
+
+
+def test_truncated_page_is_not_stored(collector, workdir):
+    async def scenario():
+        writer = StreamWriter(workdir / 'raw.jsonl')
+        collector.attach_writer(writer)
+        async for data in collector.collect(KEYWORDS, max_items=3):
+            writer.write(data)
+        writer.commit()
+        await asyncio.gather(*collector._cache_writes)
+        stored = cached_pages(collector)
+        await collector.close()
+        writer.close()
+        return stored
+    
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+请求合并测试
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from core.request_coalescer import RequestCoalescer
+
+
+def response(status: int = 200, body: bytes = b'ok'):
+    return SimpleNamespace(status=status, body=body, truncated=False)
+
+
+class CountingFetch:
+    """记录实际发出的请求次数"""
+    
+    def __init__(self, result, delay: float = 0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+    
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+def test_concurrent_requests_share_one_fetch():
+    coalescer = RequestCoalescer()
+    fetch = CountingFetch(response(), delay=0.01)
+    
+    async def scenario():
+        return await asyncio.gather(*(coalescer.run('k', fetch) for _ in range(5)))
+    
+    results = asyncio.run(scenario())
+    assert fetch.calls == 1
+    assert all(r is results[0] for r in results)
+    assert coalescer.coalesced == 4
+
+
+def test_negative_result_is_cached():
+    coalescer = RequestCoalescer(negative_ttl=600)
+    fetch = CountingFetch(response(404))
+    
+    async def scenario():
+        await coalescer.run('k', fetch)
+        await coalescer.run('k', fetch)
+    
+    asyncio.run(scenario())
+    assert fetch.calls == 1
+    assert coalescer.negative_hits == 1
+
+
+def test_throttled_result_is_not_cached():
+    coalescer = RequestCoalescer(negative_ttl=600)
+    
+    async def scenario(status):
+        fetch = CountingFetch(response(status))
+        await coalescer.run(f'k{status}', fetch)
+        await coalescer.run(f'k{status}', fetch)
+        return fetch.calls
+    
+    assert asyncio.run(scenario(418)) == 2
+    assert asyncio.run(scenario(429)) == 2
+
+
+def test_uncached_run_only_shares_inflight():
+    coalescer = RequestCoalescer()
+    fetch = CountingFetch(response())
+    
+    async def scenario():
+        await coalescer.run('article', fetch, cache=False)
+        await coalescer.run('article', fetch, cache=False)
+    
+    asyncio.run(scenario())
+    assert fetch.calls == 2
+    assert coalescer.get_statistics()['entries'] == 0
+
+
+def test_cache_is_bounded_by_total_bytes():
+    coalescer = RequestCoalescer(max_entries=100, max_bytes=1000)
+    for i in range(5):
+        coalescer.put(f'k{i}', response(body=b'x' * 400))
+    
+    assert coalescer.total_bytes <= 1000
+    assert coalescer.get('k4') is not None
+    assert coalescer.get('k0') is None
+    
+    # 超过上限的单个响应不缓存
+    coalescer.put('huge', response(body=b'x' * 2000))
+    assert coalescer.get('huge') is None
+
+
+def test_cache_is_bounded_by_entries():
+    coalescer = RequestCoalescer(max_entries=2)
+    for i in range(3):
+        coalescer.put(f'k{i}', response())
+    
+    assert coalescer.get('k0') is None
+    assert coalescer.get('k2') is not None
+    assert coalescer.total_bytes == 4
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+已采集ID索引测试
+"""
+
+from core.seen_index import SeenIndex
+
+
+def open_index(workdir) -> SeenIndex:
+    return SeenIndex(str(workdir / 'seen.db'), capacity=10_000, max_bytes=1024 * 1024)
+
+
+def test_reopen_keeps_ids(workdir):
+    index = open_index(workdir)
+    index.add_many(['a', 'b'])
+    assert 'a' in index
+    index.close()
+    
+    index = open_index(workdir)
+    assert index.count == 2
+    assert 'a' in index and 'b' in index
+    assert 'c' not in index
+    index.close()
+
+
+def test_instances_sharing_db_keep_each_others_ids(workdir):
+    first = open_index(workdir)
+    second = open_index(workdir)
+    first.add('from-a')
+    second.add('from-b')
+    first.close()
+    second.close()
+    
+    index = open_index(workdir)
+    assert index.count == 2
+    assert 'from-a' in index
+    assert 'from-b' in index
+    index.close()
+
+
+def test_stale_bloom_file_is_rebuilt(workdir):
+    index = open_index(workdir)
+    index.add('old')
+    index.close()
+    
+    # 另一个实例写入后崩溃，没有保存位数组
+    crashed = open_index(workdir)
+    crashed.add('new')
+    crashed.flush()
+    crashed._conn.close()
+    
+    index = open_index(workdir)
+    assert index.count == 2
+    assert 'new' in index
+    index.close()
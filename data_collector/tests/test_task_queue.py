@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+任务队列测试 - 领取、租约与断点续传
+"""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from core.task_queue import TaskQueue, TaskStatus
+from core.sqlite_task_queue import SQLiteTaskQueue
+
+
+def make_queue(backend, workdir):
+    if backend == 'sqlite':
+        return SQLiteTaskQueue(str(workdir / 'tasks.db'))
+    return TaskQueue(str(workdir / 'tasks.json'))
+
+
+class FailingCollector:
+    """每个分页流都请求失败的采集器（模拟持续 418）"""
+    
+    runs = 0
+    
+    def __init__(self, config):
+        self.failed_streams = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    def attach_writer(self, writer):
+        pass
+    
+    async def collect(self, keywords, **kwargs):
+        FailingCollector.runs += 1
+        self.failed_streams = [(keyword, '综合', 1) for keyword in keywords]
+        return
+        yield
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_claim_excludes_attempted(backend, workdir):
+    async def scenario():
+        queue = make_queue(backend, workdir)
+        task_id = (await queue.add_task('长安', 'weibo')).id
+        claimed = await queue.claim('w1')
+        assert [t.id for t in claimed] == [task_id]
+        await queue.mark_paused(task_id, 1, 0, worker_id='w1')
+        
+        assert await queue.claim('w1', exclude={task_id}) == []
+        assert [t.id for t in await queue.claim('w1')] == [task_id]
+        queue.close()
+    
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_resume_stops_when_streams_keep_failing(backend, workdir, monkeypatch):
+    config = main.Config()
+    monkeypatch.setitem(config._config, 'task_queue', {
+        'backend': backend,
+        'path': str(workdir / 'tasks.json'),
+        'db_path': str(workdir / 'tasks.db'),
+    })
+    monkeypatch.setattr(main, 'COLLECTORS', {'weibo': FailingCollector})
+    FailingCollector.runs = 0
+    
+    async def scenario():
+        queue = main.create_task_queue(config)
+        task_id = (await queue.add_task('长安', 'weibo')).id
+        queue.close()
+        
+        # 修复前暂停的任务会被立即重新领取，resume 永不结束
+        await asyncio.wait_for(main.resume_tasks(SimpleNamespace()), timeout=10)
+        
+        queue = main.create_task_queue(config)
+        task = await queue.get_task(task_id)
+        queue.close()
+        return task
+    
+    task = asyncio.run(scenario())
+    assert FailingCollector.runs == 1
+    assert task.status == TaskStatus.PAUSED
+
+
+def test_resume_without_tasks_closes_queue(workdir, monkeypatch):
+    config = main.Config()
+    monkeypatch.setitem(config._config, 'task_queue', {
+        'backend': 'sqlite',
+        'db_path': str(workdir / 'tasks.db'),
+    })
+    queues = []
+    create = main.create_task_queue
+    monkeypatch.setattr(main, 'create_task_queue', lambda c: queues.append(create(c)) or queues[-1])
+    
+    asyncio.run(main.resume_tasks(SimpleNamespace()))
+    
+    with pytest.raises(sqlite3.ProgrammingError):
+        queues[0]._conn.execute("SELECT 1")
+
+
+def test_journal_replays_after_reopen(workdir):
+    path = str(workdir / 'tasks.json')
+    
+    async def scenario():
+        queue = TaskQueue(path, compact_every=10 ** 6)
+        tasks = await queue.add_batch(['a', 'b'], 'weibo', 3)
+        await queue.save_cursor(tasks[0].id, 'realtime', 2)
+        await queue.mark_completed(tasks[1].id, 5)
+        # 模拟崩溃：不合并快照，只留下日志
+        queue._journal.close()
+        queue._compactor.shutdown()
+        
+        queue = TaskQueue(path, compact_every=10 ** 6)
+        first = await queue.get_task(tasks[0].id)
+        stats = queue.get_statistics()
+        queue.close()
+        return first, stats
+    
+    first, stats = asyncio.run(scenario())
+    assert first.cursors == {'realtime': 2}
+    assert stats['completed'] == 1 and stats['pending'] == 1
+
+
+def test_crash_during_compaction_does_not_double_apply(workdir, monkeypatch):
+    path = workdir / 'tasks.json'
+    
+    async def scenario():
+        queue = TaskQueue(str(path), compact_every=10 ** 6)
+        tasks = await queue.add_batch(['a', 'b', 'c'], 'weibo', 3)
+        await queue.mark_completed(tasks[0].id, 5)
+        
+        # 快照已替换，但进程在删除已合并的日志前崩溃
+        unlink = Path.unlink
+        with monkeypatch.context() as m:
+            m.setattr(Path, 'unlink', lambda self, *a, **k:
+                      None if self.name.endswith('.compacting') else unlink(self, *a, **k))
+            queue.compact(wait=True)
+        await queue.mark_completed(tasks[1].id, 7)
+        queue._journal.close()
+        queue._compactor.shutdown()
+        
+        queue = TaskQueue(str(path), compact_every=10 ** 6)
+        stats = queue.get_statistics()
+        await queue.mark_completed(tasks[2].id, 1)
+        queue.close()
+        
+        queue = TaskQueue(str(path))
+        final = queue.get_statistics()
+        queue.close()
+        return stats, final
+    
+    stats, final = asyncio.run(scenario())
+    assert stats['total'] == 3 and stats['completed'] == 2
+    assert final['total'] == 3 and final['completed'] == 3
+    assert sum(1 for _ in open(f"{path}.archive.jsonl", encoding='utf-8')) == 3
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+发布时间解析测试
+"""
+
+from datetime import datetime
+
+import pytest
+
+from core.time_parser import parse_time
+
+
+@pytest.mark.parametrize('text, now, expected', [
+    ('2024-03-01 08:30', datetime(2025, 1, 1), datetime(2024, 3, 1, 8, 30)),
+    ('12月15日 08:30', datetime(2025, 12, 20), datetime(2025, 12, 15, 8, 30)),
+    ('12月31日 23:00', datetime(2025, 1, 2), datetime(2024, 12, 31, 23, 0)),
+    ('2月29日 10:00', datetime(2024, 3, 1), datetime(2024, 2, 29, 10, 0)),
+    ('2月29日 10:00', datetime(2025, 1, 5), datetime(2024, 2, 29, 10, 0)),
+    ('2月29日 10:00', datetime(2025, 6, 1), datetime(2024, 2, 29, 10, 0)),
+    ('02-29 10:00', datetime(2028, 2, 1), datetime(2024, 2, 29, 10, 0)),
+    ('5分钟前', datetime(2025, 1, 1, 12, 0), datetime(2025, 1, 1, 11, 55)),
+    ('昨天 08:30', datetime(2025, 1, 1, 12, 0), datetime(2024, 12, 31, 8, 30)),
+])
+def test_parse_time(text, now, expected):
+    assert parse_time(text, now) == expected
+
+
+def test_unparseable_returns_none():
+    assert parse_time('不知道什么时候', datetime(2025, 1, 1)) is None
+    assert parse_time('', datetime(2025, 1, 1)) is None
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+增量采集水位线测试
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.watermark import WatermarkStore, parse_since
+
+
+def test_update_only_moves_forward(workdir):
+    store = WatermarkStore(str(workdir / 'marks.json'))
+    store.update('长安', 'realtime', 100, datetime(2025, 1, 1, 8, 0))
+    store.update('长安', 'realtime', 90)
+    
+    mark = store.get('长安', 'realtime')
+    assert mark.mid == 100
+    assert mark.publish_time == '2025-01-01T08:00:00'
+    assert store.get('长安', 'hot') is None
+
+
+def test_marks_survive_reload(workdir):
+    path = str(workdir / 'marks.json')
+    WatermarkStore(path).update('长安', 'realtime', 100)
+    
+    store = WatermarkStore(path)
+    assert store.get('长安', 'realtime').mid == 100
+    assert not (workdir / 'marks.tmp').exists()
+
+
+def test_parse_since():
+    assert parse_since('2025-12-15 08:00') == datetime(2025, 12, 15, 8, 0)
+    assert parse_since('2025-12-15') == datetime(2025, 12, 15)
+    assert abs(datetime.now() - timedelta(hours=6) - parse_since('6h')) < timedelta(seconds=5)
+    with pytest.raises(ValueError):
+        parse_since('yesterday')